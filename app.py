@@ -1,38 +1,59 @@
 import streamlit as st
-import pyodbc
-import bcrypt
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import joblib
 import numpy as np
 import re
 import logging
+import os
 from cgpa_calculator import calculate_required_marks
+from compact_model import load_model
+from instrumentation import panel_enabled, render_panel, span
+from password_hashing import HasherBusyError, create_hasher
+from storage import DERIVED_COLUMNS, IntegrityError, SchemaError, create_repository
+from prediction_cache import model_fingerprint, prediction_cache
+from fast_inference import FastAttendancePredictor, verify_attendance_predictor
+from model_registry import create_registry
+from surrogate import SURROGATE_ENV, load_surrogate
+from goal_solver import solve as solve_goals
+from rank_index import RANKED_METRICS, build_rankings
+from prediction import EXAM_FEATURES, predict_attendance_batch, sweep_design_matrix
+
+# Database access goes through one repository (and connection pool) per process,
+# shared by every Streamlit session. See storage.create_repository for configuration.
+@st.cache_resource
+def get_repository():
+    return create_repository()
+
+# Connecting only checks the schema version; upgrades are run separately (migrate_schema.py)
+try:
+    get_repository()
+except SchemaError as e:
+    st.error(str(e))
+    st.stop()
 
-# Database connection setup
-def get_db_connection():
-    conn_str = (
-        "DRIVER={ODBC Driver 17 for SQL Server};"
-        "SERVER=FRENZY\\SQLEXPRESS;"
-        "DATABASE=DYPATU_StudentDB;"
-        "Trusted_Connection=yes;"
-    )
-    try:
-        conn = pyodbc.connect(conn_str)
-        return conn
-    except Exception as e:
-        st.error(f"Error connecting to database: {e}")
-        return None
+# Password hashing runs on a bounded worker pool shared by every session.
+# See password_hashing.create_hasher for the cost factor and pool settings.
+@st.cache_resource
+def get_password_hasher():
+    return create_hasher()
+
+# Rank and percentile lookups use in-memory indexes shared by every session. Writes made
+# through this app are applied immediately; the indexes are rebuilt every 10 minutes to
+# pick up changes made elsewhere (bulk imports, other app servers).
+@st.cache_resource(ttl=600)
+def get_rankings():
+    return build_rankings(get_repository())
+
+def refresh_rankings(user_id):
+    profile = get_repository().get_profile(user_id, fields=('grades', *RANKED_METRICS))
+    get_rankings().update(user_id, profile)
 
-# Password hashing
 def hash_password(password):
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+    return get_password_hasher().hash(password)
 
 def verify_password(password, hashed):
-    if isinstance(hashed, str):
-        hashed = hashed.encode('utf-8')
-    return bcrypt.checkpw(password.encode('utf-8'), hashed)
+    return get_password_hasher().verify(password, hashed)
 
 # Session state for user authentication
 if 'logged_in' not in st.session_state:
@@ -66,9 +87,13 @@ translations = {
         "predict_button": "Predict",
         "target_exam_marks": "Target Exam Marks (%)",
         "target_attendance": "Target Attendance (%)",
+        "goal_plan": "Smallest change that reaches your goals (predicted {marks:.1f}% marks, {attendance:.1f}% attendance):",
+        "goal_unreachable": "Your goals can't be reached by changing study hours, tuition hours and commute time alone. The closest plan predicts {marks:.1f}% marks and {attendance:.1f}% attendance:",
+        "goal_search_incomplete": "No plan reaching your goals was found in time. The closest one found predicts {marks:.1f}% marks and {attendance:.1f}% attendance:",
         "predicted_marks": "Predicted Exam Marks: {:.1f}%",
         "predicted_attendance": "Predicted Attendance: {:.1f}%",
         "study_tips": "Study Tips",
+        "why_this_prediction": "Why This Prediction?",
         "tip_low_study_hours": "Consider increasing your study hours to at least 15 per week to improve your performance.",
         "tip_low_attendance": "Your attendance is below the required 75%. Attend more classes to avoid being barred from exams.",
         "tip_low_marks": "Your predicted marks are below the passing threshold of 40%. Focus on key subjects and seek help if needed.",
@@ -105,6 +130,11 @@ translations = {
         "below_class_average": "Your {metric} ({value:.2f}) is below the class average ({avg:.2f}). Consider focusing on {suggestion}.",
         "above_class_average": "Great job! Your {metric} ({value:.2f}) is above the class average ({avg:.2f}). Keep up the good work!",
         "below_top_performer": "Your {metric} ({value:.2f}) is below the top performer ({top:.2f}). Aim to improve by {suggestion}.",
+        "where_you_stand": "Where You Stand",
+        "rank_of": "Rank {rank:,} of {total:,}",
+        "ahead_of": "Ahead of {percentile:.1f}% of students",
+        "leaderboard": "Top {n} Students",
+        "you": "You",
     },
     "mr": {
         "welcome_message": "विद्यार्थी कामगिरी अंदाज आणि CGPA कॅल्क्युलेटर मध्ये आपले स्वागत आहे!",
@@ -130,9 +160,13 @@ translations = {
         "predict_button": "अंदाज करा",
         "target_exam_marks": "लक्ष्य परीक्षा गुण (%)",
         "target_attendance": "लक्ष्य उपस्थिती (%)",
+        "goal_plan": "तुमची उद्दिष्टे गाठण्यासाठी सर्वात लहान बदल (अंदाजित गुण {marks:.1f}%, उपस्थिती {attendance:.1f}%):",
+        "goal_unreachable": "केवळ अभ्यासाचे तास, ट्यूशन तास आणि प्रवास वेळ बदलून तुमची उद्दिष्टे गाठता येणार नाहीत. सर्वात जवळची योजना {marks:.1f}% गुण आणि {attendance:.1f}% उपस्थितीचा अंदाज देते:",
+        "goal_search_incomplete": "वेळेत उद्दिष्टे गाठणारी योजना सापडली नाही. सापडलेली सर्वात जवळची योजना {marks:.1f}% गुण आणि {attendance:.1f}% उपस्थितीचा अंदाज देते:",
         "predicted_marks": "अंदाजित परीक्षा गुण: {:.1f}%",
         "predicted_attendance": "अंदाजित उपस्थिती: {:.1f}%",
         "study_tips": "अभ्यास टिप्स",
+        "why_this_prediction": "हा अंदाज का?",
         "tip_low_study_hours": "आपले अभ्यासाचे तास किमान 15 प्रति आठवडा वाढवण्याचा विचार करा.",
         "tip_low_attendance": "आपली उपस्थिती 75% पेक्षा कमी आहे. परीक्षेपासून वंचित राहू नये म्हणून जास्त वर्गांना उपस्थित रहा.",
         "tip_low_marks": "आपले अंदाजित गुण 40% पासिंग थ्रेशोल्डपेक्षा कमी आहेत. मुख्य विषयांवर लक्ष केंद्रित करा.",
@@ -169,6 +203,11 @@ translations = {
         "below_class_average": "तुमचे {metric} ({value:.2f}) वर्ग सरासरीपेक्षा ({avg:.2f}) कमी आहे. {suggestion} वर लक्ष केंद्रित करण्याचा विचार करा.",
         "above_class_average": "छान काम! तुमचे {metric} ({value:.2f}) वर्ग सरासरीपेक्षा ({avg:.2f}) जास्त आहे. चांगले काम चालू ठेवा!",
         "below_top_performer": "तुमचे {metric} ({value:.2f}) सर्वोत्तम कामगिरी करणाऱ्यापेक्षा ({top:.2f}) कमी आहे. {suggestion} करून सुधारणा करण्याचा प्रयत्न करा.",
+        "where_you_stand": "तुमचे स्थान",
+        "rank_of": "{total:,} पैकी क्रमांक {rank:,}",
+        "ahead_of": "{percentile:.1f}% विद्यार्थ्यांच्या पुढे",
+        "leaderboard": "सर्वोत्तम {n} विद्यार्थी",
+        "you": "तुम्ही",
     }
 }
 
@@ -185,53 +224,92 @@ language = st.sidebar.selectbox(
 st.session_state.language = 'en' if language == "English" else 'mr'
 lang = translations[st.session_state.language]
 
-# Load models and scaler
+# Exam marks come from a registry of named model versions (see model_registry.create_registry),
+# routed per student and hot-reloaded when their files change; it is the only copy of the exam
+# models and scaler in the process. The attendance model is loaded once per process and keyed
+# on its fingerprint (file mtime and size), so replacing the file reloads it on the next rerun.
+@st.cache_resource
+def get_model_registry():
+    return create_registry()
+
+@st.cache_resource(max_entries=1)
+def load_attendance_model(fingerprint):
+    return load_model('attendance_model.pkl', prefer_compact=True)
+
 try:
-    exam_model = joblib.load('exam_model.pkl')
-    attendance_model = joblib.load('attendance_model.pkl')
-    scaler = joblib.load('scaler_exam.pkl')
+    model_registry = get_model_registry()
+    models_fingerprint = (model_fingerprint(['attendance_model.pkl']), model_registry.fingerprint())
+    attendance_model = load_attendance_model(models_fingerprint[0])
 except FileNotFoundError:
     st.error("Model or scaler files not found. Please ensure 'exam_model.pkl', 'attendance_model.pkl', and 'scaler_exam.pkl' are in the project directory.")
     st.stop()
+prediction_cache.ensure_fingerprint(models_fingerprint)
+
+# Plain-NumPy attendance predictor for single-student calls, checked against the sklearn path
+# when the models load (exam versions check their own in model_registry). If the check fails,
+# predictions keep going through prediction.py.
+@st.cache_resource(max_entries=1)
+def load_fast_attendance(fingerprint):
+    try:
+        fast_attendance = FastAttendancePredictor(attendance_model)
+        verify_attendance_predictor(fast_attendance, attendance_model)
+    except (TypeError, ValueError) as e:
+        logging.warning(f"Fast inference disabled: {e}")
+        return None
+    return fast_attendance
+
+fast_attendance = load_fast_attendance(models_fingerprint[0])
+
+# Optional gridded surrogate of the models (surrogate.py), enabled by STUDENT_SURROGATE_DIR.
+# It answers the what-if charts and the study-hours slider; the predictions shown and saved
+# always come from the real models. It stands in for the primary exam version only, and a
+# surrogate built from other model files is ignored.
+@st.cache_resource(max_entries=1)
+def load_model_surrogate(fingerprint):
+    path = os.environ.get(SURROGATE_ENV)
+    if not path:
+        return None
+    primary = model_registry.version(model_registry.primary)
+    try:
+        model_surrogate = load_surrogate(path)
+        sources = {'exam_model': primary.model_path, 'scaler': primary.scaler_path, 'attendance_model': 'attendance_model.pkl'}
+        model_surrogate.check_sources({role: path for role, path in sources.items() if path})
+    except (OSError, ValueError) as e:
+        logging.warning(f"Surrogate disabled: {e}")
+        return None
+    return model_surrogate
+
+model_surrogate = load_model_surrogate(models_fingerprint)
 
-# Prediction functions
+# The exam model version serving the current student; every exam view (prediction, charts,
+# explanation, goal plan) uses it, so they agree with each other.
+def routed_exam_version():
+    return model_registry.version(model_registry.route(st.session_state.user_id))
+
+# Prediction functions for one student (the batch API in prediction.py serves charts and sweeps).
+# Results are cached per process on inputs quantized to the form's 0.1 step, separately for
+# each model version; the registry's per-version statistics count the uncached evaluations.
 def predict_exam_mark(previous_percentage, attendance, study_hours, commute_time, board_exam_marks, tuition_hours):
-    # Define the feature names in the same order as during training
-    feature_names = ['previous_percentage', 'attendance', 'study_hours', 'commute_time', 'board_exam_marks', 'tuition_hours']
-    
-    # Create a DataFrame with the input features
-    features = pd.DataFrame(
-        [[previous_percentage, attendance, study_hours, commute_time, board_exam_marks, tuition_hours]],
-        columns=feature_names
+    features = [previous_percentage, attendance, study_hours, commute_time, board_exam_marks, tuition_hours]
+    version = model_registry.route(st.session_state.user_id)
+    return prediction_cache.get_or_compute(
+        ('exam', version), features, lambda row: model_registry.predict_one(row, version=version)[0]
+    )
+
+def explain_exam_mark(previous_percentage, attendance, study_hours, commute_time, board_exam_marks, tuition_hours):
+    features = [previous_percentage, attendance, study_hours, commute_time, board_exam_marks, tuition_hours]
+    version = model_registry.route(st.session_state.user_id)
+    return prediction_cache.get_or_compute(
+        ('exam_explanation', version), features, lambda row: model_registry.version(version).explain_one(row)
     )
-    
-    # Scale the features
-    features_scaled = scaler.transform(features)
-    
-    # Predict
-    predicted_marks = exam_model.predict(features_scaled)[0]
-    
-    # Apply boosting logic
-    if previous_percentage > 85 and attendance > 90:
-        predicted_marks = min(predicted_marks * 1.1, 100)
-    elif previous_percentage < 60 or attendance < 70:
-        predicted_marks = max(predicted_marks * 0.9, 0)
-    
-    return predicted_marks
 
 def predict_attendance(past_attendance, study_hours, commute_time):
-    # Define the feature names in the same order as during training
-    feature_names = ['past_attendance', 'study_hours', 'commute_time']
-    
-    # Create a DataFrame with the input features
-    features = pd.DataFrame(
-        [[past_attendance, study_hours, commute_time]],
-        columns=feature_names
+    features = [past_attendance, study_hours, commute_time]
+    if fast_attendance is not None:
+        return prediction_cache.get_or_compute('attendance', features, lambda row: fast_attendance.predict_one(*row))
+    return prediction_cache.get_or_compute(
+        'attendance', features, lambda row: float(predict_attendance_batch(attendance_model, [row])[0])
     )
-    
-    # Predict
-    predicted_attendance = attendance_model.predict(features)[0]
-    return max(0, min(predicted_attendance, 100))
 
 # Signup function
 def signup():
@@ -256,23 +334,18 @@ def signup():
             return
 
         # Hash the password and proceed with signup
-        hashed_password = hash_password(password)
-        conn = get_db_connection()
-        if conn:
-            try:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "INSERT INTO Users (username, password, email) VALUES (?, ?, ?)",
-                    (username, hashed_password, email)
-                )
-                conn.commit()
-                st.success("Signup successful! Please log in.")
-            except pyodbc.IntegrityError:
-                st.error("Username or email already exists.")
-            except Exception as e:
-                st.error(f"Error during signup: {e}")
-            finally:
-                conn.close()
+        try:
+            hashed_password = hash_password(password)
+        except HasherBusyError as e:
+            st.error(str(e))
+            return
+        try:
+            get_repository().create_user(username, hashed_password, email)
+            st.success("Signup successful! Please log in.")
+        except IntegrityError:
+            st.error("Username or email already exists.")
+        except Exception as e:
+            st.error(f"Error during signup: {e}")
 
 # Login function
 def login():
@@ -286,24 +359,20 @@ def login():
             return
 
         # Verify user credentials
-        conn = get_db_connection()
-        if conn:
-            try:
-                cursor = conn.cursor()
-                cursor.execute("SELECT user_id, password FROM Users WHERE username = ?", (username,))
-                user = cursor.fetchone()
-                if user and verify_password(password, user[1]):
-                    st.session_state.logged_in = True
-                    st.session_state.user_id = user[0]
-                    st.session_state.username = username
-                    st.success("Login successful!")
-                    st.rerun()
-                else:
-                    st.error("Invalid username or password.")
-            except Exception as e:
-                st.error(f"Error during login: {e}")
-            finally:
-                conn.close()
+        try:
+            user = get_repository().get_user_credentials(username)
+            if user and verify_password(password, user[1]):
+                st.session_state.logged_in = True
+                st.session_state.user_id = user[0]
+                st.session_state.username = username
+                st.success("Login successful!")
+                st.rerun()
+            else:
+                st.error("Invalid username or password.")
+        except HasherBusyError as e:
+            st.error(str(e))
+        except Exception as e:
+            st.error(f"Error during login: {e}")
 
 # Logout function
 def logout():
@@ -367,34 +436,36 @@ def manage_student_profile():
     """, unsafe_allow_html=True)
 
     # Check if the user already has a profile
-    conn = get_db_connection()
-    if not conn:
+    try:
+        profile = get_repository().get_profile(
+            st.session_state.user_id, fields=('full_name', 'roll_number', 'grades', *DERIVED_COLUMNS)
+        )
+    except Exception as e:
+        st.error(f"Error connecting to database: {e}")
         return
-    
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM StudentProfiles WHERE user_id = ?", (st.session_state.user_id,))
-    profile = cursor.fetchone()
 
     # Initialize session state for edit mode
     if 'edit_mode' not in st.session_state:
         st.session_state.edit_mode = False
 
     if profile:
-        # Calculate average CGPA and performance insights
-        semester_grades = [min(max(float(profile[i+4]), 0.0), 10.0) for i in range(8)]  # Start at profile[4], clamp to [0.0, 10.0]
-        completed_semesters = sum(1 for grade in semester_grades if grade > 0)
-        average_cgpa = sum(semester_grades[:completed_semesters]) / completed_semesters if completed_semesters > 0 else 0
-        highest_grade = max(semester_grades[:completed_semesters]) if completed_semesters > 0 else 0
-        lowest_grade = min([g for g in semester_grades[:completed_semesters] if g > 0]) if completed_semesters > 0 else 0
+        # Average CGPA and performance insights are stored with the profile whenever grades change
+        semester_grades = profile.clamped_grades().tolist()
+        metrics = profile.metrics()
+        completed_semesters = metrics['completed_semesters']
+        average_cgpa = metrics['average_cgpa']
+        highest_grade = metrics['highest_grade']
+        lowest_grade = metrics['lowest_grade']
+        trend = metrics['grade_trend']
 
         # Display profile in view mode
         if not st.session_state.edit_mode:
             st.markdown('<div class="profile-card">', unsafe_allow_html=True)
             st.markdown(f'<div class="profile-header">{lang["student_profile"]}</div>', unsafe_allow_html=True)
-            st.markdown(f'<div class="profile-field">Full Name: {profile[2]}</div>', unsafe_allow_html=True)
-            st.markdown(f'<div class="profile-field">Roll Number: {profile[3]}</div>', unsafe_allow_html=True)
+            st.markdown(f'<div class="profile-field">Full Name: {profile.full_name}</div>', unsafe_allow_html=True)
+            st.markdown(f'<div class="profile-field">Roll Number: {profile.roll_number}</div>', unsafe_allow_html=True)
             st.markdown('<div class="profile-field">Semester Grades:</div>', unsafe_allow_html=True)
-            
+        
             # Display semester grades in a grid layout
             cols = st.columns(4)
             for i in range(8):
@@ -407,15 +478,8 @@ def manage_student_profile():
             st.markdown(f'<div class="profile-field">Lowest Semester Grade: {lowest_grade:.2f}</div>', unsafe_allow_html=True)
 
             # Performance trend
-            if completed_semesters >= 2:
-                differences = [semester_grades[i] - semester_grades[i-1] for i in range(1, completed_semesters)]
-                avg_diff = sum(differences) / len(differences)
-                if avg_diff > 0:
-                    insight = lang["improving"]
-                elif avg_diff < 0:
-                    insight = lang["declining"]
-                else:
-                    insight = lang["inconsistent"]
+            if trend is not None:
+                insight = lang[trend]
                 st.markdown(f'<div class="profile-field">Performance Trend: {insight}</div>', unsafe_allow_html=True)
 
             st.markdown('</div>', unsafe_allow_html=True)
@@ -434,9 +498,10 @@ def manage_student_profile():
                 "Grade": semester_grades,
                 "Type": ["Actual" if i < completed_semesters else "Not Completed" for i in range(8)]
             })
-            fig_grades = px.line(df_grades, x="Semester", y="Grade", color="Type",
-                                title="Semester-Wise Grade Trend", markers=True)
-            st.plotly_chart(fig_grades)
+            with span('plotly.manage_student_profile.grades'):
+                fig_grades = px.line(df_grades, x="Semester", y="Grade", color="Type",
+                                    title="Semester-Wise Grade Trend", markers=True)
+                st.plotly_chart(fig_grades)
 
             # Edit and Delete buttons
             col1, col2 = st.columns([1, 1])
@@ -447,8 +512,8 @@ def manage_student_profile():
             with col2:
                 if st.button("Delete Profile", key="delete_profile"):
                     try:
-                        cursor.execute("DELETE FROM StudentProfiles WHERE user_id = ?", (st.session_state.user_id,))
-                        conn.commit()
+                        get_repository().delete_profile(st.session_state.user_id)
+                        refresh_rankings(st.session_state.user_id)
                         st.success("Profile deleted successfully!")
                         st.session_state.edit_mode = False
                         st.rerun()
@@ -458,14 +523,14 @@ def manage_student_profile():
         # Edit mode
         else:
             st.write("### Edit Your Profile")
-            full_name = st.text_input("Full Name", value=profile[2])
-            roll_number = st.text_input("Roll Number", value=profile[3])
+            full_name = st.text_input("Full Name", value=profile.full_name)
+            roll_number = st.text_input("Roll Number", value=profile.roll_number)
             semester_grades = []
             st.write("Semester Grades:")
             cols = st.columns(4)
             for i in range(8):
                 with cols[i % 4]:
-                    grade = st.number_input(f"Semester {i+1} Grade", min_value=0.0, max_value=10.0, value=min(max(float(profile[i+4]), 0.0), 10.0), step=0.1)
+                    grade = st.number_input(f"Semester {i+1} Grade", min_value=0.0, max_value=10.0, value=float(profile.clamped_grades()[i]), step=0.1)
                     semester_grades.append(grade)
 
             # Save and Cancel buttons
@@ -473,22 +538,12 @@ def manage_student_profile():
             with col1:
                 if st.button("Save Changes"):
                     try:
-                        cursor.execute(
-                            """
-                            UPDATE StudentProfiles
-                            SET full_name = ?, roll_number = ?, 
-                                semester_1 = ?, semester_2 = ?, semester_3 = ?, semester_4 = ?,
-                                semester_5 = ?, semester_6 = ?, semester_7 = ?, semester_8 = ?,
-                                updated_at = GETDATE()
-                            WHERE user_id = ?
-                            """,
-                            (full_name, roll_number, *semester_grades, st.session_state.user_id)
-                        )
-                        conn.commit()
+                        get_repository().update_profile(st.session_state.user_id, full_name, roll_number, semester_grades)
+                        refresh_rankings(st.session_state.user_id)
                         st.success("Profile updated successfully!")
                         st.session_state.edit_mode = False
                         st.rerun()
-                    except pyodbc.IntegrityError:
+                    except IntegrityError:
                         st.error("Roll number already exists.")
                     except Exception as e:
                         st.error(f"Error updating profile: {e}")
@@ -509,41 +564,67 @@ def manage_student_profile():
             with cols[i % 4]:
                 grade = st.number_input(f"Semester {i+1} Grade", min_value=0.0, max_value=10.0, value=0.0, step=0.1)
                 semester_grades.append(grade)
-        
+    
         if st.button("Save Profile"):
             if not full_name or not roll_number:
                 st.error("Please fill in all required fields.")
                 return
-            
+        
             try:
-                cursor.execute(
-                    """
-                    INSERT INTO StudentProfiles (user_id, full_name, roll_number, semester_1, semester_2,
-                        semester_3, semester_4, semester_5, semester_6, semester_7, semester_8)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (st.session_state.user_id, full_name, roll_number, *semester_grades)
-                )
-                conn.commit()
+                get_repository().create_profile(st.session_state.user_id, full_name, roll_number, semester_grades)
+                refresh_rankings(st.session_state.user_id)
                 st.success("Profile created successfully!")
                 st.rerun()
-            except pyodbc.IntegrityError:
+            except IntegrityError:
                                 st.error("Roll number already exists.")
             except Exception as e:
                 st.error(f"Error creating profile: {e}")
-    
-    conn.close()
+
 
 # Predict Exam Marks feature
 def predict_exam_marks():
     st.subheader(lang["predict_exam_marks"])
     
-    # Cache the computation of the study hours chart
+    # The routed exam version answers every chart below; the surrogate stands in for it when
+    # it is the primary version. Results are cached per version: version_key (name and model
+    # fingerprints) is hashed, the leading underscore keeps Streamlit from hashing the
+    # ModelVersion itself. Each chart is a single batched predict over the whole grid.
+    exam_version = routed_exam_version()
+    use_surrogate = model_surrogate is not None and exam_version.name == model_registry.primary
+    version_key = (exam_version.name, exam_version.fingerprint, models_fingerprint[0])
+
+    def predict_sweep(version, use_surrogate, design):
+        if use_surrogate:
+            return model_surrogate.predict_exam(design.to_numpy())
+        return version.predict_batch(design)
+
+    @st.cache_data
+    def compute_study_hours_chart(previous_percentage, past_attendance, commute_time, board_exam_marks, tuition_hours, _version, version_key, use_surrogate):
+        base = {
+            'previous_percentage': previous_percentage, 'attendance': past_attendance, 'study_hours': 0.0,
+            'commute_time': commute_time, 'board_exam_marks': board_exam_marks, 'tuition_hours': tuition_hours
+        }
+        hours_range = np.linspace(5, 20, 151)
+        design = sweep_design_matrix(base, EXAM_FEATURES, [('study_hours', hours_range)])
+        return hours_range, predict_sweep(_version, use_surrogate, design)
+
+    @st.cache_data
+    def compute_study_tuition_heatmap(previous_percentage, past_attendance, commute_time, board_exam_marks, _version, version_key, use_surrogate):
+        base = {
+            'previous_percentage': previous_percentage, 'attendance': past_attendance, 'study_hours': 0.0,
+            'commute_time': commute_time, 'board_exam_marks': board_exam_marks, 'tuition_hours': 0.0
+        }
+        hours_range = np.linspace(5, 20, 61)
+        tuition_range = np.linspace(0, 10, 41)
+        design = sweep_design_matrix(base, EXAM_FEATURES, [('tuition_hours', tuition_range), ('study_hours', hours_range)])
+        marks_grid = predict_sweep(_version, use_surrogate, design).reshape(len(tuition_range), len(hours_range))
+        return hours_range, tuition_range, marks_grid
+
+    # Smallest change in study hours, tuition hours and commute time that reaches both goals
     @st.cache_data
-    def compute_study_hours_chart(previous_percentage, past_attendance, commute_time, board_exam_marks, tuition_hours):
-        hours_range = np.linspace(5, 20, 50)
-        marks_range = [predict_exam_mark(previous_percentage, past_attendance, h, commute_time, board_exam_marks, tuition_hours) for h in hours_range]
-        return hours_range, marks_range
+    def compute_goal_plan(student, target_marks, target_attendance, _version, version_key):
+        return solve_goals(None, None, attendance_model, student, target_marks, target_attendance,
+                           predict_exam=_version.predict_batch)
 
     # Initialize session state variables
     if 'predictions_made' not in st.session_state:
@@ -611,58 +692,73 @@ def predict_exam_marks():
         # Gauge charts for predicted marks and attendance
         col1, col2 = st.columns(2)
         with col1:
-            fig_marks = go.Figure(go.Indicator(
-                mode="gauge+number",
-                value=predicted_marks,
-                domain={'x': [0, 1], 'y': [0, 1]},
-                title={'text': "Predicted Exam Marks (%)"},
-                gauge={
-                    'axis': {'range': [0, 100]},
-                    'bar': {'color': "darkblue"},
-                    'steps': [
-                        {'range': [0, 40], 'color': "red"},
-                        {'range': [40, 70], 'color': "yellow"},
-                        {'range': [70, 100], 'color': "green"}
-                    ],
-                    'threshold': {
-                        'line': {'color': "black", 'width': 4},
-                        'thickness': 0.75,
-                        'value': 40
+            with span('plotly.predict_exam_marks.marks'):
+                fig_marks = go.Figure(go.Indicator(
+                    mode="gauge+number",
+                    value=predicted_marks,
+                    domain={'x': [0, 1], 'y': [0, 1]},
+                    title={'text': "Predicted Exam Marks (%)"},
+                    gauge={
+                        'axis': {'range': [0, 100]},
+                        'bar': {'color': "darkblue"},
+                        'steps': [
+                            {'range': [0, 40], 'color': "red"},
+                            {'range': [40, 70], 'color': "yellow"},
+                            {'range': [70, 100], 'color': "green"}
+                        ],
+                        'threshold': {
+                            'line': {'color': "black", 'width': 4},
+                            'thickness': 0.75,
+                            'value': 40
+                        }
                     }
-                }
-            ))
-            st.plotly_chart(fig_marks, use_container_width=True)
+                ))
+                st.plotly_chart(fig_marks, use_container_width=True)
 
         with col2:
-            fig_attendance = go.Figure(go.Indicator(
-                mode="gauge+number",
-                value=predicted_attendance,
-                domain={'x': [0, 1], 'y': [0, 1]},
-                title={'text': "Predicted Attendance (%)"},
-                gauge={
-                    'axis': {'range': [0, 100]},
-                    'bar': {'color': "darkblue"},
-                    'steps': [
-                        {'range': [0, 75], 'color': "red"},
-                        {'range': [75, 85], 'color': "yellow"},
-                        {'range': [85, 100], 'color': "green"}
-                    ],
-                    'threshold': {
-                        'line': {'color': "black", 'width': 4},
-                        'thickness': 0.75,
-                        'value': 75
+            with span('plotly.predict_exam_marks.attendance'):
+                fig_attendance = go.Figure(go.Indicator(
+                    mode="gauge+number",
+                    value=predicted_attendance,
+                    domain={'x': [0, 1], 'y': [0, 1]},
+                    title={'text': "Predicted Attendance (%)"},
+                    gauge={
+                        'axis': {'range': [0, 100]},
+                        'bar': {'color': "darkblue"},
+                        'steps': [
+                            {'range': [0, 75], 'color': "red"},
+                            {'range': [75, 85], 'color': "yellow"},
+                            {'range': [85, 100], 'color': "green"}
+                        ],
+                        'threshold': {
+                            'line': {'color': "black", 'width': 4},
+                            'thickness': 0.75,
+                            'value': 75
+                        }
                     }
-                }
-            ))
-            st.plotly_chart(fig_attendance, use_container_width=True)
+                ))
+                st.plotly_chart(fig_attendance, use_container_width=True)
 
         # Feature importance
         feature_importance = pd.DataFrame({
             'Feature': ['Previous Percentage', 'Attendance', 'Study Hours', 'Commute Time', 'Board Exam Marks', 'Tuition Hours'],
-            'Importance': exam_model.feature_importances_
+            'Importance': exam_version.importances
         })
-        fig_importance = px.bar(feature_importance, x='Importance', y='Feature', title="Feature Importance for Exam Marks Prediction")
-        st.plotly_chart(fig_importance)
+        with span('plotly.predict_exam_marks.importance'):
+            fig_importance = px.bar(feature_importance, x='Importance', y='Feature', title="Feature Importance for Exam Marks Prediction")
+            st.plotly_chart(fig_importance)
+
+        # Why this student's prediction came out as it did: each input's contribution, starting from the average student
+        st.write("### " + lang["why_this_prediction"])
+        explanation = explain_exam_mark(previous_percentage, past_attendance, study_hours, commute_time, board_exam_marks, tuition_hours)
+        with span('plotly.predict_exam_marks.explanation'):
+            fig_explanation = go.Figure(go.Waterfall(
+                measure=['absolute', *['relative'] * len(feature_importance), 'relative', 'total'],
+                x=['Average Student', *feature_importance['Feature'], 'Boost Rule', 'Your Prediction'],
+                y=[explanation['base'], *explanation['contributions'].values(), explanation['adjustment'], 0],
+            ))
+            fig_explanation.update_layout(title="Contribution of Each Input to Your Predicted Marks (%)", showlegend=False)
+            st.plotly_chart(fig_explanation)
 
         # Goal setting
         st.write("### Set Your Goals")
@@ -676,6 +772,13 @@ def predict_exam_marks():
         st.progress(min(predicted_attendance / target_attendance, 1.0) if target_attendance > 0 else 0)
         st.write(f"Attendance: {predicted_attendance:.1f}% / {target_attendance}%")
 
+        if predicted_marks < target_marks or predicted_attendance < target_attendance:
+            plan = compute_goal_plan(st.session_state.input_values, target_marks, target_attendance, exam_version, version_key)
+            message = {'reached': "goal_plan", 'unreachable': "goal_unreachable", 'budget_exceeded': "goal_search_incomplete"}[plan['status']]
+            st.write(lang[message].format(marks=plan['predicted_marks'], attendance=plan['predicted_attendance']))
+            for feature, change in plan['changes'].items():
+                st.write(f"- {lang[feature]}: {st.session_state.input_values[feature]:.1f} → {plan['inputs'][feature]:.1f} ({change:+.1f})")
+
         # Study tips
         st.write("### " + lang["study_tips"])
         tips = []
@@ -695,37 +798,39 @@ def predict_exam_marks():
         # Explore impact of study hours
         st.write("### " + lang["explore_study_hours"])
         explore_hours = st.slider("Study Hours", min_value=5.0, max_value=20.0, value=study_hours, step=0.1)
-        explore_marks = predict_exam_mark(previous_percentage, past_attendance, explore_hours, commute_time, board_exam_marks, tuition_hours)
+        if use_surrogate:
+            # Read off the same surface as the chart, so the marker sits on the line
+            explore_marks = model_surrogate.predict_exam_one(previous_percentage, past_attendance, explore_hours, commute_time, board_exam_marks, tuition_hours)
+        else:
+            explore_marks = predict_exam_mark(previous_percentage, past_attendance, explore_hours, commute_time, board_exam_marks, tuition_hours)
         
         # Predicted marks vs study hours chart
-        hours_range, marks_range = compute_study_hours_chart(previous_percentage, past_attendance, commute_time, board_exam_marks, tuition_hours)
-        fig_study_hours = px.line(x=hours_range, y=marks_range, labels={'x': 'Study Hours per Week', 'y': 'Predicted Marks (%)'},
-                                 title="Predicted Marks vs. Study Hours")
-        fig_study_hours.add_scatter(x=[explore_hours], y=[explore_marks], mode='markers', marker=dict(size=15, color='red'), name='Current Prediction')
-        st.plotly_chart(fig_study_hours)
+        hours_range, marks_range = compute_study_hours_chart(previous_percentage, past_attendance, commute_time, board_exam_marks, tuition_hours, exam_version, version_key, use_surrogate)
+        with span('plotly.predict_exam_marks.study_hours'):
+            fig_study_hours = px.line(x=hours_range, y=marks_range, labels={'x': 'Study Hours per Week', 'y': 'Predicted Marks (%)'},
+                                     title="Predicted Marks vs. Study Hours")
+            fig_study_hours.add_scatter(x=[explore_hours], y=[explore_marks], mode='markers', marker=dict(size=15, color='red'), name='Current Prediction')
+            st.plotly_chart(fig_study_hours)
+
+        # Combined effect of study and tuition hours
+        hours_range, tuition_range, marks_grid = compute_study_tuition_heatmap(previous_percentage, past_attendance, commute_time, board_exam_marks, exam_version, version_key, use_surrogate)
+        with span('plotly.predict_exam_marks.heatmap'):
+            fig_heatmap = px.imshow(marks_grid, x=hours_range, y=tuition_range, origin='lower', aspect='auto',
+                                    labels={'x': 'Study Hours per Week', 'y': 'Tuition Hours per Week', 'color': 'Predicted Marks (%)'},
+                                    title="Predicted Marks by Study and Tuition Hours")
+            fig_heatmap.add_scatter(x=[explore_hours], y=[tuition_hours], mode='markers', marker=dict(size=12, color='red'), name='Current Prediction')
+            st.plotly_chart(fig_heatmap)
 
         # Save predictions to profile
         if st.button("Save Predictions to Profile"):
-            conn = get_db_connection()
-            if conn:
-                try:
-                    cursor = conn.cursor()
-                    cursor.execute(
-                        """
-                        UPDATE StudentProfiles
-                        SET predicted_exam_marks = ?, predicted_attendance = ?, updated_at = GETDATE()
-                        WHERE user_id = ?
-                        """,
-                        (predicted_marks, predicted_attendance, st.session_state.user_id)
-                    )
-                    conn.commit()
-                    st.success("Predictions saved to profile successfully!")
-                    logging.info(f"User {st.session_state.user_id} saved predictions: marks={predicted_marks}, attendance={predicted_attendance}")
-                except Exception as e:
-                    logging.error(f"Error saving predictions to profile: {e}")
-                    st.error(f"Error saving predictions to profile: {e}")
-                finally:
-                    conn.close()
+            try:
+                get_repository().save_predictions(st.session_state.user_id, predicted_marks, predicted_attendance)
+                refresh_rankings(st.session_state.user_id)
+                st.success("Predictions saved to profile successfully!")
+                logging.info(f"User {st.session_state.user_id} saved predictions: marks={predicted_marks}, attendance={predicted_attendance}")
+            except Exception as e:
+                logging.error(f"Error saving predictions to profile: {e}")
+                st.error(f"Error saving predictions to profile: {e}")
 
         # Reset predictions
         if st.button("Reset Predictions"):
@@ -805,10 +910,11 @@ def calculate_cgpa():
         grading_scale: semester_grades,
         "Type": ["Actual" if i < completed_semesters else "Not Completed" for i in range(8)]
     })
-    fig_progress = px.line(df_progress, x="Semester", y=grading_scale, color="Type",
-                          title="Semester-Wise Progress", markers=True)
-    fig_progress.add_hline(y=target, line_dash="dash", line_color="red", annotation_text="Target")
-    st.plotly_chart(fig_progress)
+    with span('plotly.calculate_cgpa.progress'):
+        fig_progress = px.line(df_progress, x="Semester", y=grading_scale, color="Type",
+                              title="Semester-Wise Progress", markers=True)
+        fig_progress.add_hline(y=target, line_dash="dash", line_color="red", annotation_text="Target")
+        st.plotly_chart(fig_progress)
 
     # Performance insight
     if completed_semesters >= 2:
@@ -839,54 +945,33 @@ def calculate_cgpa():
 
     # Option to save grades to profile
     if st.button(lang["save_to_profile"]):
-        conn = get_db_connection()
-        if conn:
-            try:
-                cursor = conn.cursor()
-                cursor.execute(
-                    """
-                    IF EXISTS (SELECT 1 FROM StudentProfiles WHERE user_id = ?)
-                        UPDATE StudentProfiles
-                        SET semester_1 = ?, semester_2 = ?, semester_3 = ?, semester_4 = ?,
-                            semester_5 = ?, semester_6 = ?, semester_7 = ?, semester_8 = ?,
-                            updated_at = GETDATE()
-                        WHERE user_id = ?
-                    ELSE
-                        INSERT INTO StudentProfiles (user_id, full_name, roll_number, semester_1, semester_2,
-                            semester_3, semester_4, semester_5, semester_6, semester_7, semester_8)
-                        VALUES (?, 'Unknown', 'Unknown', ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (st.session_state.user_id, *semester_grades, st.session_state.user_id,
-                     st.session_state.user_id, *semester_grades)
-                )
-                conn.commit()
-                st.success("Grades saved to profile successfully!")
-            except Exception as e:
-                st.error(f"Error saving grades to profile: {e}")
-            finally:
-                conn.close()
+        try:
+            get_repository().save_grades(st.session_state.user_id, semester_grades)
+            refresh_rankings(st.session_state.user_id)
+            st.success("Grades saved to profile successfully!")
+        except Exception as e:
+            st.error(f"Error saving grades to profile: {e}")
 
 def compare_scores():
     st.subheader(lang["compare_scores"])
 
     # Check if the user has a profile
-    conn = get_db_connection()
-    if not conn:
+    repository = get_repository()
+    try:
+        user_profile = repository.get_profile(st.session_state.user_id, fields=('grades', *DERIVED_COLUMNS))
+    except Exception as e:
+        st.error(f"Error connecting to database: {e}")
         return
-    
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM StudentProfiles WHERE user_id = ?", (st.session_state.user_id,))
-    user_profile = cursor.fetchone()
 
     if not user_profile:
         st.warning("Please create your student profile to compare scores.")
-        conn.close()
         return
 
     # Get user's semester grades and average CGPA
-    user_semester_grades = [min(max(float(user_profile[i+4]), 0.0), 10.0) for i in range(8)]
-    user_completed_semesters = sum(1 for grade in user_semester_grades if grade > 0)
-    user_average_cgpa = sum(user_semester_grades[:user_completed_semesters]) / user_completed_semesters if user_completed_semesters > 0 else 0
+    user_semester_grades = user_profile.clamped_grades().tolist()
+    user_metrics = user_profile.metrics()
+    user_completed_semesters = user_metrics['completed_semesters']
+    user_average_cgpa = user_metrics['average_cgpa']
 
     # Get predicted marks and attendance from session state (if available)
     user_predicted_marks = st.session_state.get('predicted_marks', None)
@@ -894,48 +979,31 @@ def compare_scores():
 
     if user_predicted_marks is None or user_predicted_attendance is None:
         st.warning("Please use the 'Predict Exam Marks' feature to get your predicted marks and attendance for comparison.")
-        conn.close()
         return
 
-    # Fetch all student profiles to compute class averages and top performer
-    cursor.execute("SELECT * FROM StudentProfiles")
-    all_profiles = cursor.fetchall()
+    # Class averages and top performers come from the incrementally maintained aggregates
+    aggregates = repository.get_class_aggregates()
 
-    if len(all_profiles) <= 1:
+    if aggregates['profiles']['count'] <= 1:
         st.warning("Not enough student profiles to compare. At least two profiles are needed.")
-        conn.close()
         return
 
-    # Compute predicted marks and attendance for comparison
-    all_predicted_marks = [profile[13] for profile in all_profiles if profile[13] is not None]  # Assuming predicted_exam_marks is the 14th column (index 13)
-    all_predicted_attendance = [profile[14] for profile in all_profiles if profile[14] is not None]  # Assuming predicted_attendance is the 15th column (index 14)
-
-    class_avg_predicted_marks = sum(all_predicted_marks) / len(all_predicted_marks) if all_predicted_marks else 0
-    top_predicted_marks = max(all_predicted_marks) if all_predicted_marks else 0
+    class_avg_predicted_marks = aggregates['predicted_exam_marks']['mean']
+    top_predicted_marks = aggregates['predicted_exam_marks']['max']
 
-    class_avg_predicted_attendance = sum(all_predicted_attendance) / len(all_predicted_attendance) if all_predicted_attendance else 0
-    top_predicted_attendance = max(all_predicted_attendance) if all_predicted_attendance else 0
+    class_avg_predicted_attendance = aggregates['predicted_attendance']['mean']
+    top_predicted_attendance = aggregates['predicted_attendance']['max']
 
-    # Compute class averages and top performer for semester grades
-    all_semester_grades = [[min(max(float(profile[i+4]), 0.0), 10.0) for i in range(8)] for profile in all_profiles]
-    class_avg_semester_grades = []
-    for sem in range(8):
-        sem_grades = [grades[sem] for grades in all_semester_grades if grades[sem] > 0]
-        class_avg_semester_grades.append(sum(sem_grades) / len(sem_grades) if sem_grades else 0)
+    class_avg_semester_grades = [aggregates[f"semester_{sem + 1}"]['mean'] for sem in range(8)]
 
-    # Compute average CGPA for each student
-    all_average_cgpas = []
-    for grades in all_semester_grades:
-        completed_semesters = sum(1 for grade in grades if grade > 0)
-        avg_cgpa = sum(grades[:completed_semesters]) / completed_semesters if completed_semesters > 0 else 0
-        all_average_cgpas.append(avg_cgpa)
+    # Every profile counts towards the class average CGPA, including ones with no completed semesters
+    class_avg_cgpa = aggregates['average_cgpa']['sum'] / aggregates['profiles']['count']
+    top_performer_cgpa = aggregates['average_cgpa']['max']
 
-    class_avg_cgpa = sum(all_average_cgpas) / len(all_average_cgpas) if all_average_cgpas else 0
-    top_performer_cgpa = max(all_average_cgpas) if all_average_cgpas else 0
-
-    # Top performer's semester grades
-    top_performer_index = all_average_cgpas.index(top_performer_cgpa)
-    top_performer_semester_grades = all_semester_grades[top_performer_index]
+    # Top performer's semester grades. The profile is read after the aggregates, so it may have
+    # been deleted meanwhile (or there may be no top performer); the series is then left out.
+    top_performer_id = aggregates['average_cgpa']['max_user_id']
+    top_performer_profile = repository.get_profile(top_performer_id, fields=('grades',)) if top_performer_id is not None else None
 
     # 1. Semester Grades Comparison (Line Chart)
     st.write("### " + lang["semester_grades_comparison"])
@@ -943,11 +1011,13 @@ def compare_scores():
         "Semester": [f"Sem {i+1}" for i in range(8)],
         lang["your_scores"]: user_semester_grades,
         lang["class_average"]: class_avg_semester_grades,
-        lang["top_performer"]: top_performer_semester_grades
     })
-    fig_grades = px.line(df_comparison, x="Semester", y=[lang["your_scores"], lang["class_average"], lang["top_performer"]],
-                         title="Semester Grades Comparison", markers=True)
-    st.plotly_chart(fig_grades)
+    if top_performer_profile is not None:
+        df_comparison[lang["top_performer"]] = top_performer_profile.clamped_grades().tolist()
+    with span('plotly.compare_scores.grades'):
+        fig_grades = px.line(df_comparison, x="Semester", y=list(df_comparison.columns[1:]),
+                             title="Semester Grades Comparison", markers=True)
+        st.plotly_chart(fig_grades)
 
     # 2. Average CGPA Comparison (Bar Chart)
     st.write("### " + lang["cgpa_comparison"])
@@ -955,8 +1025,9 @@ def compare_scores():
         "Category": [lang["your_scores"], lang["class_average"], lang["top_performer"]],
         "Average CGPA": [user_average_cgpa, class_avg_cgpa, top_performer_cgpa]
     })
-    fig_cgpa = px.bar(df_cgpa, x="Category", y="Average CGPA", title="Average CGPA Comparison", color="Category")
-    st.plotly_chart(fig_cgpa)
+    with span('plotly.compare_scores.cgpa'):
+        fig_cgpa = px.bar(df_cgpa, x="Category", y="Average CGPA", title="Average CGPA Comparison", color="Category")
+        st.plotly_chart(fig_cgpa)
 
     # 3. Predicted Exam Marks Comparison (Bar Chart)
     st.write("### " + lang["predicted_marks_comparison"])
@@ -964,8 +1035,9 @@ def compare_scores():
         "Category": [lang["your_scores"], lang["class_average"], lang["top_performer"]],
         "Predicted Exam Marks (%)": [user_predicted_marks, class_avg_predicted_marks, top_predicted_marks]
     })
-    fig_marks = px.bar(df_marks, x="Category", y="Predicted Exam Marks (%)", title="Predicted Exam Marks Comparison", color="Category")
-    st.plotly_chart(fig_marks)
+    with span('plotly.compare_scores.marks'):
+        fig_marks = px.bar(df_marks, x="Category", y="Predicted Exam Marks (%)", title="Predicted Exam Marks Comparison", color="Category")
+        st.plotly_chart(fig_marks)
 
     # 4. Predicted Attendance Comparison (Bar Chart)
     st.write("### " + lang["predicted_attendance_comparison"])
@@ -973,10 +1045,39 @@ def compare_scores():
         "Category": [lang["your_scores"], lang["class_average"], lang["top_performer"]],
         "Predicted Attendance (%)": [user_predicted_attendance, class_avg_predicted_attendance, top_predicted_attendance]
     })
-    fig_attendance = px.bar(df_attendance, x="Category", y="Predicted Attendance (%)", title="Predicted Attendance Comparison", color="Category")
-    st.plotly_chart(fig_attendance)
+    with span('plotly.compare_scores.attendance'):
+        fig_attendance = px.bar(df_attendance, x="Category", y="Predicted Attendance (%)", title="Predicted Attendance Comparison", color="Category")
+        st.plotly_chart(fig_attendance)
+
+    # 5. Rank and percentile among all students, plus the top of each ranking
+    st.write("### " + lang["where_you_stand"])
+    rankings = get_rankings()
+    user_scores = {
+        'average_cgpa': ("Average CGPA", user_average_cgpa),
+        'predicted_exam_marks': ("Predicted Exam Marks (%)", user_predicted_marks),
+        'predicted_attendance': ("Predicted Attendance (%)", user_predicted_attendance),
+    }
+    cols = st.columns(len(RANKED_METRICS))
+    for col, metric in zip(cols, RANKED_METRICS):
+        label, value = user_scores[metric]
+        standing = rankings[metric].standing(value, st.session_state.user_id)
+        with col:
+            st.metric(label, lang["rank_of"].format(**standing))
+            st.caption(lang["ahead_of"].format(**standing))
+
+    leaderboard_size = 10
+    leaderboard_label = st.selectbox(lang["leaderboard"].format(n=leaderboard_size),
+                                     [user_scores[metric][0] for metric in RANKED_METRICS])
+    leaderboard_metric = next(metric for metric in RANKED_METRICS if user_scores[metric][0] == leaderboard_label)
+    leaderboard = rankings[leaderboard_metric].top(leaderboard_size)
+    df_leaderboard = pd.DataFrame({
+        "Rank": [rankings[leaderboard_metric].count_above(value) + 1 for _, value in leaderboard],
+        "Student": [lang["you"] if user_id == st.session_state.user_id else "" for user_id, _ in leaderboard],
+        user_scores[leaderboard_metric][0]: [value for _, value in leaderboard],
+    })
+    st.dataframe(df_leaderboard, hide_index=True)
 
-    # 5. Comparison Insights
+    # 6. Comparison Insights
     st.write("### " + lang["comparison_insights"])
     insights = []
 
@@ -1044,7 +1145,6 @@ def compare_scores():
     else:
         st.write("No specific insights available at this time.")
 
-    conn.close()
 
 # Main app logic
 def main_app():
@@ -1057,13 +1157,17 @@ def main_app():
     )
     
     if feature == lang["student_profile"]:
-        manage_student_profile()
+        with span('page.student_profile'):
+            manage_student_profile()
     elif feature == lang["predict_exam_marks"]:
-        predict_exam_marks()
+        with span('page.predict_exam_marks'):
+            predict_exam_marks()
     elif feature == lang["calculate_cgpa"]:
-        calculate_cgpa()
+        with span('page.calculate_cgpa'):
+            calculate_cgpa()
     elif feature == lang["compare_scores"]:
-        compare_scores()
+        with span('page.compare_scores'):
+            compare_scores()
     elif feature == lang["logout"]:
         logout()
 
@@ -1078,5 +1182,11 @@ def app():
     else:
         main_app()
 
+    # Opt-in timing panel (set STUDENT_METRICS_PANEL=1)
+    if panel_enabled():
+        render_panel(st)
+        with st.sidebar.expander("Model versions"):
+            st.dataframe(pd.DataFrame.from_dict(model_registry.summary(), orient='index').drop(columns='loaded_at'))
+
 if __name__ == "__main__":
     app()
\ No newline at end of file
@@ -0,0 +1,30 @@
+import argparse
+import logging
+import time
+
+from storage import create_repository
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Populate the stored per-student metrics (CGPA, trend, ...) for existing profiles.")
+    parser.add_argument('--batch-size', type=int, default=10000, help="Width of each user_id range, one transaction each")
+    parser.add_argument('--all', action='store_true', help="Recompute every profile, not only rows missing metrics")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    start = time.perf_counter()
+
+    def progress(updated):
+        logging.info(f"{updated} profiles updated ({updated / (time.perf_counter() - start):,.0f} rows/sec)")
+
+    # Connect to the database (configured through STUDENT_DB_* environment variables)
+    repository = create_repository()
+    try:
+        updated = repository.backfill_derived_metrics(batch_size=args.batch_size, only_missing=not args.all, progress=progress)
+    finally:
+        repository.close()
+    logging.info(f"Backfilled derived metrics for {updated} profiles in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.synthetic import load_sqlite_profiles, synthetic_profiles
+from cgpa_calculator import average_cgpa, clamp_grades
+from storage import SqliteRepository
+
+
+def python_scan(repository):
+    """The original compare_scores path: fetch every profile and aggregate in Python."""
+    profiles = repository.list_profiles(fields=('grades', 'predicted_exam_marks', 'predicted_attendance'))
+    all_semester_grades = [clamp_grades(profile.grades) for profile in profiles]
+    class_avg_semester_grades = []
+    for sem in range(8):
+        sem_grades = [grades[sem] for grades in all_semester_grades if grades[sem] > 0]
+        class_avg_semester_grades.append(sum(sem_grades) / len(sem_grades) if sem_grades else 0)
+    all_average_cgpas = [average_cgpa(grades) for grades in all_semester_grades]
+    predicted_marks = [profile.predicted_exam_marks for profile in profiles if profile.predicted_exam_marks is not None]
+    predicted_attendance = [profile.predicted_attendance for profile in profiles if profile.predicted_attendance is not None]
+    summary = (
+        class_avg_semester_grades,
+        sum(all_average_cgpas) / len(all_average_cgpas), max(all_average_cgpas),
+        sum(predicted_marks) / len(predicted_marks), max(predicted_marks),
+        sum(predicted_attendance) / len(predicted_attendance), max(predicted_attendance),
+    )
+    return summary, len(profiles)
+
+
+def sql_aggregation(repository):
+    """Aggregates pushed into SQL: one summary row plus the top-performer lookup."""
+    return repository.compute_class_aggregates(), 2
+
+
+def aggregate_table(repository):
+    """The incrementally maintained ClassAggregates table."""
+    aggregates = repository.get_class_aggregates()
+    return aggregates, len(aggregates)
+
+
+STRATEGIES = {'python_scan': python_scan, 'sql_aggregation': sql_aggregation, 'aggregate_table': aggregate_table}
+
+
+def time_strategy(strategy, repository, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        _, rows = strategy(repository)
+        timings.append(time.perf_counter() - start)
+    return {'rows_transferred': rows, 'median_ms': statistics.median(timings) * 1000, 'min_ms': min(timings) * 1000}
+
+
+def run(sizes, repeats, seed=42):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_profiles in sizes:
+            repository = SqliteRepository.connect(os.path.join(tmp, f"class_{n_profiles}.db"), pool_size=1, migrate=True)
+            start = time.perf_counter()
+            load_sqlite_profiles(repository, synthetic_profiles(n_profiles, seed=seed))
+            setup_seconds = time.perf_counter() - start
+
+            result = {'profiles': n_profiles, 'setup_seconds': setup_seconds}
+            for name, strategy in STRATEGIES.items():
+                result[name] = time_strategy(strategy, repository, repeats)
+                print(f"{n_profiles:>9} profiles  {name:<16} rows={result[name]['rows_transferred']:<9} "
+                      f"median={result[name]['median_ms']:.2f}ms")
+            results.append(result)
+            repository.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare class-statistics strategies for compare_scores on SQLite.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.repeats)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import argparse
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from password_hashing import HasherBusyError, PasswordHasher
+
+
+def inline_login(password, hashed):
+    """The original path: bcrypt on the calling (script) thread."""
+    return bcrypt.checkpw(password, hashed)
+
+
+def login_burst(verify, password, hashed, clients, logins_per_client):
+    """
+    Simulate ``clients`` concurrent sessions each logging in ``logins_per_client`` times.
+
+    Returns:
+        dict: Completed and rejected (busy) logins, logins/sec and per-login latency.
+    """
+    latencies, rejected = [], [0]
+    lock = threading.Lock()
+    barrier = threading.Barrier(clients)
+
+    def client():
+        barrier.wait()
+        for _ in range(logins_per_client):
+            start = time.perf_counter()
+            try:
+                assert verify(password, hashed)
+            except HasherBusyError:
+                with lock:
+                    rejected[0] += 1
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        for future in [executor.submit(client) for _ in range(clients)]:
+            future.result()
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    return {
+        'completed': len(latencies),
+        'rejected': rejected[0],
+        'seconds': elapsed,
+        'logins_per_second': len(latencies) / elapsed,
+        'median_ms': statistics.median(latencies_ms) if latencies_ms else None,
+        'p95_ms': latencies_ms[int(0.95 * (len(latencies_ms) - 1))] if latencies_ms else None,
+    }
+
+
+def run(rounds, clients, logins_per_client, workers, max_queue):
+    password = b"Admin@2025!"
+    results = []
+    for cost in rounds:
+        hashed = bcrypt.hashpw(password, bcrypt.gensalt(cost))
+        result = {'rounds': cost, 'clients': clients}
+        result['inline'] = login_burst(inline_login, password, hashed, clients, logins_per_client)
+        for n_workers in workers:
+            hasher = PasswordHasher(max_workers=n_workers, max_queue=max_queue, rounds=cost)
+            result[f'pool_{n_workers}'] = login_burst(hasher.verify, password, hashed, clients, logins_per_client)
+            hasher.close()
+        for name, stats in result.items():
+            if isinstance(stats, dict):
+                print(f"rounds={cost:<3} {name:<8} {stats['logins_per_second']:>8.1f} logins/s  "
+                      f"rejected={stats['rejected']:<4} p95={stats['p95_ms'] or 0:.0f}ms")
+        results.append(result)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure login throughput with inline and pooled bcrypt verification.")
+    parser.add_argument('--rounds', type=int, nargs='+', default=[10, 12], help="bcrypt cost factors to compare")
+    parser.add_argument('--clients', type=int, default=16, help="Concurrent sessions logging in")
+    parser.add_argument('--logins-per-client', type=int, default=5)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help="Hasher pool sizes to compare")
+    parser.add_argument('--max-queue', type=int, default=64, help="Waiting requests allowed before failing fast")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args.rounds, args.clients, args.logins_per_client, args.workers, args.max_queue)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import json
+
+import numpy as np
+
+from benchmarks.run_benchmarks import latency_summary, time_calls
+from rank_index import DEFAULT_MERGE_THRESHOLD, RankIndex
+
+
+def full_scan_standing(values, value):
+    """Baseline: count the students above and below with a pass over every value."""
+    return int((values > value).sum()) + 1, float((values < value).mean() * 100)
+
+
+def sort_per_request_top(values, n):
+    """Baseline: sort the class on every request to read its top ``n``."""
+    return np.sort(values)[::-1][:n]
+
+
+def run(sizes, queries, updates, top_n, merge_threshold, seed=42):
+    results = []
+    for size in sizes:
+        rng = np.random.default_rng(seed)
+        user_ids = np.arange(1, size + 1)
+        values = np.round(rng.normal(7.0, 1.2, size).clip(0, 10), 2)
+        probes = iter(rng.uniform(0, 10, queries * 4))
+
+        build = time_calls(lambda: RankIndex(user_ids, values, merge_threshold=merge_threshold), 1)
+        index = RankIndex(user_ids, values, merge_threshold=merge_threshold)
+        result = {'students': size, 'build_ms': build[0] * 1000}
+        result['standing'] = latency_summary(time_calls(lambda: index.standing(next(probes), 1), queries))
+        result['top_n'] = latency_summary(time_calls(lambda: index.top(top_n), queries))
+        result['full_scan_standing'] = latency_summary(time_calls(lambda: full_scan_standing(values, next(probes)), queries))
+        result['sort_per_request_top_n'] = latency_summary(time_calls(lambda: sort_per_request_top(values, top_n), max(1, queries // 10)))
+
+        # Updates include the periodic merges; queries are measured again with pending changes
+        changes = iter(zip(rng.integers(1, size + 1, updates).tolist(), rng.uniform(0, 10, updates).tolist()))
+        result['update'] = latency_summary(time_calls(lambda: index.update(*next(changes)), updates))
+        result['standing_after_updates'] = latency_summary(time_calls(lambda: index.standing(next(probes), 1), queries))
+        result['top_n_after_updates'] = latency_summary(time_calls(lambda: index.top(top_n), queries))
+
+        print(f"{size:>9} students  build={result['build_ms']:.0f}ms  "
+              f"standing p95={result['standing']['p95_ms'] * 1000:.1f}us (scan {result['full_scan_standing']['p95_ms']:.2f}ms)  "
+              f"top{top_n} p95={result['top_n']['p95_ms'] * 1000:.1f}us (sort {result['sort_per_request_top_n']['p95_ms']:.1f}ms)  "
+              f"update median={result['update']['median_ms'] * 1000:.1f}us p95={result['update']['p95_ms'] * 1000:.1f}us")
+        results.append(result)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure rank, percentile and top-N lookups against full scans.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000], help="Class sizes to benchmark")
+    parser.add_argument('--queries', type=int, default=1000, help="Timed lookups per measurement")
+    parser.add_argument('--updates', type=int, default=20000, help="Timed score changes (includes merges)")
+    parser.add_argument('--top', type=int, default=10, help="Size of the top-N list")
+    parser.add_argument('--merge-threshold', type=int, default=DEFAULT_MERGE_THRESHOLD)
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.queries, args.updates, args.top, args.merge_threshold)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import sklearn
+
+from benchmarks.bench_class_aggregates import STRATEGIES as AGGREGATE_STRATEGIES
+from benchmarks.synthetic import load_sqlite_profiles, synthetic_goals, synthetic_profiles, synthetic_students
+from cgpa_calculator import calculate_required_marks, calculate_required_marks_bulk
+from compact_model import load_model
+from explanations import explain_exam_marks_batch
+from fast_inference import FastAttendancePredictor, FastExamPredictor, verify_equivalence
+from prediction import ATTENDANCE_FEATURES, predict_attendance_batch, predict_exam_marks_batch
+from storage import SqliteRepository
+from surrogate import write_surrogate
+from train_models import ARTIFACT_FILES, train_models
+
+# Cohort rows fed to the exam model: past attendance stands in for attendance, as in the app
+EXAM_INPUT_COLUMNS = ['previous_percentage', 'past_attendance', 'study_hours', 'commute_time', 'board_exam_marks', 'tuition_hours']
+
+
+def latency_summary(timings):
+    """Summarise per-call wall-times (seconds) in milliseconds."""
+    timings_ms = np.asarray(timings) * 1000
+    return {
+        'calls': len(timings),
+        'median_ms': float(statistics.median(timings_ms)),
+        'p95_ms': float(np.percentile(timings_ms, 95)),
+        'min_ms': float(timings_ms.min()),
+    }
+
+
+def time_calls(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def throughput(fn, rows, repeats):
+    """Best-of-``repeats`` wall-time for one call over ``rows`` rows, as rows/sec."""
+    best = min(time_calls(fn, repeats))
+    return {'rows': rows, 'best_seconds': best, 'rows_per_second': rows / best if best else None}
+
+
+def load_or_train_models(model_dir, seed, n_estimators):
+    """
+    Load the installed models, or train a fresh set on synthetic data when any is missing.
+
+    Returns:
+        tuple: ``(exam_model, scaler, attendance_model, source)``.
+    """
+    paths = {key: os.path.join(model_dir, filename) for key, filename in ARTIFACT_FILES.items()}
+    if all(os.path.exists(path) for path in paths.values()):
+        return load_model(paths['exam_model']), joblib.load(paths['scaler']), load_model(paths['attendance_model']), model_dir
+
+    logging.info(f"Models not found in {model_dir}; training {n_estimators}-tree forests on synthetic data")
+    artifacts, _ = train_models(synthetic_students(5000, seed=seed), n_estimators=n_estimators, random_state=seed)
+    return artifacts['exam_model'], artifacts['scaler'], artifacts['attendance_model'], 'trained in-process'
+
+
+def bench_prediction(exam_model, scaler, attendance_model, batch_sizes, repeats, seed):
+    cohort = synthetic_students(max(batch_sizes), seed=seed)
+    exam_rows = cohort[EXAM_INPUT_COLUMNS].to_numpy()
+    attendance_rows = cohort[ATTENDANCE_FEATURES].to_numpy()
+
+    # Single-row calls, shaped exactly like app.predict_exam_mark / app.predict_attendance
+    single_exam = [exam_rows[i % len(exam_rows)].tolist() for i in range(repeats)]
+    single_attendance = [attendance_rows[i % len(attendance_rows)].tolist() for i in range(repeats)]
+    exam_iter, attendance_iter = iter(single_exam), iter(single_attendance)
+    results = {
+        'predict_exam_mark_single': latency_summary(
+            time_calls(lambda: predict_exam_marks_batch(exam_model, scaler, [next(exam_iter)]), repeats)
+        ),
+        'predict_attendance_single': latency_summary(
+            time_calls(lambda: predict_attendance_batch(attendance_model, [next(attendance_iter)]), repeats)
+        ),
+        'predict_exam_mark_batch': [],
+        'predict_attendance_batch': [],
+    }
+
+    for size in batch_sizes:
+        exam_batch = exam_rows[:size]
+        attendance_batch = attendance_rows[:size]
+        results['predict_exam_mark_batch'].append(
+            throughput(lambda: predict_exam_marks_batch(exam_model, scaler, exam_batch), size, 3)
+        )
+        results['predict_attendance_batch'].append(
+            throughput(lambda: predict_attendance_batch(attendance_model, attendance_batch), size, 3)
+        )
+    return results
+
+
+def bench_fast_inference(exam_model, scaler, attendance_model, repeats, seed):
+    """Single-row latency of the plain-NumPy predictors next to the sklearn/pandas path."""
+    fast_exam, fast_attendance = FastExamPredictor(exam_model, scaler), FastAttendancePredictor(attendance_model)
+    max_difference = verify_equivalence(fast_exam, exam_model, scaler, fast_attendance, attendance_model)
+    cohort = synthetic_students(repeats, seed=seed)
+    exam_rows = cohort[EXAM_INPUT_COLUMNS].to_numpy().tolist()
+    attendance_rows = cohort[ATTENDANCE_FEATURES].to_numpy().tolist()
+    exam_iter, attendance_iter = iter(exam_rows), iter(attendance_rows)
+    results = {
+        'max_difference': max_difference,
+        'exam_single_fast': latency_summary(time_calls(lambda: fast_exam.predict_one(*next(exam_iter)), repeats)),
+        'attendance_single_fast': latency_summary(time_calls(lambda: fast_attendance.predict_one(*next(attendance_iter)), repeats)),
+    }
+    exam_iter, attendance_iter = iter(exam_rows), iter(attendance_rows)
+    results['exam_single_sklearn'] = latency_summary(
+        time_calls(lambda: predict_exam_marks_batch(exam_model, scaler, [next(exam_iter)]), repeats)
+    )
+    results['attendance_single_sklearn'] = latency_summary(
+        time_calls(lambda: predict_attendance_batch(attendance_model, [next(attendance_iter)]), repeats)
+    )
+    return results
+
+
+def bench_surrogate(exam_model, scaler, attendance_model, repeats, seed, tmp):
+    """Gridded surrogate: build time, error against the models, single-row and sweep latency."""
+    fast_exam = FastExamPredictor(exam_model, scaler)
+    surrogate = write_surrogate(os.path.join(tmp, 'surrogate'), exam_model, scaler, attendance_model)
+    exam_rows = synthetic_students(repeats, seed=seed)[EXAM_INPUT_COLUMNS].to_numpy()
+    sweep = np.repeat(exam_rows[:1], 61 * 41, axis=0)
+    sweep[:, 2] = np.tile(np.linspace(5, 20, 61), 41)
+    sweep[:, 5] = np.repeat(np.linspace(0, 10, 41), 61)
+    rows = iter(exam_rows.tolist())
+    results = {
+        'build_seconds': {name: table['build_seconds'] for name, table in surrogate.meta['tables'].items()},
+        'error': surrogate.meta['error'],
+        'exam_single_surrogate': latency_summary(time_calls(lambda: surrogate.predict_exam_one(*next(rows)), repeats)),
+    }
+    rows = iter(exam_rows.tolist())
+    results['exam_single_fast'] = latency_summary(time_calls(lambda: fast_exam.predict_one(*next(rows)), repeats))
+    results['heatmap_sweep_surrogate'] = latency_summary(time_calls(lambda: surrogate.predict_exam(sweep), 20))
+    results['heatmap_sweep_sklearn'] = latency_summary(time_calls(lambda: predict_exam_marks_batch(exam_model, scaler, sweep), 20))
+    return results
+
+
+def bench_explanations(exam_model, scaler, batch_sizes, repeats, seed):
+    """Explanation cost next to the prediction it explains, single-row and batched."""
+    exam_rows = synthetic_students(max(batch_sizes), seed=seed)[EXAM_INPUT_COLUMNS].to_numpy()
+    single = [exam_rows[i % len(exam_rows)].tolist() for i in range(repeats)]
+    rows = iter(single)
+    results = {
+        'explain_exam_mark_single': latency_summary(
+            time_calls(lambda: explain_exam_marks_batch(exam_model, scaler, [next(rows)]), repeats)
+        ),
+        'explain_exam_mark_batch': [],
+    }
+    for size in batch_sizes:
+        batch = exam_rows[:size]
+        results['explain_exam_mark_batch'].append(throughput(lambda: explain_exam_marks_batch(exam_model, scaler, batch), size, 3))
+    return results
+
+
+def bench_required_marks(n_students, seed):
+    goals = synthetic_goals(n_students, seed=seed)
+    rows = list(zip(*(goals[name].tolist() for name in
+                      ('current_cgpa', 'credits_completed', 'credits_remaining', 'target_cgpa', 'grading_scale'))))
+
+    def scalar():
+        for row in rows:
+            try:
+                calculate_required_marks(*row)
+            except ValueError:
+                pass
+
+    return {
+        'scalar': throughput(scalar, n_students, 3),
+        'bulk': throughput(lambda: calculate_required_marks_bulk(**goals), n_students, 3),
+    }
+
+
+def bench_compare_aggregation(sizes, repeats, seed, tmp):
+    results = []
+    for n_profiles in sizes:
+        repository = SqliteRepository.connect(os.path.join(tmp, f"class_{n_profiles}.db"), pool_size=1, migrate=True)
+        load_sqlite_profiles(repository, synthetic_profiles(n_profiles, seed=seed))
+        result = {'profiles': n_profiles}
+        for name, strategy in AGGREGATE_STRATEGIES.items():
+            result[name] = latency_summary(time_calls(lambda: strategy(repository), repeats))
+        results.append(result)
+        repository.close()
+    return results
+
+
+def bench_profile_round_trips(n_profiles, seed, tmp):
+    """Per-operation latency of the profile read/write paths the app uses, one profile at a time."""
+    repository = SqliteRepository.connect(os.path.join(tmp, "round_trips.db"), pool_size=1, migrate=True)
+    profiles = synthetic_profiles(n_profiles, seed=seed)
+    grades = np.column_stack([profiles[f'semester_{i}'] for i in range(1, 9)]).tolist()
+    user_ids = []
+    for i in range(n_profiles):
+        repository.create_user(f"user{i}", b"x", f"user{i}@example.com")
+        user_ids.append(repository.get_user_credentials(f"user{i}")[0])
+
+    timings = {name: [] for name in ('create_profile', 'get_profile', 'update_profile', 'save_predictions', 'save_grades')}
+
+    def timed(name, fn, *args):
+        start = time.perf_counter()
+        fn(*args)
+        timings[name].append(time.perf_counter() - start)
+
+    for i, user_id in enumerate(user_ids):
+        name, roll = profiles['full_name'][i], profiles['roll_number'][i]
+        timed('create_profile', repository.create_profile, user_id, name, roll, grades[i])
+        timed('get_profile', repository.get_profile, user_id)
+        timed('update_profile', repository.update_profile, user_id, name, roll, grades[-1 - i])
+        timed('save_predictions', repository.save_predictions, user_id, 75.0, 85.0)
+        timed('save_grades', repository.save_grades, user_id, grades[i])
+    repository.close()
+    return {name: latency_summary(values) for name, values in timings.items()}
+
+
+def run(args):
+    exam_model, scaler, attendance_model, model_source = load_or_train_models(args.model_dir, args.seed, args.n_estimators)
+    results = {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'sklearn': sklearn.__version__,
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+        },
+        'params': {**vars(args), 'models': model_source},
+    }
+
+    logging.info("Benchmarking predictions")
+    results['prediction'] = bench_prediction(exam_model, scaler, attendance_model, args.batch_sizes, args.repeats, args.seed)
+    logging.info("Benchmarking fast single-row inference")
+    results['fast_inference'] = bench_fast_inference(exam_model, scaler, attendance_model, args.repeats, args.seed)
+    logging.info("Benchmarking prediction explanations")
+    results['explanations'] = bench_explanations(exam_model, scaler, args.batch_sizes, args.repeats, args.seed)
+    logging.info("Benchmarking calculate_required_marks")
+    results['required_marks'] = bench_required_marks(args.goal_rows, args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        logging.info("Benchmarking the gridded surrogate")
+        results['surrogate'] = bench_surrogate(exam_model, scaler, attendance_model, args.repeats, args.seed, tmp)
+        logging.info("Benchmarking compare_scores aggregation")
+        results['compare_aggregation'] = bench_compare_aggregation(args.class_sizes, args.repeats, args.seed, tmp)
+        logging.info("Benchmarking profile round-trips")
+        results['profile_round_trips'] = bench_profile_round_trips(args.round_trips, args.seed, tmp)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the project benchmarks and write the results as JSON.")
+    parser.add_argument('--output', default='benchmark_results.json', help="JSON results file")
+    parser.add_argument('--model-dir', default='.', help="Directory holding the installed models")
+    parser.add_argument('--n-estimators', type=int, default=100, help="Trees per forest when training in-process")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeats', type=int, default=200, help="Calls per latency measurement")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[100, 10_000, 100_000])
+    parser.add_argument('--goal-rows', type=int, default=100_000, help="Students per calculate_required_marks run")
+    parser.add_argument('--class-sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--round-trips', type=int, default=500, help="Profiles written and read back")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    results = run(args)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    logging.info(f"Wrote benchmark results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+from storage import SEMESTER_COLUMNS
+
+
+def synthetic_students(n_samples, seed=42):
+    """
+    Generate a reproducible cohort shaped like sample_data.csv.
+
+    Uses the same distributions and target formulas as sample_data.py, from a local
+    generator so results do not depend on global NumPy state.
+    """
+    rng = np.random.default_rng(seed)
+    data = {
+        'roll_number': [f'R{i:07d}' for i in range(1, n_samples + 1)],
+        'previous_percentage': rng.beta(5, 2, n_samples) * 45 + 50,
+        'past_attendance': rng.beta(5, 2, n_samples) * 40 + 60,
+        'study_hours': rng.uniform(5, 20, n_samples),
+        'commute_time': rng.uniform(0, 2, n_samples),
+        'board_exam_marks': rng.beta(5, 2, n_samples) * 35 + 60,
+        'tuition_hours': rng.uniform(0, 10, n_samples),
+    }
+    data['attendance'] = (0.9 * data['past_attendance'] +
+                          0.05 * data['study_hours'] -
+                          0.05 * data['commute_time'] +
+                          rng.normal(0, 0.1, n_samples)).clip(60, 100)
+    data['exam_marks'] = (0.5 * data['previous_percentage'] +
+                          0.3 * data['attendance'] +
+                          0.1 * data['study_hours'] -
+                          0.05 * data['commute_time'] +
+                          0.1 * data['board_exam_marks'] +
+                          rng.normal(0, 0.1, n_samples)).clip(50, 100)
+    return pd.DataFrame(data)
+
+
+def synthetic_goals(n_students, seed=42):
+    """
+    Generate reproducible ``calculate_required_marks`` inputs, a mix of CGPA and percentage rows.
+
+    Returns:
+        dict: Argument name -> NumPy array.
+    """
+    rng = np.random.default_rng(seed)
+    grading_scale = np.where(rng.random(n_students) < 0.5, 'cgpa', 'percentage')
+    max_value = np.where(grading_scale == 'percentage', 100.0, 10.0)
+    credits_completed = rng.integers(0, 161, n_students)
+    return {
+        'current_cgpa': np.round(rng.uniform(0.5, 1.0, n_students) * max_value, 2),
+        'credits_completed': credits_completed,
+        'credits_remaining': 160 - credits_completed,
+        'target_cgpa': np.round(rng.uniform(0.6, 1.0, n_students) * max_value, 2),
+        'grading_scale': grading_scale,
+    }
+
+
+def synthetic_profiles(n_profiles, seed=42):
+    """
+    Generate reproducible StudentProfiles rows for benchmarks.
+
+    Students have completed between 0 and 8 semesters (grades beta-distributed towards the
+    top of the 10-point scale, like sample_data.py) and about 70% have saved predictions.
+
+    Returns:
+        dict: Column name -> NumPy array, with user ids 1..n_profiles.
+    """
+    rng = np.random.default_rng(seed)
+    completed = rng.integers(0, 9, n_profiles)
+    grades = np.round(rng.beta(5, 2, (n_profiles, 8)) * 6 + 4, 1)
+    grades[np.arange(8)[None, :] >= completed[:, None]] = 0.0
+
+    has_prediction = rng.random(n_profiles) < 0.7
+    profiles = {
+        'user_id': np.arange(1, n_profiles + 1),
+        'full_name': np.array([f"Student {i}" for i in range(1, n_profiles + 1)]),
+        'roll_number': np.array([f"R{i:07d}" for i in range(1, n_profiles + 1)]),
+        **{column: grades[:, i] for i, column in enumerate(SEMESTER_COLUMNS)},
+        'predicted_exam_marks': np.where(has_prediction, rng.uniform(40, 100, n_profiles), np.nan),
+        'predicted_attendance': np.where(has_prediction, rng.uniform(60, 100, n_profiles), np.nan),
+    }
+    return profiles
+
+
+def load_sqlite_profiles(repository, profiles, batch_size=50000):
+    """
+    Insert synthetic users and profiles straight into a SQLite repository, then fill in the
+    derived metrics and rebuild the aggregates.
+
+    Rows bypass the per-profile write path so large classes load in seconds.
+    """
+    n_profiles = len(profiles['user_id'])
+    columns = ['user_id', 'full_name', 'roll_number', *SEMESTER_COLUMNS, 'predicted_exam_marks', 'predicted_attendance']
+    with repository.transaction() as cursor:
+        for start in range(0, n_profiles, batch_size):
+            stop = min(start + batch_size, n_profiles)
+            user_ids = profiles['user_id'][start:stop].tolist()
+            cursor.executemany(
+                "INSERT INTO Users (user_id, username, password, email) VALUES (?, ?, ?, ?)",
+                [(user_id, f"user{user_id}", b"x", f"user{user_id}@example.com") for user_id in user_ids]
+            )
+            batch = [
+                [None if isinstance(value, float) and np.isnan(value) else value for value in row]
+                for row in zip(*(profiles[column][start:stop].tolist() for column in columns))
+            ]
+            cursor.executemany(
+                f"INSERT INTO StudentProfiles ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+                batch
+            )
+    repository.backfill_derived_metrics(batch_size=batch_size)
+    repository.rebuild_aggregates()
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def calculate_required_marks(current_cgpa, credits_completed, credits_remaining, target_cgpa, grading_scale='cgpa'):
     """
     Calculate required marks or CGPA points for remaining courses.
@@ -65,4 +68,148 @@ def calculate_required_marks(current_cgpa, credits_completed, credits_remaining,
         required_avg = required_avg_internal
 
     # Ensure the result is within valid bounds
-    return max(0, min(required_avg, max_value))
\ No newline at end of file
+    return max(0, min(required_avg, max_value))
+
+
+def clamp_grades(semester_grades):
+    """Convert stored semester grades to floats clamped to the 10-point scale [0.0, 10.0]."""
+    return [min(max(float(grade), 0.0), 10.0) for grade in semester_grades]
+
+
+def average_cgpa(semester_grades):
+    """
+    Average CGPA over completed semesters, as shown on the profile and comparison pages.
+
+    A semester counts as completed when its grade is above zero; the average is taken over
+    the first ``completed`` semesters.
+
+    Args:
+        semester_grades (list): Clamped grades for semesters 1-8.
+
+    Returns:
+        float: Average CGPA, or 0 if no semester is completed.
+    """
+    completed_semesters = sum(1 for grade in semester_grades if grade > 0)
+    return sum(semester_grades[:completed_semesters]) / completed_semesters if completed_semesters > 0 else 0
+
+
+def calculate_required_marks_bulk(current_cgpa, credits_completed, credits_remaining, target_cgpa, grading_scale='cgpa'):
+    """
+    Vectorized ``calculate_required_marks`` for a batch of students.
+
+    Each row is computed with the same operations, in the same order, as the scalar
+    function, so valid rows match it exactly. Invalid rows are flagged instead of raising.
+
+    Args:
+        current_cgpa (array-like): Current CGPA (0-10) or percentage (0-100%) per student.
+        credits_completed (array-like): Credits completed per student.
+        credits_remaining (array-like): Credits remaining per student.
+        target_cgpa (array-like): Target CGPA or percentage per student.
+        grading_scale (str or array-like): 'cgpa' or 'percentage', for all rows or per row.
+
+    Returns:
+        dict: Arrays with one entry per student:
+            - ``required``: Required average clamped to the scale, NaN for invalid rows
+              and rows with no remaining credits (where the scalar function returns None).
+            - ``infeasible``: The unclamped requirement exceeds the scale maximum.
+            - ``achieved``: The target is already reached (unclamped requirement <= 0).
+            - ``invalid``: The row fails validation (the scalar function would raise ValueError).
+    """
+    current_cgpa, credits_completed, credits_remaining, target_cgpa, grading_scale = np.broadcast_arrays(
+        np.asarray(current_cgpa, dtype=float),
+        np.asarray(credits_completed, dtype=float),
+        np.asarray(credits_remaining, dtype=float),
+        np.asarray(target_cgpa, dtype=float),
+        np.asarray(grading_scale),
+    )
+    is_percentage = grading_scale == 'percentage'
+    max_value = np.where(is_percentage, 100.0, 10.0)
+
+    # Input validation, mirroring the scalar checks
+    total_credits = credits_completed + credits_remaining
+    invalid = (
+        ~np.isin(grading_scale, ['cgpa', 'percentage'])
+        | ~((current_cgpa >= 0) & (current_cgpa <= max_value))
+        | ~((target_cgpa >= 0) & (target_cgpa <= max_value))
+        | (credits_completed < 0)
+        | (credits_remaining < 0)
+        | (total_credits == 0)
+    )
+
+    # Convert to a common scale (CGPA = Percentage / 9.5) for internal calculation
+    current_cgpa_internal = np.where(is_percentage, current_cgpa / 9.5, current_cgpa)
+    target_cgpa_internal = np.where(is_percentage, target_cgpa / 9.5, target_cgpa)
+
+    required_points = target_cgpa_internal * total_credits - current_cgpa_internal * credits_completed
+    has_remaining = credits_remaining != 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        required_avg_internal = required_points / np.where(has_remaining, credits_remaining, 1.0)
+    required_avg = np.where(is_percentage, required_avg_internal * 9.5, required_avg_internal)
+
+    valid = ~invalid & has_remaining
+    required = np.where(valid, np.maximum(0, np.minimum(required_avg, max_value)), np.nan)
+    return {
+        'required': required,
+        'infeasible': valid & (required_avg > max_value),
+        'achieved': valid & (required_avg <= 0),
+        'invalid': invalid,
+    }
+
+
+# Trend labels, matching the language keys used on the profile page
+TREND_IMPROVING = 'improving'
+TREND_DECLINING = 'declining'
+TREND_INCONSISTENT = 'inconsistent'
+
+
+def summarize_grades_bulk(semester_grades):
+    """
+    Vectorized profile summary for many students, computed as the profile page does.
+
+    Grades are clamped to [0, 10] and ``completed`` counts grades above zero. The average,
+    highest grade and trend are taken over the first ``completed`` semesters; the lowest grade
+    over the non-zero grades among them. Sums run left to right like the page's Python loops,
+    so results match it exactly.
+
+    Args:
+        semester_grades (array-like): Array of shape ``(n_students, 8)``.
+
+    Returns:
+        dict: Arrays with one entry per student: ``grades`` (clamped), ``completed``,
+        ``average_cgpa``, ``highest_grade``, ``lowest_grade`` (0 when there is nothing to
+        compare) and ``trend`` (one of the ``TREND_*`` labels, or None with fewer than two
+        completed semesters).
+    """
+    grades = np.clip(np.asarray(semester_grades, dtype=float), 0.0, 10.0)
+    n_students, n_semesters = grades.shape
+    rows = np.arange(n_students)
+    completed = (grades > 0).sum(axis=1)
+    has_completed = completed > 0
+    last = np.maximum(completed - 1, 0)
+    in_prefix = np.arange(n_semesters)[None, :] < completed[:, None]
+
+    average = np.zeros(n_students)
+    average[has_completed] = np.cumsum(grades, axis=1)[rows, last][has_completed] / completed[has_completed]
+
+    highest = np.where(in_prefix, grades, -np.inf).max(axis=1)
+    highest = np.where(has_completed, highest, 0.0)
+    lowest = np.where(in_prefix & (grades > 0), grades, np.inf).min(axis=1)
+    lowest = np.where(np.isfinite(lowest), lowest, 0.0)
+
+    # Average semester-to-semester change; only its sign picks the label
+    trend = np.full(n_students, None, dtype=object)
+    has_trend = completed >= 2
+    if n_semesters > 1:
+        difference_sums = np.cumsum(np.diff(grades, axis=1), axis=1)[rows, np.maximum(completed - 2, 0)]
+        trend[has_trend & (difference_sums > 0)] = TREND_IMPROVING
+        trend[has_trend & (difference_sums < 0)] = TREND_DECLINING
+        trend[has_trend & (difference_sums == 0)] = TREND_INCONSISTENT
+
+    return {
+        'grades': grades,
+        'completed': completed,
+        'average_cgpa': average,
+        'highest_grade': highest,
+        'lowest_grade': lowest,
+        'trend': trend,
+    }
@@ -0,0 +1,184 @@
+import argparse
+import json
+import os
+
+import joblib
+import numpy as np
+
+# Arrays written by export_forest, one .npy file each so they can be memory-mapped
+COMPACT_ARRAYS = ('children_left', 'children_right', 'feature', 'threshold', 'value', 'roots', 'feature_importances')
+COMPACT_META_FILE = 'forest.json'
+COMPACT_FORMAT_VERSION = 1
+COMPACT_SUFFIX = '_compact'
+
+
+class CompactForest:
+    """
+    A RandomForestRegressor flattened into contiguous node arrays.
+
+    All trees share one set of node arrays; child indices are global and ``roots`` holds
+    the index of each tree's root node. Leaves have ``children_left == -1``.
+    """
+
+    def __init__(self, children_left, children_right, feature, threshold, value, roots, feature_importances, max_depth):
+        self.children_left = children_left
+        self.children_right = children_right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.roots = roots
+        self.feature_importances_ = feature_importances
+        self.max_depth = max_depth
+        self.n_features_in_ = len(feature_importances)
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    def apply(self, X):
+        """Return the leaf index reached in every tree, shape ``(n_samples, n_estimators)``."""
+        # Trees split on float32 features, exactly as sklearn does
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.repeat(np.asarray(self.roots)[None, :], X.shape[0], axis=0)
+
+        for _ in range(self.max_depth):
+            left = self.children_left[nodes]
+            is_leaf = left == -1
+            if is_leaf.all():
+                break
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(is_leaf, nodes, np.where(go_left, left, self.children_right[nodes]))
+        return nodes
+
+    def predict(self, X):
+        leaf_values = self.value[self.apply(X)]
+        # Accumulate tree by tree, in the same order as sklearn, so results match bit for bit
+        predictions = np.zeros(leaf_values.shape[0])
+        for tree in range(leaf_values.shape[1]):
+            predictions += leaf_values[:, tree]
+        predictions /= leaf_values.shape[1]
+        return predictions
+
+
+def flatten_forest(forest):
+    """
+    Flatten a fitted RandomForestRegressor into a ``CompactForest`` held in memory.
+
+    Raises:
+        ValueError: If the forest has more than one output.
+    """
+    if forest.n_outputs_ != 1:
+        raise ValueError("Only single-output forests can be flattened")
+
+    children_left, children_right, feature, threshold, value, roots = [], [], [], [], [], []
+    offset = 0
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        left = tree.children_left.astype(np.int64)
+        right = tree.children_right.astype(np.int64)
+        leaf = left == -1
+        children_left.append(np.where(leaf, -1, left + offset))
+        children_right.append(np.where(leaf, -1, right + offset))
+        # Leaves carry a negative feature id; point them at column 0 so lookups stay in bounds
+        feature.append(np.where(leaf, 0, tree.feature).astype(np.int64))
+        threshold.append(tree.threshold.astype(np.float64))
+        value.append(tree.value[:, 0, 0].astype(np.float64))
+        roots.append(offset)
+        offset += tree.node_count
+
+    return CompactForest(
+        children_left=np.concatenate(children_left),
+        children_right=np.concatenate(children_right),
+        feature=np.concatenate(feature),
+        threshold=np.concatenate(threshold),
+        value=np.concatenate(value),
+        roots=np.asarray(roots, dtype=np.int64),
+        feature_importances=np.asarray(forest.feature_importances_, dtype=np.float64),
+        max_depth=max(estimator.tree_.max_depth for estimator in forest.estimators_),
+    )
+
+
+def export_forest(forest, path):
+    """Write a fitted forest (or ``CompactForest``) to ``path`` as a directory of .npy arrays."""
+    compact = forest if isinstance(forest, CompactForest) else flatten_forest(forest)
+    os.makedirs(path, exist_ok=True)
+    arrays = {
+        'children_left': compact.children_left,
+        'children_right': compact.children_right,
+        'feature': compact.feature,
+        'threshold': compact.threshold,
+        'value': compact.value,
+        'roots': compact.roots,
+        'feature_importances': compact.feature_importances_,
+    }
+    for name in COMPACT_ARRAYS:
+        np.save(os.path.join(path, f"{name}.npy"), np.ascontiguousarray(arrays[name]))
+    with open(os.path.join(path, COMPACT_META_FILE), 'w') as f:
+        json.dump({
+            'format_version': COMPACT_FORMAT_VERSION,
+            'n_estimators': compact.n_estimators,
+            'n_nodes': int(len(compact.value)),
+            'max_depth': int(compact.max_depth),
+        }, f, indent=2)
+    return compact
+
+
+def load_forest(path, mmap_mode='r'):
+    """
+    Load a forest written by ``export_forest``.
+
+    Args:
+        path (str): Export directory.
+        mmap_mode (str or None): Passed to ``np.load``; the default memory-maps the node
+            arrays so start-up cost does not grow with the size of the forest.
+
+    Raises:
+        ValueError: If the export was written by an incompatible format version.
+    """
+    with open(os.path.join(path, COMPACT_META_FILE)) as f:
+        meta = json.load(f)
+    if meta['format_version'] != COMPACT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported compact forest format version {meta['format_version']}")
+    arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode) for name in COMPACT_ARRAYS}
+    return CompactForest(
+        children_left=arrays['children_left'],
+        children_right=arrays['children_right'],
+        feature=arrays['feature'],
+        threshold=arrays['threshold'],
+        value=arrays['value'],
+        roots=np.asarray(arrays['roots']),
+        feature_importances=np.asarray(arrays['feature_importances']),
+        max_depth=meta['max_depth'],
+    )
+
+
+def load_model(pickle_path, mmap_mode='r', prefer_compact=False):
+    """
+    Load a pickled model, or its compact export when asked to prefer it.
+
+    With ``prefer_compact``, ``exam_model.pkl`` is looked up as ``exam_model_compact/``
+    first. The compact format starts fast and shares memory-mapped pages between processes,
+    but ``CompactForest.predict`` is several times slower than sklearn on large batches, so
+    only the app (start-up and single-student predictions) opts in; batch jobs keep the
+    sklearn estimator.
+    """
+    compact_path = os.path.splitext(pickle_path)[0] + COMPACT_SUFFIX
+    if prefer_compact and os.path.isdir(compact_path):
+        return load_forest(compact_path, mmap_mode=mmap_mode)
+    return joblib.load(pickle_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a pickled RandomForest to the compact memory-mappable format.")
+    parser.add_argument('model', help="Pickled RandomForestRegressor, e.g. exam_model.pkl")
+    parser.add_argument('--output', help="Export directory (defaults to <model>_compact next to the pickle)")
+    args = parser.parse_args(argv)
+
+    output = args.output or os.path.splitext(args.model)[0] + COMPACT_SUFFIX
+    compact = export_forest(joblib.load(args.model), output)
+    print(f"Exported {compact.n_estimators} trees ({len(compact.value)} nodes) to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+
+from fast_inference import verification_inputs
+from prediction import ATTENDANCE_FEATURES, EXAM_FEATURES
+
+# Small in-process stand-ins for the installed models, trained on the same features so the
+# tests do not depend on the pickles in the project directory
+
+
+@pytest.fixture(scope='session')
+def exam_inputs():
+    return verification_inputs(EXAM_FEATURES, n_samples=400, seed=1)
+
+
+@pytest.fixture(scope='session')
+def exam_targets(exam_inputs):
+    rng = np.random.default_rng(2)
+    return 0.6 * exam_inputs[:, 0] + 0.2 * exam_inputs[:, 1] + exam_inputs[:, 2] + rng.normal(0, 3, len(exam_inputs))
+
+
+@pytest.fixture(scope='session')
+def scaler(exam_inputs):
+    return StandardScaler().fit(pd.DataFrame(exam_inputs, columns=EXAM_FEATURES))
+
+
+@pytest.fixture(scope='session')
+def exam_model(exam_inputs, exam_targets, scaler):
+    scaled = scaler.transform(pd.DataFrame(exam_inputs, columns=EXAM_FEATURES))
+    return RandomForestRegressor(n_estimators=10, max_depth=8, random_state=0).fit(scaled, exam_targets)
+
+
+@pytest.fixture(scope='session')
+def linear_exam_model(exam_inputs, exam_targets):
+    """LinearRegression on five raw features, like ``trained_model.pkl``."""
+    features = [name for name in EXAM_FEATURES if name != 'commute_time']
+    frame = pd.DataFrame(exam_inputs, columns=EXAM_FEATURES)[features]
+    return LinearRegression().fit(frame, exam_targets)
+
+
+@pytest.fixture(scope='session')
+def attendance_model():
+    X = verification_inputs(ATTENDANCE_FEATURES, n_samples=400, seed=3)
+    rng = np.random.default_rng(4)
+    y = X[:, 0] + 0.5 * X[:, 1] - 5 * X[:, 2] + rng.normal(0, 2, len(X))
+    return RandomForestRegressor(n_estimators=10, max_depth=8, random_state=0).fit(
+        pd.DataFrame(X, columns=ATTENDANCE_FEATURES), y
+    )
@@ -0,0 +1,156 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from instrumentation import increment, span
+
+
+class PoolExhaustedError(Exception):
+    """Raised when no connection becomes free within the acquire timeout."""
+
+
+class ConnectionPool:
+    """
+    A bounded, thread-safe pool of DB-API connections.
+
+    Connections are created lazily by ``connect`` up to ``max_size``. Idle connections are
+    reused most-recently-used first, closed once they have been idle for ``idle_timeout``
+    seconds, and health-checked before reuse when they have been idle for longer than
+    ``health_check_interval`` seconds. Works with any DB-API driver (pyodbc, sqlite3, ...).
+    """
+
+    def __init__(self, connect, max_size=10, acquire_timeout=10.0, idle_timeout=300.0,
+                 health_check_interval=30.0, health_check_query="SELECT 1"):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self._connect = connect
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.health_check_query = health_check_query
+
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._idle = []  # (connection, last_used) pairs, oldest first
+        self._closed = False
+        self._stats = {'created': 0, 'reused': 0, 'evicted': 0, 'discarded': 0, 'in_use': 0}
+
+    def acquire(self):
+        """
+        Check out a connection, creating one if no healthy idle connection is available.
+
+        Raises:
+            PoolExhaustedError: If ``max_size`` connections stay checked out for ``acquire_timeout`` seconds.
+        """
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        with span('db.acquire'):
+            if not self._slots.acquire(timeout=self.acquire_timeout):
+                increment('db.pool_exhausted')
+                raise PoolExhaustedError(f"No database connection available after {self.acquire_timeout}s (pool size {self.max_size})")
+            try:
+                conn = self._checkout_idle()
+                if conn is None:
+                    conn = self._connect()
+                    increment('db.connections_opened')
+                    with self._lock:
+                        self._stats['created'] += 1
+                with self._lock:
+                    self._stats['in_use'] += 1
+                return conn
+            except BaseException:
+                self._slots.release()
+                raise
+
+    def release(self, conn, discard=False):
+        """
+        Return a connection to the pool.
+
+        Any open transaction is rolled back. The connection is closed instead of pooled when
+        ``discard`` is set or the rollback fails.
+        """
+        try:
+            if not discard:
+                try:
+                    conn.rollback()
+                except Exception:
+                    discard = True
+            with self._lock:
+                self._stats['in_use'] -= 1
+                if not discard and not self._closed:
+                    self._idle.append((conn, time.monotonic()))
+                    conn = None
+            if conn is not None:
+                self._close(conn, 'discarded')
+            self.evict_idle()
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the duration of a ``with`` block."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def evict_idle(self):
+        """Close connections that have been idle for longer than ``idle_timeout``."""
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._lock:
+            stale = [conn for conn, last_used in self._idle if last_used < cutoff]
+            self._idle = [(conn, last_used) for conn, last_used in self._idle if last_used >= cutoff]
+        for conn in stale:
+            self._close(conn, 'evicted')
+
+    def close(self):
+        """Close every idle connection and refuse further checkouts."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._close(conn, 'evicted')
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, 'idle': len(self._idle), 'max_size': self.max_size}
+
+    def _checkout_idle(self):
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                conn, last_used = self._idle.pop()
+            idle_for = now - last_used
+            if idle_for > self.idle_timeout:
+                self._close(conn, 'evicted')
+                continue
+            if idle_for > self.health_check_interval and not self._is_healthy(conn):
+                self._close(conn, 'discarded')
+                continue
+            with self._lock:
+                self._stats['reused'] += 1
+            return conn
+
+    def _is_healthy(self, conn):
+        try:
+            cursor = conn.cursor()
+            cursor.execute(self.health_check_query)
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except Exception as e:
+            logging.warning(f"Dropping unhealthy pooled connection: {e}")
+            return False
+
+    def _close(self, conn, reason):
+        with self._lock:
+            self._stats[reason] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
@@ -0,0 +1,142 @@
+import weakref
+
+import numpy as np
+
+from compact_model import CompactForest, flatten_forest
+from instrumentation import span
+from prediction import ATTENDANCE_FEATURES, EXAM_FEATURES, apply_exam_boost, feature_frame
+
+# Flattened copies of pickled forests, so a sklearn model is only flattened once
+_flattened = weakref.WeakKeyDictionary()
+
+
+def forest_contributions(forest, X):
+    """
+    Path-based attributions for a random forest.
+
+    Every split a sample passes through moves the tree's estimate from the parent node's
+    value to the child's; that change is credited to the split feature. Averaged over the
+    trees, ``base + contributions.sum(axis=1)`` equals the forest's prediction.
+
+    Args:
+        forest: ``CompactForest`` or fitted single-output ``RandomForestRegressor``.
+        X (array-like): Model inputs, shape ``(n_samples, n_features)``.
+
+    Returns:
+        tuple: ``(base, contributions)``: the forest's mean root value and an array of shape
+        ``(n_samples, n_features)``.
+    """
+    if not isinstance(forest, CompactForest):
+        if forest not in _flattened:
+            _flattened[forest] = flatten_forest(forest)
+        forest = _flattened[forest]
+
+    # Trees split on float32 features, exactly as sklearn does
+    X = np.asarray(X, dtype=np.float32)
+    n_samples, n_features = X.shape
+    rows = np.arange(n_samples)[:, None]
+    nodes = np.repeat(np.asarray(forest.roots)[None, :], n_samples, axis=0)
+    # Flat (sample, feature) slot of every tree's current split, for np.bincount
+    slot_base = rows * n_features
+    contributions = np.zeros(n_samples * n_features)
+
+    for _ in range(forest.max_depth):
+        left = forest.children_left[nodes]
+        is_leaf = left == -1
+        if is_leaf.all():
+            break
+        split_feature = forest.feature[nodes]
+        go_left = X[rows, split_feature] <= forest.threshold[nodes]
+        children = np.where(is_leaf, nodes, np.where(go_left, left, forest.children_right[nodes]))
+        change = forest.value[children] - forest.value[nodes]
+        contributions += np.bincount((slot_base + split_feature).ravel(), weights=change.ravel(),
+                                     minlength=n_samples * n_features)
+        nodes = children
+
+    base = float(np.mean(forest.value[forest.roots]))
+    return base, contributions.reshape(n_samples, n_features) / len(forest.roots)
+
+
+def linear_contributions(model, X):
+    """
+    Attributions for a linear model: each coefficient times its input.
+
+    For ``trained_model.pkl`` (a LinearRegression on five raw features) the inputs are used
+    as given; for models trained on scaled features pass the scaled inputs.
+
+    Returns:
+        tuple: ``(base, contributions)``: the intercept and ``coef_ * X``.
+    """
+    X = np.asarray(X, dtype=float)
+    return float(np.ravel(model.intercept_)[0]), X * np.ravel(model.coef_)
+
+
+def model_contributions(model, X):
+    """Dispatch to ``linear_contributions`` or ``forest_contributions`` by model type."""
+    if hasattr(model, 'coef_'):
+        return linear_contributions(model, X)
+    if isinstance(model, CompactForest) or hasattr(model, 'estimators_'):
+        return forest_contributions(model, X)
+    raise TypeError(f"Cannot explain a {type(model).__name__}")
+
+
+def explain_exam_marks_batch(exam_model, scaler, data):
+    """
+    Explain exam mark predictions for many students, as ``predict_exam_marks_batch`` makes them.
+
+    Contributions are computed on the scaled features the model sees but reported against
+    the original feature names. The boosting rule is reported separately as ``adjustment``,
+    so ``base + contributions.sum(axis=1) + adjustment == prediction`` for every student.
+
+    Returns:
+        dict: ``features`` (names), ``base`` (float), ``contributions`` (n_samples x n_features),
+        ``adjustment`` and ``prediction`` (arrays).
+    """
+    features = feature_frame(data, EXAM_FEATURES)
+    with span('model.explain_exam'):
+        base, contributions = model_contributions(exam_model, scaler.transform(features))
+        raw = base + contributions.sum(axis=1)
+        prediction = apply_exam_boost(raw, features['previous_percentage'].to_numpy(), features['attendance'].to_numpy())
+    return {
+        'features': list(EXAM_FEATURES),
+        'base': base,
+        'contributions': contributions,
+        'adjustment': prediction - raw,
+        'prediction': prediction,
+    }
+
+
+def explain_attendance_batch(attendance_model, data):
+    """
+    Explain attendance predictions for many students, as ``predict_attendance_batch`` makes them.
+
+    Clamping to [0, 100] is reported as ``adjustment``. Same return shape as
+    ``explain_exam_marks_batch``.
+    """
+    features = feature_frame(data, ATTENDANCE_FEATURES)
+    with span('model.explain_attendance'):
+        base, contributions = model_contributions(attendance_model, features.to_numpy())
+        raw = base + contributions.sum(axis=1)
+        prediction = np.clip(raw, 0, 100)
+    return {
+        'features': list(ATTENDANCE_FEATURES),
+        'base': base,
+        'contributions': contributions,
+        'adjustment': prediction - raw,
+        'prediction': prediction,
+    }
+
+
+def explanation_row(explanation, i=0):
+    """
+    One student's explanation from a batch, as plain floats.
+
+    Returns:
+        dict: ``base``, ``contributions`` (feature name -> value), ``adjustment`` and ``prediction``.
+    """
+    return {
+        'base': explanation['base'],
+        'contributions': dict(zip(explanation['features'], explanation['contributions'][i].tolist())),
+        'adjustment': float(explanation['adjustment'][i]),
+        'prediction': float(explanation['prediction'][i]),
+    }
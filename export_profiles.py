@@ -0,0 +1,96 @@
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from score_cohort import PredictionWriter
+from storage import DERIVED_COLUMNS, SEMESTER_COLUMNS, create_repository, derived_metrics
+
+# StudentProfiles columns the export reads
+SOURCE_COLUMNS = ['user_id', 'full_name', 'roll_number', *SEMESTER_COLUMNS, 'predicted_exam_marks', 'predicted_attendance',
+                  'updated_at', *DERIVED_COLUMNS]
+
+EXPORT_COLUMNS = [
+    'user_id', 'full_name', 'roll_number', *SEMESTER_COLUMNS,
+    'completed_semesters', 'average_cgpa', 'highest_grade', 'lowest_grade', 'trend',
+    'predicted_exam_marks', 'predicted_attendance', 'updated_at',
+]
+
+
+def summarize_profiles(rows):
+    """
+    Turn a batch of ``SOURCE_COLUMNS`` rows into export records with derived metrics.
+
+    The derived metrics are the ones stored with each profile (``DERIVED_COLUMNS``); rows
+    written before those columns existed (not yet backfilled) are computed from their grades
+    with ``derived_metrics``, as ``StudentProfile.metrics`` does. Grades are exported clamped
+    to [0, 10], as on the profile page; predictions as stored, None when not yet made.
+
+    Returns:
+        pd.DataFrame: One row per profile, columns in ``EXPORT_COLUMNS`` order.
+    """
+    profiles = pd.DataFrame.from_records(rows, columns=SOURCE_COLUMNS)
+    grades = profiles[SEMESTER_COLUMNS].to_numpy(dtype=float)
+    missing = profiles['completed_semesters'].isna().to_numpy()
+    if missing.any():
+        profiles[DERIVED_COLUMNS] = profiles[DERIVED_COLUMNS].astype(object)
+        profiles.loc[missing, DERIVED_COLUMNS] = derived_metrics(grades[missing])
+    export = profiles[['user_id', 'full_name', 'roll_number']].copy()
+    for i, column in enumerate(SEMESTER_COLUMNS):
+        export[column] = np.clip(grades[:, i], 0.0, 10.0)
+    export['completed_semesters'] = pd.to_numeric(profiles['completed_semesters']).astype('int64')
+    for column in ['average_cgpa', 'highest_grade', 'lowest_grade']:
+        export[column] = pd.to_numeric(profiles[column]).astype(float)
+    export['trend'] = profiles['grade_trend'].astype('string')
+    export['predicted_exam_marks'] = pd.to_numeric(profiles['predicted_exam_marks'])
+    export['predicted_attendance'] = pd.to_numeric(profiles['predicted_attendance'])
+    export['updated_at'] = profiles['updated_at'].astype('string')
+    return export[EXPORT_COLUMNS]
+
+
+def export_profiles(repository, output_path, batch_size=10000):
+    """
+    Stream every profile with its derived metrics to a CSV or Parquet file.
+
+    Returns:
+        dict: ``rows``, ``seconds`` and ``rows_per_second``.
+    """
+    writer = PredictionWriter(output_path)
+    rows = 0
+    start = time.perf_counter()
+    try:
+        for batch in repository.iter_profile_batches(SOURCE_COLUMNS, batch_size):
+            writer.write(summarize_profiles(batch))
+            rows += len(batch)
+            elapsed = time.perf_counter() - start
+            logging.info(f"{rows} profiles exported ({rows / elapsed:,.0f} rows/sec)")
+    finally:
+        writer.close()
+
+    seconds = time.perf_counter() - start
+    return {'rows': rows, 'seconds': seconds, 'rows_per_second': rows / seconds if seconds else 0.0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export all student profiles with CGPA, trend and predictions.")
+    parser.add_argument('output', help="Destination file (.csv or .parquet)")
+    parser.add_argument('--batch-size', type=int, default=10000, help="Rows fetched and written at a time")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    # Connect to the database (configured through STUDENT_DB_* environment variables)
+    repository = create_repository()
+    try:
+        summary = export_profiles(repository, args.output, batch_size=args.batch_size)
+    finally:
+        repository.close()
+    logging.info(
+        f"Exported {summary['rows']} profiles in {summary['seconds']:.2f}s "
+        f"({summary['rows_per_second']:,.0f} rows/sec) -> {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+import threading
+
+import numpy as np
+
+from compact_model import CompactForest, flatten_forest
+from instrumentation import increment, span
+from prediction import ATTENDANCE_FEATURES, EXAM_FEATURES, apply_exam_boost, predict_attendance_batch, predict_exam_marks_batch
+
+# Inputs used to check a fast predictor against the sklearn path: the prediction form's ranges
+VERIFY_RANGES = {
+    'previous_percentage': (50.0, 95.0),
+    'attendance': (60.0, 100.0),
+    'past_attendance': (60.0, 100.0),
+    'study_hours': (5.0, 20.0),
+    'commute_time': (0.0, 2.0),
+    'board_exam_marks': (60.0, 95.0),
+    'tuition_hours': (0.0, 10.0),
+}
+DEFAULT_TOLERANCE = 1e-9
+
+
+class FastForest:
+    """
+    Random forest evaluation on plain NumPy node arrays, without sklearn's input checks.
+
+    Same traversal and tree-order accumulation as ``CompactForest.predict``, so results
+    match sklearn bit for bit.
+    """
+
+    def __init__(self, forest):
+        if not isinstance(forest, CompactForest):
+            forest = flatten_forest(forest)
+        # Plain ndarray views: memory-mapped exports stay mapped but skip np.memmap's overhead
+        self.children_left = np.asarray(forest.children_left).view(np.ndarray)
+        self.children_right = np.asarray(forest.children_right).view(np.ndarray)
+        self.feature = np.asarray(forest.feature).view(np.ndarray)
+        self.threshold = np.asarray(forest.threshold).view(np.ndarray)
+        self.value = np.asarray(forest.value).view(np.ndarray)
+        self.roots = np.asarray(forest.roots, dtype=np.int64)
+        self.max_depth = forest.max_depth
+        self.n_features_in_ = forest.n_features_in_
+
+    def predict_row(self, x):
+        """Predict one float32 feature vector."""
+        nodes = self.roots
+        for _ in range(self.max_depth):
+            left = self.children_left[nodes]
+            is_leaf = left == -1
+            if is_leaf.all():
+                break
+            go_left = x[self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(is_leaf, nodes, np.where(go_left, left, self.children_right[nodes]))
+        # cumsum adds tree by tree, like CompactForest.predict
+        return float(np.cumsum(self.value[nodes])[-1] / len(nodes))
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.repeat(self.roots[None, :], X.shape[0], axis=0)
+        for _ in range(self.max_depth):
+            left = self.children_left[nodes]
+            is_leaf = left == -1
+            if is_leaf.all():
+                break
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(is_leaf, nodes, np.where(go_left, left, self.children_right[nodes]))
+        leaf_values = self.value[nodes]
+        predictions = np.zeros(leaf_values.shape[0])
+        for tree in range(leaf_values.shape[1]):
+            predictions += leaf_values[:, tree]
+        return predictions / leaf_values.shape[1]
+
+
+class FastLinear:
+    """A fitted linear regression reduced to its coefficients and intercept."""
+
+    def __init__(self, model):
+        self.coef = np.ravel(model.coef_).astype(float)
+        self.intercept = float(np.ravel(model.intercept_)[0])
+        self.n_features_in_ = len(self.coef)
+
+    def predict_row(self, x):
+        return float(np.dot(x, self.coef) + self.intercept)
+
+    def predict(self, X):
+        return np.asarray(X, dtype=float) @ self.coef + self.intercept
+
+
+def compile_model(model):
+    """
+    Extract a fitted model's parameters into a ``FastForest`` or ``FastLinear``.
+
+    Raises:
+        TypeError: If the model is neither a forest nor a linear model.
+    """
+    if hasattr(model, 'coef_'):
+        return FastLinear(model)
+    if isinstance(model, CompactForest) or hasattr(model, 'estimators_'):
+        return FastForest(model)
+    raise TypeError(f"No fast path for a {type(model).__name__}")
+
+
+class FastExamPredictor:
+    """
+    Exam mark predictions from plain NumPy: scaler mean/scale and model parameters are
+    extracted once, and each call fills a preallocated per-thread buffer.
+
+    Inputs are always the six raw ``EXAM_FEATURES``. Without a scaler the model gets them
+    unscaled, restricted to ``features`` (e.g. ``trained_model.pkl``, a linear model on five
+    of them). Produces the same numbers as the sklearn path; use ``verify_exam_predictor``
+    before relying on it.
+    """
+
+    def __init__(self, exam_model, scaler=None, features=EXAM_FEATURES):
+        self.model = compile_model(exam_model)
+        self.features = list(features)
+        if scaler is not None and self.features != EXAM_FEATURES:
+            raise ValueError("A scaled exam model must use every exam feature in order")
+        self.scaler = scaler
+        n_features = len(EXAM_FEATURES)
+        if scaler is not None:
+            self.mean = np.zeros(n_features) if scaler.mean_ is None else np.asarray(scaler.mean_, dtype=float)
+            self.scale = np.ones(n_features) if scaler.scale_ is None else np.asarray(scaler.scale_, dtype=float)
+        self.columns = None if self.features == EXAM_FEATURES else [EXAM_FEATURES.index(name) for name in self.features]
+        self._forest = isinstance(self.model, FastForest)
+        self._buffers = threading.local()
+
+    def _buffer(self):
+        buffer = getattr(self._buffers, 'row', None)
+        if buffer is None:
+            buffer = self._buffers.row = np.empty(len(EXAM_FEATURES))
+            self._buffers.row32 = np.empty(len(self.features), dtype=np.float32)
+        return buffer
+
+    def predict_one(self, previous_percentage, attendance, study_hours, commute_time, board_exam_marks, tuition_hours):
+        """Predict one student's exam marks, boosting rule included."""
+        row = self._buffer()
+        row[:] = (previous_percentage, attendance, study_hours, commute_time, board_exam_marks, tuition_hours)
+        with span('model.fast_predict_exam'):
+            if self.scaler is not None:
+                # Same operations as StandardScaler.transform
+                row -= self.mean
+                row /= self.scale
+            model_input = row if self.columns is None else row[self.columns]
+            if self._forest:
+                row32 = self._buffers.row32
+                row32[:] = model_input
+                model_input = row32
+            predicted = self.model.predict_row(model_input)
+        increment('predictions.exam')
+        return float(apply_exam_boost([predicted], [previous_percentage], [attendance])[0])
+
+    def predict(self, X):
+        """Predict a 2-D array of students with columns in ``EXAM_FEATURES`` order."""
+        X = np.asarray(X, dtype=float)
+        model_inputs = (X - self.mean) / self.scale if self.scaler is not None else X
+        if self.columns is not None:
+            model_inputs = model_inputs[:, self.columns]
+        return apply_exam_boost(self.model.predict(model_inputs), X[:, 0], X[:, 1])
+
+
+class FastAttendancePredictor:
+    """Attendance predictions from plain NumPy on a preallocated per-thread buffer."""
+
+    def __init__(self, attendance_model):
+        self.model = compile_model(attendance_model)
+        self._dtype = np.float32 if isinstance(self.model, FastForest) else float
+        self._buffers = threading.local()
+
+    def predict_one(self, past_attendance, study_hours, commute_time):
+        row = getattr(self._buffers, 'row', None)
+        if row is None:
+            row = self._buffers.row = np.empty(len(ATTENDANCE_FEATURES), dtype=self._dtype)
+        row[:] = (past_attendance, study_hours, commute_time)
+        with span('model.fast_predict_attendance'):
+            predicted = self.model.predict_row(row)
+        increment('predictions.attendance')
+        return min(max(predicted, 0.0), 100.0)
+
+    def predict(self, X):
+        """Predict a 2-D array of students with columns in ``ATTENDANCE_FEATURES`` order."""
+        return np.clip(self.model.predict(X), 0, 100)
+
+
+def verification_inputs(feature_names, n_samples=256, seed=0):
+    """Seeded random students spread over the prediction form's ranges."""
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.uniform(*VERIFY_RANGES[name], n_samples) for name in feature_names])
+
+
+def max_differences(predictor, inputs, expected):
+    """Largest absolute difference of a predictor's single-row and batch paths from ``expected``."""
+    return {
+        'one': max(abs(predictor.predict_one(*row) - value) for row, value in zip(inputs.tolist(), expected)),
+        'batch': float(np.abs(predictor.predict(inputs) - expected).max()),
+    }
+
+
+def _check_differences(differences, tolerance):
+    failed = {path: difference for path, difference in differences.items() if not difference <= tolerance}
+    if failed:
+        raise ValueError(f"Fast inference differs from sklearn: {failed}")
+    return differences
+
+
+def verify_exam_predictor(predictor, reference, n_samples=256, tolerance=DEFAULT_TOLERANCE):
+    """
+    Check a ``FastExamPredictor`` against ``reference``, a function mapping raw
+    ``EXAM_FEATURES`` rows to boosted marks through sklearn.
+
+    Returns:
+        dict: Largest absolute difference per path (``exam_one``, ``exam_batch``).
+
+    Raises:
+        ValueError: If any difference exceeds ``tolerance``.
+    """
+    inputs = verification_inputs(EXAM_FEATURES, n_samples)
+    differences = max_differences(predictor, inputs, reference(inputs))
+    return _check_differences({f'exam_{path}': value for path, value in differences.items()}, tolerance)
+
+
+def verify_attendance_predictor(predictor, attendance_model, n_samples=256, tolerance=DEFAULT_TOLERANCE):
+    """Check a ``FastAttendancePredictor`` against ``predict_attendance_batch``, like ``verify_exam_predictor``."""
+    inputs = verification_inputs(ATTENDANCE_FEATURES, n_samples)
+    differences = max_differences(predictor, inputs, predict_attendance_batch(attendance_model, inputs))
+    return _check_differences({f'attendance_{path}': value for path, value in differences.items()}, tolerance)
+
+
+def verify_equivalence(exam_predictor, exam_model, scaler, attendance_predictor, attendance_model,
+                       n_samples=256, tolerance=DEFAULT_TOLERANCE):
+    """
+    Check the fast predictors against ``predict_exam_marks_batch`` / ``predict_attendance_batch``.
+
+    Both the single-row and batch paths are compared on seeded inputs covering the form's ranges.
+
+    Returns:
+        dict: Largest absolute difference per path.
+
+    Raises:
+        ValueError: If any difference exceeds ``tolerance``.
+    """
+    return {
+        **verify_exam_predictor(exam_predictor, lambda X: predict_exam_marks_batch(exam_model, scaler, X), n_samples, tolerance),
+        **verify_attendance_predictor(attendance_predictor, attendance_model, n_samples, tolerance),
+    }
@@ -0,0 +1,278 @@
+import argparse
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from prediction import ATTENDANCE_FEATURES, predict_attendance_batch, predict_exam_marks_batch
+from score_cohort import (INPUT_COLUMNS, PASSTHROUGH_COLUMNS, PredictionWriter, exam_inputs, iter_chunks,
+                          load_scoring_models)
+
+# Inputs a student can act on: (lowest, highest, search step), matching the prediction form
+ADJUSTABLE_INPUTS = {
+    'study_hours': (5.0, 20.0, 0.5),
+    'tuition_hours': (0.0, 10.0, 0.5),
+    'commute_time': (0.0, 2.0, 0.1),
+}
+
+# Per-student target columns a cohort file may provide instead of the command-line defaults
+TARGET_COLUMNS = ['target_marks', 'target_attendance']
+
+DEFAULT_BATCH_SIZE = 1024
+DEFAULT_BUDGET_SECONDS = 0.25
+
+# Models loaded once per worker process by _init_worker
+_worker_models = None
+
+
+def candidate_grid(student, inputs=ADJUSTABLE_INPUTS):
+    """
+    Every combination of adjustable input values for one student, cheapest change first.
+
+    Each input is searched over its range at its step, plus the student's current value so
+    "no change" is always a candidate. The cost of a candidate is the sum of its changes,
+    each as a fraction of that input's range; ties go to candidates changing fewer inputs.
+
+    Returns:
+        tuple: ``(candidates, costs)``; candidates has one column per input, in ``inputs`` order.
+    """
+    current = np.array([float(student[name]) for name in inputs])
+    axes = [
+        np.unique(np.append(np.round(np.arange(low, high + step / 2, step), 6), value))
+        for value, (low, high, step) in zip(current, inputs.values())
+    ]
+    mesh = np.meshgrid(*axes, indexing='ij')
+    candidates = np.column_stack([values.ravel() for values in mesh])
+
+    changes = np.abs(candidates - current)
+    spans = np.array([high - low for low, high, _ in inputs.values()])
+    costs = np.round((changes / spans).sum(axis=1), 9)
+    order = np.lexsort(((changes > 0).sum(axis=1), costs))
+    return candidates[order], costs[order]
+
+
+def solve(exam_model, scaler, attendance_model, student, target_marks, target_attendance,
+          inputs=ADJUSTABLE_INPUTS, batch_size=DEFAULT_BATCH_SIZE, budget_seconds=DEFAULT_BUDGET_SECONDS,
+          predict_exam=None):
+    """
+    Find the smallest change to the adjustable inputs that reaches both targets.
+
+    Attendance only depends on some of the inputs, so it is predicted once for each distinct
+    combination of those and candidates that miss the attendance target are dropped up
+    front. The rest are scored with the exam model ``batch_size`` at a time, cheapest first.
+    The search stops at the first batch containing a candidate that meets both targets (the
+    cheapest such candidate is the answer), or once ``budget_seconds`` have passed; the
+    budget is checked between batches, so it can be overrun by at most one batch.
+
+    Args:
+        student (dict): The student's ``INPUT_COLUMNS`` values.
+        target_marks (float): Predicted exam marks to reach (%).
+        target_attendance (float): Predicted attendance to reach (%).
+        predict_exam (callable): Optional replacement for ``predict_exam_marks_batch`` that
+            takes the raw ``EXAM_FEATURES`` columns and returns boosted marks (e.g.
+            ``ModelVersion.predict_batch``); ``exam_model`` and ``scaler`` are then unused.
+
+    Returns:
+        dict: ``status`` ('reached', 'unreachable' or 'budget_exceeded'), the suggested
+        ``inputs`` and the non-zero ``changes`` to them, ``cost``, ``predicted_marks``,
+        ``predicted_attendance``, ``evaluated`` candidates and ``seconds``. When the targets
+        were not reached, the suggestion is the candidate that came closest.
+    """
+    start = time.perf_counter()
+    names = list(inputs)
+    candidates, costs = candidate_grid(student, inputs)
+
+    # Attendance for each distinct combination of the inputs the attendance model uses
+    attendance_inputs = [i for i, name in enumerate(names) if name in ATTENDANCE_FEATURES]
+    combinations, combination_of = np.unique(candidates[:, attendance_inputs], axis=0, return_inverse=True)
+    attendance_columns = {name: np.full(len(combinations), float(student[name])) for name in ATTENDANCE_FEATURES}
+    for column, i in enumerate(attendance_inputs):
+        attendance_columns[names[i]] = combinations[:, column]
+    attendance = predict_attendance_batch(attendance_model, attendance_columns)[combination_of.ravel()]
+
+    search = np.flatnonzero(attendance >= target_attendance)
+    if not len(search):
+        # No change reaches the attendance target; report the cheapest way to come closest
+        search = np.array([np.argmax(attendance)])
+
+    if predict_exam is None:
+        def predict_exam(columns):
+            return predict_exam_marks_batch(exam_model, scaler, columns)
+
+    status = 'unreachable'
+    best = None  # (shortfall, candidate index, predicted marks)
+    evaluated = 0
+    for offset in range(0, len(search), batch_size):
+        if offset and time.perf_counter() - start > budget_seconds:
+            status = 'budget_exceeded'
+            break
+        batch = search[offset:offset + batch_size]
+        columns = {name: np.full(len(batch), float(student[name])) for name in INPUT_COLUMNS}
+        for i, name in enumerate(names):
+            columns[name] = candidates[batch, i]
+        marks = predict_exam(exam_inputs(columns))
+        evaluated += len(batch)
+
+        # The first smallest shortfall is the cheapest candidate in this batch
+        shortfall = np.maximum(target_marks - marks, 0) + np.maximum(target_attendance - attendance[batch], 0)
+        i = int(np.argmin(shortfall))
+        if best is None or shortfall[i] < best[0]:
+            best = (shortfall[i], int(batch[i]), float(marks[i]))
+        if shortfall[i] == 0:
+            status = 'reached'
+            break
+
+    _, index, predicted_marks = best
+    predicted_attendance = float(attendance[index])
+    suggestion = dict(zip(names, candidates[index].tolist()))
+    return {
+        'status': status,
+        'inputs': suggestion,
+        'changes': {name: value - float(student[name]) for name, value in suggestion.items() if value != float(student[name])},
+        'cost': float(costs[index]),
+        'predicted_marks': predicted_marks,
+        'predicted_attendance': predicted_attendance,
+        'evaluated': evaluated,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def solve_chunk(chunk, exam_model, scaler, attendance_model, target_marks, target_attendance,
+                batch_size=DEFAULT_BATCH_SIZE, budget_seconds=DEFAULT_BUDGET_SECONDS):
+    """
+    Solve every student in a cohort chunk.
+
+    ``target_marks`` / ``target_attendance`` columns in the chunk override the defaults
+    for their rows.
+
+    Returns:
+        pd.DataFrame: Passthrough identifier columns, ``status``, ``suggested_<input>`` for
+        each adjustable input, ``change_cost``, ``predicted_exam_marks``,
+        ``predicted_attendance`` and ``solve_ms``.
+    """
+    targets = pd.DataFrame({
+        column: pd.to_numeric(chunk[column], errors='coerce').fillna(default) if column in chunk else default
+        for column, default in zip(TARGET_COLUMNS, (target_marks, target_attendance))
+    }, index=chunk.index)
+    records = []
+    for student, (marks_target, attendance_target) in zip(chunk[INPUT_COLUMNS].to_dict('records'),
+                                                           targets.itertuples(index=False, name=None)):
+        result = solve(exam_model, scaler, attendance_model, student, marks_target, attendance_target,
+                       batch_size=batch_size, budget_seconds=budget_seconds)
+        records.append({
+            'status': result['status'],
+            **{f'suggested_{name}': value for name, value in result['inputs'].items()},
+            'change_cost': result['cost'],
+            'predicted_exam_marks': result['predicted_marks'],
+            'predicted_attendance': result['predicted_attendance'],
+            'solve_ms': result['seconds'] * 1000,
+        })
+    result = chunk[[name for name in PASSTHROUGH_COLUMNS if name in chunk]].reset_index(drop=True)
+    return pd.concat([result, pd.DataFrame.from_records(records)], axis=1)
+
+
+def _init_worker(exam_model_path, attendance_model_path, scaler_path):
+    global _worker_models
+    _worker_models = load_scoring_models(exam_model_path, attendance_model_path, scaler_path)
+
+
+def _solve_in_worker(chunk, options):
+    return solve_chunk(chunk, *_worker_models, **options)
+
+
+def solve_file(input_path, output_path, target_marks, target_attendance, exam_model_path='exam_model.pkl',
+               attendance_model_path='attendance_model.pkl', scaler_path='scaler_exam.pkl', chunk_size=200,
+               workers=1, batch_size=DEFAULT_BATCH_SIZE, budget_seconds=DEFAULT_BUDGET_SECONDS):
+    """
+    Suggest the smallest input change for every student in a cohort file.
+
+    Chunks are solved in worker processes (``workers`` > 1) with a bounded window of
+    ``2 * workers`` chunks in flight, and written in input order, as in ``score_file``.
+
+    Returns:
+        dict: ``rows``, ``seconds``, ``rows_per_second``, a count per ``status`` and
+        ``p95_solve_ms``.
+    """
+    options = {'target_marks': target_marks, 'target_attendance': target_attendance,
+               'batch_size': batch_size, 'budget_seconds': budget_seconds}
+    writer = PredictionWriter(output_path)
+    statuses = {'reached': 0, 'unreachable': 0, 'budget_exceeded': 0}
+    solve_ms = []
+    rows = 0
+    start = time.perf_counter()
+
+    def record(solved):
+        nonlocal rows
+        writer.write(solved)
+        rows += len(solved)
+        for status, count in solved['status'].value_counts().items():
+            statuses[status] += int(count)
+        solve_ms.extend(solved['solve_ms'].tolist())
+        elapsed = time.perf_counter() - start
+        logging.info(f"{rows} students solved ({rows / elapsed:,.1f}/sec, {statuses['reached']} reach their targets)")
+
+    try:
+        if workers <= 1:
+            models = load_scoring_models(exam_model_path, attendance_model_path, scaler_path)
+            for chunk in iter_chunks(input_path, chunk_size, optional_columns=TARGET_COLUMNS):
+                record(solve_chunk(chunk, *models, **options))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(exam_model_path, attendance_model_path, scaler_path)) as executor:
+                pending = deque()
+                for chunk in iter_chunks(input_path, chunk_size, optional_columns=TARGET_COLUMNS):
+                    pending.append(executor.submit(_solve_in_worker, chunk, options))
+                    if len(pending) >= 2 * workers:
+                        record(pending.popleft().result())
+                while pending:
+                    record(pending.popleft().result())
+    finally:
+        writer.close()
+
+    seconds = time.perf_counter() - start
+    return {
+        'rows': rows,
+        'seconds': seconds,
+        'rows_per_second': rows / seconds if seconds else 0.0,
+        **statuses,
+        'p95_solve_ms': float(np.percentile(solve_ms, 95)) if solve_ms else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suggest the smallest change in study hours, tuition hours and "
+                                                 "commute time that reaches target marks and attendance, for a cohort.")
+    parser.add_argument('input', help="Cohort file shaped like sample_data.csv (.csv or .parquet); optional "
+                                      "target_marks / target_attendance columns override the defaults per student")
+    parser.add_argument('output', help="Suggestions file (.csv or .parquet)")
+    parser.add_argument('--target-marks', type=float, default=85.0)
+    parser.add_argument('--target-attendance', type=float, default=90.0)
+    parser.add_argument('--exam-model', default='exam_model.pkl')
+    parser.add_argument('--attendance-model', default='attendance_model.pkl')
+    parser.add_argument('--scaler', default='scaler_exam.pkl')
+    parser.add_argument('--chunk-size', type=int, default=200, help="Students per chunk")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes (0 = one per CPU)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Candidates scored per model call")
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_SECONDS * 1000, help="Search time allowed per student")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    workers = args.workers or os.cpu_count() or 1
+    summary = solve_file(
+        args.input, args.output, args.target_marks, args.target_attendance, exam_model_path=args.exam_model,
+        attendance_model_path=args.attendance_model, scaler_path=args.scaler, chunk_size=args.chunk_size,
+        workers=workers, batch_size=args.batch_size, budget_seconds=args.budget_ms / 1000
+    )
+    logging.info(
+        f"Solved {summary['rows']} students in {summary['seconds']:.1f}s ({summary['rows_per_second']:,.1f}/sec): "
+        f"{summary['reached']} reached, {summary['unreachable']} unreachable, "
+        f"{summary['budget_exceeded']} over budget; p95 {summary['p95_solve_ms']:.0f}ms per student -> {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from storage import SEMESTER_COLUMNS, create_repository
+
+REQUIRED_COLUMNS = ['full_name', 'roll_number', *SEMESTER_COLUMNS]
+USER_COLUMNS = ('user_id', 'username')
+
+
+def validate_chunk(chunk, user_ids_by_name, known_user_ids):
+    """
+    Validate and normalise one chunk of a registrar export.
+
+    Grades follow the profile form's rules: blank means the semester is not completed (0),
+    and values are clamped to [0, 10]. Rows are rejected for an unknown user, a missing
+    name or roll number, or a grade that is not a number.
+
+    Returns:
+        tuple: ``(accepted, rejected, clamped)``: a DataFrame with ``user_id``, ``full_name``,
+        ``roll_number`` and the semester columns; the rejected input rows with a ``reason``
+        column; and how many grades were clamped.
+    """
+    reasons = pd.Series('', index=chunk.index)
+
+    def reject(mask, reason):
+        reasons[mask & (reasons == '')] = reason
+
+    if 'user_id' in chunk:
+        user_ids = pd.to_numeric(chunk['user_id'], errors='coerce')
+    else:
+        user_ids = chunk['username'].str.strip().map(user_ids_by_name)
+    reject(~user_ids.isin(known_user_ids), 'unknown user')
+
+    full_name = chunk['full_name'].fillna('').str.strip()
+    roll_number = chunk['roll_number'].fillna('').str.strip()
+    reject(full_name == '', 'missing full_name')
+    reject(roll_number == '', 'missing roll_number')
+
+    grades = {}
+    clamped = 0
+    for column in SEMESTER_COLUMNS:
+        raw = chunk[column].fillna('').str.strip()
+        values = pd.to_numeric(raw.replace('', '0'), errors='coerce')
+        reject(values.isna(), f'{column} is not a number')
+        values = values.fillna(0.0)
+        clamped += int(((values < 0) | (values > 10)).sum())
+        grades[column] = values.clip(0.0, 10.0)
+
+    ok = reasons == ''
+    accepted = pd.DataFrame({
+        'user_id': user_ids[ok].astype(np.int64),
+        'full_name': full_name[ok],
+        'roll_number': roll_number[ok],
+        **{column: values[ok] for column, values in grades.items()},
+    })
+    rejected = chunk[~ok].assign(reason=reasons[~ok])
+    return accepted, rejected, clamped
+
+
+def claim_roll_numbers(accepted, roll_owner, user_roll):
+    """
+    Reject rows whose roll number already belongs to another student, in the database or
+    earlier in the file, and record the new owners of the accepted rows.
+
+    Returns:
+        tuple: ``(accepted, rejected_index)``.
+    """
+    keep = []
+    rejected_index = []
+    for index, user_id, roll in zip(accepted.index, accepted['user_id'].tolist(), accepted['roll_number'].tolist()):
+        owner = roll_owner.get(roll)
+        if owner is not None and owner != user_id:
+            rejected_index.append(index)
+            continue
+        previous_roll = user_roll.get(user_id)
+        if previous_roll is not None and previous_roll != roll:
+            roll_owner.pop(previous_roll, None)
+        roll_owner[roll] = user_id
+        user_roll[user_id] = roll
+        keep.append(index)
+    return accepted.loc[keep], rejected_index
+
+
+class RejectedRowsReport:
+    """Streams rejected rows, with their line number and reason, to a CSV file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+
+    def write(self, rows):
+        if rows.empty:
+            return
+        rows.to_csv(self.path, mode='a' if self.count else 'w', header=not self.count, index=False)
+        self.count += len(rows)
+
+
+def import_profiles(repository, path, report_path, chunk_size=50000):
+    """
+    Stream a registrar export into StudentProfiles, upserting one chunk per transaction.
+
+    The file needs ``user_id`` or ``username`` plus ``full_name``, ``roll_number`` and
+    ``semester_1`` .. ``semester_8``. Rows for the same user replace earlier ones. Class
+    aggregates are rebuilt once at the end.
+
+    Returns:
+        dict: ``imported``, ``rejected``, ``clamped``, ``seconds`` and ``rows_per_minute``.
+
+    Raises:
+        ValueError: If a required column is missing.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if not any(column in header for column in USER_COLUMNS):
+        missing.insert(0, 'user_id or username')
+    if missing:
+        raise ValueError(f"{path} is missing columns: {', '.join(missing)}")
+
+    users = repository.list_users()
+    user_ids_by_name = {username: user_id for user_id, username in users}
+    known_user_ids = set(user_ids_by_name.values())
+    roll_owner = dict(repository.list_roll_numbers())
+    user_roll = {user_id: roll for roll, user_id in roll_owner.items()}
+
+    report = RejectedRowsReport(report_path)
+    imported = clamped = rows_read = 0
+    start = time.perf_counter()
+    for chunk in pd.read_csv(path, chunksize=chunk_size, dtype=str, keep_default_na=False):
+        # Line numbers in the source file (line 1 is the header)
+        chunk.insert(0, 'line', np.arange(rows_read + 2, rows_read + 2 + len(chunk)))
+        rows_read += len(chunk)
+
+        accepted, rejected, chunk_clamped = validate_chunk(chunk, user_ids_by_name, known_user_ids)
+        accepted = accepted.drop_duplicates('user_id', keep='last')
+        accepted, taken = claim_roll_numbers(accepted, roll_owner, user_roll)
+        rejected = pd.concat([rejected, chunk.loc[taken].assign(reason='roll_number belongs to another student')])
+        report.write(rejected.sort_values('line'))
+
+        if not accepted.empty:
+            repository.upsert_profiles(list(accepted.itertuples(index=False, name=None)))
+        imported += len(accepted)
+        clamped += chunk_clamped
+
+        elapsed = time.perf_counter() - start
+        logging.info(f"{rows_read} rows read, {imported} imported, {report.count} rejected "
+                     f"({rows_read / elapsed * 60:,.0f} rows/min)")
+
+    logging.info("Rebuilding class aggregates")
+    repository.rebuild_aggregates()
+    seconds = time.perf_counter() - start
+    return {
+        'imported': imported,
+        'rejected': report.count,
+        'clamped': clamped,
+        'seconds': seconds,
+        'rows_per_minute': rows_read / seconds * 60 if seconds else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import student profiles and grades from a registrar CSV export.")
+    parser.add_argument('input', help="CSV with user_id or username, full_name, roll_number, semester_1..semester_8")
+    parser.add_argument('--rejected', default='rejected_profiles.csv', help="Report of rows that were not imported")
+    parser.add_argument('--chunk-size', type=int, default=50000, help="Rows validated and upserted per transaction")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    # Connect to the database (configured through STUDENT_DB_* environment variables)
+    repository = create_repository()
+    try:
+        summary = import_profiles(repository, args.input, args.rejected, chunk_size=args.chunk_size)
+    finally:
+        repository.close()
+    logging.info(
+        f"Imported {summary['imported']} profiles, rejected {summary['rejected']} rows"
+        f"{f' (see {args.rejected})' if summary['rejected'] else ''}, clamped {summary['clamped']} grades "
+        f"in {summary['seconds']:.1f}s ({summary['rows_per_minute']:,.0f} rows/min)"
+    )
+
+
+if __name__ == "__main__":
+    main()
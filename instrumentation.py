@@ -0,0 +1,150 @@
+import functools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# Environment switches for the optional reporting surfaces. Collection is always on.
+PANEL_ENV = 'STUDENT_METRICS_PANEL'
+LOG_INTERVAL_ENV = 'STUDENT_METRICS_LOG_INTERVAL'
+
+DEFAULT_WINDOW = 1024
+
+logger = logging.getLogger(__name__)
+
+
+class Metrics:
+    """
+    Thread-safe timing spans and counters for the app's hot paths.
+
+    Each span name keeps its most recent ``window`` durations in a ring buffer, so memory is
+    fixed and percentiles reflect recent traffic. Recording a sample is a ``perf_counter``
+    call, a lock and a deque append; percentiles are only computed when a summary is requested.
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW, log_interval=None):
+        self.window = window
+        self.log_interval = log_interval
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._span_counts = {}
+        self._counters = {}
+        self._last_log = time.monotonic()
+
+    @contextmanager
+    def span(self, name):
+        """Time the body of a ``with`` block under ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def timed(self, name):
+        """Decorator form of ``span``."""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record(self, name, seconds):
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+            samples.append(seconds)
+            self._span_counts[name] = self._span_counts.get(name, 0) + 1
+        self._maybe_log()
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def summary(self):
+        """
+        Snapshot of every span and counter.
+
+        Returns:
+            dict: ``spans`` maps name -> {count, window, p50_ms, p95_ms, max_ms} over the
+            recent window (``count`` is the lifetime total); ``counters`` maps name -> value.
+        """
+        with self._lock:
+            samples = {name: list(values) for name, values in self._samples.items()}
+            span_counts = dict(self._span_counts)
+            counters = dict(self._counters)
+
+        spans = {}
+        for name in sorted(samples):
+            values_ms = np.asarray(samples[name]) * 1000
+            p50, p95 = np.percentile(values_ms, [50, 95])
+            spans[name] = {
+                'count': span_counts[name],
+                'window': len(values_ms),
+                'p50_ms': float(p50),
+                'p95_ms': float(p95),
+                'max_ms': float(values_ms.max()),
+            }
+        return {'spans': spans, 'counters': dict(sorted(counters.items()))}
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._span_counts.clear()
+            self._counters.clear()
+
+    def log_summary(self):
+        report = self.summary()
+        for name, stats in report['spans'].items():
+            logger.info(
+                f"span {name}: n={stats['count']} p50={stats['p50_ms']:.2f}ms "
+                f"p95={stats['p95_ms']:.2f}ms max={stats['max_ms']:.2f}ms"
+            )
+        for name, value in report['counters'].items():
+            logger.info(f"counter {name}: {value}")
+
+    def _maybe_log(self):
+        if not self.log_interval:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_log < self.log_interval:
+                return
+            self._last_log = now
+        self.log_summary()
+
+
+def _log_interval_from_env():
+    value = os.environ.get(LOG_INTERVAL_ENV)
+    return float(value) if value else None
+
+
+# Process-wide registry used by app.py, prediction.py, storage.py and db_pool.py
+metrics = Metrics(log_interval=_log_interval_from_env())
+span = metrics.span
+timed = metrics.timed
+increment = metrics.increment
+
+
+def panel_enabled():
+    return os.environ.get(PANEL_ENV, '').lower() in ('1', 'true', 'yes')
+
+
+def render_panel(st):
+    """Show p50/p95 per section and the counters in a Streamlit sidebar expander."""
+    import pandas as pd
+
+    report = metrics.summary()
+    with st.sidebar.expander("Performance metrics"):
+        if report['spans']:
+            st.dataframe(pd.DataFrame.from_dict(report['spans'], orient='index').round(2))
+        if report['counters']:
+            st.dataframe(pd.DataFrame.from_dict(report['counters'], orient='index', columns=['value']))
+        if st.button("Reset metrics"):
+            metrics.reset()
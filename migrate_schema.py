@@ -0,0 +1,24 @@
+import argparse
+import logging
+
+from storage import create_repository
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Create or upgrade the database tables, columns and indexes this version of the app needs."
+    )
+    parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    # Connect to the database (configured through STUDENT_DB_* environment variables)
+    repository = create_repository(migrate=True)
+    try:
+        version = repository.schema_version()
+    finally:
+        repository.close()
+    logging.info(f"Database schema migrated to version {version}")
+
+
+if __name__ == "__main__":
+    main()
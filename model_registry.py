@@ -0,0 +1,384 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+import zlib
+from collections import deque
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from compact_model import flatten_forest, load_model
+from explanations import model_contributions
+from fast_inference import FastExamPredictor, verification_inputs, verify_exam_predictor
+from instrumentation import increment, span
+from prediction import EXAM_FEATURES, apply_exam_boost, feature_frame
+from prediction_cache import model_fingerprint
+
+# JSON file describing the exam model versions and routes (see load_registry_config)
+REGISTRY_ENV = 'STUDENT_MODEL_REGISTRY'
+# Share of predictions per version, e.g. "forest=90,linear=10"; overrides the file's routes
+ROUTES_ENV = 'STUDENT_MODEL_ROUTES'
+
+DEFAULT_VERSIONS = {
+    # RandomForest trained on scaled EXAM_FEATURES (train_models.py)
+    'forest': {'model': 'exam_model.pkl', 'scaler': 'scaler_exam.pkl'},
+    # LinearRegression on five raw features; its feature names come from the pickle
+    'linear': {'model': 'trained_model.pkl'},
+}
+DEFAULT_ROUTES = {'forest': 1.0}
+# The version that must load for the app to start
+PRIMARY_VERSION = 'forest'
+
+DEFAULT_CHECK_INTERVAL = 2.0
+DEFAULT_STATS_WINDOW = 1024
+
+
+class ModelVersion:
+    """
+    One loaded exam model version. Immutable once built, so a prediction that started on it
+    finishes on it even if a reload swaps in a newer version meanwhile.
+
+    Inputs are always the six ``EXAM_FEATURES`` in raw form; the version scales them if it has
+    a scaler and passes the model only the columns it was trained on. The exam boost rule is
+    applied to every version's output, as the app does.
+    """
+
+    def __init__(self, name, model_path, scaler_path=None, features=None):
+        self.name = name
+        self.model_path = model_path
+        self.scaler_path = scaler_path
+        self.fingerprint = model_fingerprint([path for path in (model_path, scaler_path) if path])
+        self.model = load_model(model_path, prefer_compact=True)
+        self.scaler = joblib.load(scaler_path) if scaler_path else None
+        names_in = getattr(self.model, 'feature_names_in_', None)
+        self.features = list(features or (names_in if names_in is not None else EXAM_FEATURES))
+        unknown = [feature for feature in self.features if feature not in EXAM_FEATURES]
+        if unknown:
+            raise ValueError(f"Model version '{name}' uses unknown features: {', '.join(unknown)}")
+        if self.scaler is not None and self.features != EXAM_FEATURES:
+            raise ValueError(f"Model version '{name}' has a scaler, so it must use every exam feature in order")
+        self._columns = [EXAM_FEATURES.index(feature) for feature in self.features]
+        self.loaded_at = time.time()
+        self.kind = type(self.model).__name__
+        # One flattened copy of a sklearn forest, shared by the fast path and the explanations
+        self._structure = flatten_forest(self.model) if hasattr(self.model, 'estimators_') else self.model
+
+        # Plain-NumPy evaluation when the model supports it and agrees with the reference path
+        try:
+            self._fast = FastExamPredictor(self._structure, self.scaler, self.features)
+            verify_exam_predictor(self._fast, self.predict_batch)
+        except (TypeError, ValueError) as e:
+            logging.warning(f"Model version '{name}' uses the sklearn path: {e}")
+            self._fast = None
+
+        # Importance of each exam feature, for the app's chart: a forest's own importances,
+        # otherwise the mean absolute contribution over the prediction form's ranges
+        importances = dict.fromkeys(EXAM_FEATURES, 0.0)
+        if getattr(self.model, 'feature_importances_', None) is not None:
+            importances.update(zip(self.features, np.asarray(self.model.feature_importances_, dtype=float).tolist()))
+        else:
+            _, contributions = model_contributions(self._structure, self.model_inputs(verification_inputs(EXAM_FEATURES)))
+            mean_effect = np.abs(contributions).mean(axis=0)
+            importances.update(zip(self.features, (mean_effect / mean_effect.sum()).tolist()))
+        self.importances = np.array(list(importances.values()))
+
+    def model_inputs(self, X):
+        """Turn raw ``EXAM_FEATURES`` rows into what the model was trained on."""
+        X = np.asarray(X, dtype=float)
+        if self.scaler is not None:
+            return self.scaler.transform(pd.DataFrame(X, columns=EXAM_FEATURES))
+        return X[:, self._columns]
+
+    def predict_batch(self, data):
+        """
+        Reference path: predict many students through the model's own ``predict``, boost applied.
+
+        Args:
+            data: Raw ``EXAM_FEATURES`` values in any form accepted by ``feature_frame``.
+        """
+        X = feature_frame(data, EXAM_FEATURES).to_numpy()
+        model_inputs = self.model_inputs(X)
+        if getattr(self.model, 'feature_names_in_', None) is not None:
+            model_inputs = pd.DataFrame(model_inputs, columns=self.features)
+        return apply_exam_boost(self.model.predict(model_inputs), X[:, 0], X[:, 1])
+
+    def predict_one(self, row):
+        """Predict one student from the six raw ``EXAM_FEATURES`` values."""
+        if self._fast is not None:
+            return self._fast.predict_one(*row)
+        return float(self.predict_batch([row])[0])
+
+    def explain_one(self, row):
+        """
+        Per-feature contributions for one student, shaped like ``explanations.explanation_row``.
+
+        Features the version does not use contribute 0.
+        """
+        X = np.asarray([row], dtype=float)
+        base, contributions = model_contributions(self._structure, self.model_inputs(X))
+        by_feature = dict.fromkeys(EXAM_FEATURES, 0.0)
+        by_feature.update(zip(self.features, contributions[0].tolist()))
+        raw = base + contributions[0].sum()
+        prediction = float(apply_exam_boost([raw], X[:, 0], X[:, 1])[0])
+        return {'base': base, 'contributions': by_feature, 'adjustment': prediction - raw, 'prediction': prediction}
+
+
+class VersionStats:
+    """Recent latencies and predictions of one version, in fixed-size ring buffers."""
+
+    def __init__(self, window=DEFAULT_STATS_WINDOW):
+        self.count = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=window)
+        self.predictions = deque(maxlen=window)
+
+    def summary(self):
+        latencies_ms = np.asarray(self.latencies) * 1000
+        predictions = np.asarray(self.predictions)
+        summary = {'count': self.count, 'errors': self.errors}
+        if len(latencies_ms):
+            summary.update({
+                'p50_ms': float(np.percentile(latencies_ms, 50)),
+                'p95_ms': float(np.percentile(latencies_ms, 95)),
+                'mean_prediction': float(predictions.mean()),
+                'std_prediction': float(predictions.std()),
+                'p5_prediction': float(np.percentile(predictions, 5)),
+                'p50_prediction': float(np.percentile(predictions, 50)),
+                'p95_prediction': float(np.percentile(predictions, 95)),
+            })
+        return summary
+
+
+class ModelRegistry:
+    """
+    Named exam model versions with hot reload and weighted routing.
+
+    Versions are reloaded when their files change (checked at most every
+    ``check_interval`` seconds). A new version is fully loaded and verified before it
+    replaces the old one in a single reference swap; if loading fails (e.g. the file is
+    still being copied) the old version keeps serving and the load is retried later.
+
+    Routing sends each version its ``routes`` share of predictions. With a routing key
+    (the user id in the app) the choice is stable, so a student keeps seeing the same
+    version; without one it is random.
+
+    The ``primary`` version is loaded first and its errors propagate (e.g. FileNotFoundError
+    for a missing pickle); other versions that fail to load are skipped with a warning.
+    """
+
+    def __init__(self, versions=DEFAULT_VERSIONS, routes=DEFAULT_ROUTES, primary=PRIMARY_VERSION,
+                 check_interval=DEFAULT_CHECK_INTERVAL, stats_window=DEFAULT_STATS_WINDOW):
+        if primary not in versions:
+            raise ValueError(f"Primary model version '{primary}' is not configured")
+        self.specs = {name: dict(spec) for name, spec in versions.items()}
+        self.primary = primary
+        self.check_interval = check_interval
+        self._reload_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._last_check = time.monotonic()
+        self._stats = {name: VersionStats(stats_window) for name in self.specs}
+        spec = self.specs[primary]
+        self._versions = {primary: ModelVersion(primary, spec['model'], spec.get('scaler'), spec.get('features'))}
+        for name in self.specs:
+            if name == primary:
+                continue
+            version = self._load(name)
+            if version is not None:
+                self._versions[name] = version
+        self.set_routes(routes)
+
+    def _load(self, name):
+        spec = self.specs[name]
+        try:
+            with span('model_registry.load'):
+                return ModelVersion(name, spec['model'], spec.get('scaler'), spec.get('features'))
+        except Exception as e:
+            logging.warning(f"Could not load model version '{name}' from {spec['model']}: {e}")
+            increment('model_registry.load_errors')
+            return None
+
+    def set_routes(self, routes):
+        """
+        Set each version's share of predictions (weights, normalised to sum to 1).
+
+        Raises:
+            ValueError: If a route names a version that is not loaded, or no weight is positive.
+        """
+        missing = [name for name in routes if name not in self._versions]
+        if missing:
+            raise ValueError(f"Cannot route to unloaded model versions: {', '.join(missing)}")
+        total = sum(weight for weight in routes.values() if weight > 0)
+        if not total:
+            raise ValueError("At least one route needs a positive weight")
+        names, cumulative, running = [], [], 0.0
+        for name, weight in routes.items():
+            if weight > 0:
+                running += weight / total
+                names.append(name)
+                cumulative.append(running)
+        cumulative[-1] = 1.0
+        # One tuple, so a concurrent route() never sees names and boundaries from different calls
+        self._routes = (names, cumulative)
+
+    @property
+    def routes(self):
+        names, cumulative = self._routes
+        return {name: round(upper - lower, 6) for name, lower, upper in zip(names, [0.0, *cumulative[:-1]], cumulative)}
+
+    def route(self, key=None):
+        """Pick a version name for one prediction."""
+        names, cumulative = self._routes
+        if key is None:
+            point = random.random()
+        else:
+            point = (zlib.crc32(str(key).encode('utf-8')) % 10000) / 10000
+        for name, upper in zip(names, cumulative):
+            if point < upper:
+                return name
+        return names[-1]
+
+    def version(self, name):
+        """The current ``ModelVersion`` called ``name``, reloading changed files first if due."""
+        self._maybe_reload()
+        return self._versions[name]
+
+    def fingerprint(self):
+        """Fingerprints of the loaded versions; changes whenever one is swapped."""
+        self._maybe_reload()
+        return tuple((name, version.fingerprint) for name, version in sorted(self._versions.items()))
+
+    def reload_changed(self):
+        """
+        Reload every version whose files changed since it was loaded.
+
+        Returns:
+            list: Names of the versions that were swapped.
+        """
+        swapped = []
+        for name, spec in self.specs.items():
+            current = self._versions.get(name)
+            paths = [path for path in (spec['model'], spec.get('scaler')) if path]
+            if current is not None and model_fingerprint(paths) == current.fingerprint:
+                continue
+            version = self._load(name)
+            if version is None:
+                continue
+            self._versions = {**self._versions, name: version}
+            increment('model_registry.reloads')
+            logging.info(f"Model version '{name}' reloaded from {spec['model']} ({version.kind})")
+            swapped.append(name)
+        return swapped
+
+    def _maybe_reload(self):
+        if time.monotonic() - self._last_check < self.check_interval:
+            return
+        # One thread reloads; others keep serving the current versions
+        if not self._reload_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_check = time.monotonic()
+            self.reload_changed()
+        finally:
+            self._reload_lock.release()
+
+    def predict_one(self, row, key=None, version=None):
+        """
+        Predict one student's exam marks on the routed (or the given) version.
+
+        Args:
+            row (sequence): The six raw ``EXAM_FEATURES`` values.
+            key: Routing key, e.g. the user id.
+            version (str): Use this version instead of routing.
+
+        Returns:
+            tuple: ``(predicted_marks, version_name)``.
+        """
+        name = version or self.route(key)
+        model_version = self.version(name)
+        start = time.perf_counter()
+        try:
+            predicted = model_version.predict_one(row)
+        except Exception:
+            with self._stats_lock:
+                self._stats[name].errors += 1
+            raise
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            stats = self._stats[name]
+            stats.count += 1
+            stats.latencies.append(elapsed)
+            stats.predictions.append(predicted)
+        increment(f'model_registry.{name}.predictions')
+        return predicted, name
+
+    def summary(self):
+        """
+        Per-version model type, route share, load time and recent latency and prediction
+        distribution (p50/p95 latency; mean, std and percentiles of the predictions).
+        """
+        routes = self.routes
+        with self._stats_lock:
+            summaries = {name: stats.summary() for name, stats in self._stats.items()}
+        report = {}
+        for name, spec in self.specs.items():
+            version = self._versions.get(name)
+            report[name] = {
+                'kind': version.kind if version else None,
+                'share': routes.get(name, 0.0),
+                'loaded_at': version.loaded_at if version else None,
+                **summaries[name],
+            }
+        return report
+
+
+def parse_routes(value):
+    """Parse ``"forest=90,linear=10"`` into ``{'forest': 90.0, 'linear': 10.0}``."""
+    routes = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        routes[name.strip()] = float(weight)
+    return routes
+
+
+def load_registry_config(path):
+    """
+    Read a registry config file::
+
+        {
+          "versions": {"forest": {"model": "exam_model.pkl", "scaler": "scaler_exam.pkl"},
+                       "linear": {"model": "trained_model.pkl"}},
+          "routes": {"forest": 90, "linear": 10},
+          "primary": "forest"
+        }
+
+    A version may also list its ``features`` when the pickle does not record them.
+
+    Returns:
+        tuple: ``(versions, routes, primary)``.
+    """
+    with open(path) as f:
+        config = json.load(f)
+    return (config.get('versions', DEFAULT_VERSIONS), config.get('routes', DEFAULT_ROUTES),
+            config.get('primary', PRIMARY_VERSION))
+
+
+def create_registry():
+    """
+    Build the registry configured by the environment.
+
+    ``STUDENT_MODEL_REGISTRY`` points to a JSON config (default: the forest and the linear
+    model next to the app, with every prediction routed to the forest) and
+    ``STUDENT_MODEL_ROUTES`` overrides the routes, e.g. ``forest=90,linear=10``.
+    """
+    config_path = os.environ.get(REGISTRY_ENV)
+    if config_path:
+        versions, routes, primary = load_registry_config(config_path)
+    else:
+        versions, routes, primary = DEFAULT_VERSIONS, DEFAULT_ROUTES, PRIMARY_VERSION
+    if os.environ.get(ROUTES_ENV):
+        routes = parse_routes(os.environ[ROUTES_ENV])
+    return ModelRegistry(versions, routes, primary)
@@ -0,0 +1,85 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from instrumentation import increment, span
+
+ROUNDS_ENV = 'STUDENT_BCRYPT_ROUNDS'
+WORKERS_ENV = 'STUDENT_BCRYPT_WORKERS'
+QUEUE_ENV = 'STUDENT_BCRYPT_QUEUE'
+
+DEFAULT_ROUNDS = 12  # bcrypt.gensalt() default
+
+
+class HasherBusyError(Exception):
+    """Raised when every hashing worker is busy and the wait queue is full."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification on a bounded thread pool.
+
+    bcrypt releases the GIL while it works, so ``max_workers`` logins hash in parallel
+    instead of queueing behind each other on the Streamlit script threads. At most
+    ``max_queue`` further requests may wait; beyond that calls fail fast with
+    ``HasherBusyError`` rather than piling up CPU-bound work during a login burst.
+
+    Verification works for any stored hash, so changing ``rounds`` only affects new hashes.
+    """
+
+    def __init__(self, max_workers=None, max_queue=None, rounds=DEFAULT_ROUNDS):
+        if not 4 <= rounds <= 31:
+            raise ValueError("bcrypt rounds must be between 4 and 31")
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.max_queue = self.max_workers * 4 if max_queue is None else max_queue
+        self.rounds = rounds
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='bcrypt')
+
+    def hash(self, password):
+        """Return a new bcrypt hash of ``password`` (str or bytes) at the configured cost."""
+        return self._run('bcrypt.hash', _hash, _to_bytes(password), self.rounds)
+
+    def verify(self, password, hashed):
+        """Check ``password`` against a stored bcrypt hash (str or bytes)."""
+        return self._run('bcrypt.verify', bcrypt.checkpw, _to_bytes(password), _to_bytes(hashed))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def _run(self, name, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            increment('bcrypt.busy')
+            raise HasherBusyError("Too many sign-in requests right now. Please try again in a moment.")
+        try:
+            with span(name):
+                return self._executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+
+def _to_bytes(value):
+    return value.encode('utf-8') if isinstance(value, str) else value
+
+
+def create_hasher():
+    """
+    Build a hasher configured from the environment.
+
+    ``STUDENT_BCRYPT_ROUNDS`` sets the cost factor for new hashes (default 12),
+    ``STUDENT_BCRYPT_WORKERS`` the worker threads and ``STUDENT_BCRYPT_QUEUE`` how many
+    requests may wait for a worker before callers get ``HasherBusyError``.
+    """
+    workers = os.environ.get(WORKERS_ENV)
+    queue = os.environ.get(QUEUE_ENV)
+    return PasswordHasher(
+        max_workers=int(workers) if workers else None,
+        max_queue=int(queue) if queue else None,
+        rounds=int(os.environ.get(ROUNDS_ENV, DEFAULT_ROUNDS)),
+    )
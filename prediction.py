@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+
+from instrumentation import increment, span
+
+# Feature order used when the models and scaler were trained
+EXAM_FEATURES = ['previous_percentage', 'attendance', 'study_hours', 'commute_time', 'board_exam_marks', 'tuition_hours']
+ATTENDANCE_FEATURES = ['past_attendance', 'study_hours', 'commute_time']
+
+
+def feature_frame(data, feature_names):
+    """
+    Normalise a batch of students into a float DataFrame with the model's column order.
+
+    Args:
+        data: A DataFrame containing the feature columns, a dict of column name -> array,
+            or a 2-D array-like with one row per student in ``feature_names`` order.
+        feature_names (list): Column order expected by the model.
+
+    Returns:
+        pd.DataFrame: One row per student, columns in ``feature_names`` order.
+
+    Raises:
+        ValueError: If a column is missing or the array has the wrong number of columns.
+    """
+    if isinstance(data, (pd.DataFrame, dict)):
+        missing = [name for name in feature_names if name not in data]
+        if missing:
+            raise ValueError(f"Missing feature columns: {', '.join(missing)}")
+        return pd.DataFrame({name: np.asarray(data[name], dtype=float) for name in feature_names})
+
+    values = np.asarray(data, dtype=float)
+    if values.ndim == 1:
+        values = values.reshape(1, -1)
+    if values.ndim != 2 or values.shape[1] != len(feature_names):
+        raise ValueError(f"Expected an array with {len(feature_names)} columns ({', '.join(feature_names)})")
+    return pd.DataFrame(values, columns=feature_names)
+
+
+def apply_exam_boost(predicted_marks, previous_percentage, attendance):
+    """
+    Apply the exam-mark boosting rule to a batch of raw model outputs.
+
+    Strong students (previous percentage > 85 and attendance > 90) get a 10% boost capped
+    at 100; weak students (previous percentage < 60 or attendance < 70) lose 10%, floored at 0.
+    """
+    predicted_marks = np.asarray(predicted_marks, dtype=float)
+    previous_percentage = np.asarray(previous_percentage, dtype=float)
+    attendance = np.asarray(attendance, dtype=float)
+
+    boost = (previous_percentage > 85) & (attendance > 90)
+    penalty = ~boost & ((previous_percentage < 60) | (attendance < 70))
+
+    result = predicted_marks.copy()
+    result[boost] = np.minimum(predicted_marks[boost] * 1.1, 100)
+    result[penalty] = np.maximum(predicted_marks[penalty] * 0.9, 0)
+    return result
+
+
+def predict_exam_marks_batch(exam_model, scaler, data):
+    """
+    Predict exam marks for many students in a single scale + predict pass.
+
+    Args:
+        exam_model: Fitted regressor trained on scaled ``EXAM_FEATURES``.
+        scaler: Fitted scaler for ``EXAM_FEATURES``.
+        data: Students to score, in any form accepted by ``feature_frame``.
+
+    Returns:
+        np.ndarray: Predicted exam marks with the boosting rule applied.
+    """
+    features = feature_frame(data, EXAM_FEATURES)
+    with span('model.scale'):
+        features_scaled = scaler.transform(features)
+    with span('model.predict_exam'):
+        predicted_marks = exam_model.predict(features_scaled)
+    increment('predictions.exam', len(features))
+    return apply_exam_boost(predicted_marks, features['previous_percentage'].to_numpy(), features['attendance'].to_numpy())
+
+
+def predict_attendance_batch(attendance_model, data):
+    """
+    Predict attendance for many students in a single predict pass.
+
+    Args:
+        attendance_model: Fitted regressor trained on raw ``ATTENDANCE_FEATURES``.
+        data: Students to score, in any form accepted by ``feature_frame``.
+
+    Returns:
+        np.ndarray: Predicted attendance clamped to [0, 100].
+    """
+    features = feature_frame(data, ATTENDANCE_FEATURES)
+    with span('model.predict_attendance'):
+        predicted_attendance = attendance_model.predict(features)
+    increment('predictions.attendance', len(features))
+    return np.clip(predicted_attendance, 0, 100)
+
+
+def sweep_design_matrix(base, feature_names, axes):
+    """
+    Build the design matrix for a what-if sweep around one student.
+
+    Args:
+        base (dict): Feature name -> value for the student being explored.
+        feature_names (list): Column order expected by the model.
+        axes (list): ``(feature, grid)`` pairs to vary. The Cartesian product of the grids
+            is taken with the first axis varying slowest.
+
+    Returns:
+        pd.DataFrame: One row per grid point, every other feature held at its ``base`` value.
+
+    Raises:
+        ValueError: If a swept feature is not one of ``feature_names``.
+    """
+    for feature, _ in axes:
+        if feature not in feature_names:
+            raise ValueError(f"Cannot sweep '{feature}'; expected one of {', '.join(feature_names)}")
+
+    grids = [np.asarray(grid, dtype=float) for _, grid in axes]
+    mesh = np.meshgrid(*grids, indexing='ij')
+    n_points = mesh[0].size if mesh else 1
+
+    columns = {name: np.full(n_points, base[name], dtype=float) for name in feature_names}
+    for (feature, _), values in zip(axes, mesh):
+        columns[feature] = values.ravel()
+    return pd.DataFrame(columns, columns=feature_names)
+
+
+def sweep_exam_marks(exam_model, scaler, base, feature, grid):
+    """Predict exam marks along ``grid`` for one feature, holding the rest of ``base`` fixed."""
+    design = sweep_design_matrix(base, EXAM_FEATURES, [(feature, grid)])
+    return predict_exam_marks_batch(exam_model, scaler, design)
+
+
+def sweep_exam_marks_grid(exam_model, scaler, base, x_feature, x_grid, y_feature, y_grid):
+    """
+    Predict exam marks over a 2-D grid of two features, holding the rest of ``base`` fixed.
+
+    Returns:
+        np.ndarray: Array of shape ``(len(y_grid), len(x_grid))``, ready for a heatmap.
+    """
+    design = sweep_design_matrix(base, EXAM_FEATURES, [(y_feature, y_grid), (x_feature, x_grid)])
+    marks = predict_exam_marks_batch(exam_model, scaler, design)
+    return marks.reshape(len(y_grid), len(x_grid))
+
+
+def sweep_attendance(attendance_model, base, feature, grid):
+    """Predict attendance along ``grid`` for one feature, holding the rest of ``base`` fixed."""
+    design = sweep_design_matrix(base, ATTENDANCE_FEATURES, [(feature, grid)])
+    return predict_attendance_batch(attendance_model, design)
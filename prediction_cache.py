@@ -0,0 +1,113 @@
+import os
+import threading
+from collections import OrderedDict
+
+from compact_model import COMPACT_META_FILE, COMPACT_SUFFIX
+from instrumentation import increment
+
+# Step of the prediction form's number inputs; inputs closer than this share a cache entry
+DEFAULT_STEP = 0.1
+DEFAULT_MAX_SIZE = 4096
+
+
+def model_fingerprint(paths):
+    """
+    Identify the current version of a set of model artifacts by modification time and size.
+
+    Compact exports next to a pickle (``<stem>_compact/``) are included, since ``load_model``
+    prefers them. Missing files fingerprint as None, so installing one changes the result.
+
+    Returns:
+        tuple: Hashable fingerprint, cheap enough to compute on every Streamlit rerun.
+    """
+    parts = []
+    for path in paths:
+        compact_meta = os.path.join(os.path.splitext(path)[0] + COMPACT_SUFFIX, COMPACT_META_FILE)
+        for candidate in (path, compact_meta):
+            try:
+                stat = os.stat(candidate)
+                parts.append((candidate, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                parts.append((candidate, None, None))
+    return tuple(parts)
+
+
+def quantize(values, step=DEFAULT_STEP):
+    """Snap feature values to the input grid, returning a hashable tuple of floats."""
+    return tuple(round(round(float(value) / step) * step, 10) for value in values)
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of single-student predictions.
+
+    Keys are ``(kind, quantized features)``. The cache is bound to one model fingerprint;
+    ``ensure_fingerprint`` drops every entry when the artifacts change.
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, step=DEFAULT_STEP):
+        self.max_size = max_size
+        self.step = step
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._fingerprint = None
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def ensure_fingerprint(self, fingerprint):
+        with self._lock:
+            if fingerprint != self._fingerprint:
+                if self._entries:
+                    self._stats['invalidations'] += 1
+                self._entries.clear()
+                self._fingerprint = fingerprint
+
+    def get_or_compute(self, kind, features, compute):
+        """
+        Return the cached prediction for ``features``, computing it on a miss.
+
+        Args:
+            kind (str): Which model the prediction comes from, e.g. 'exam' or 'attendance'.
+            features (sequence): Raw feature values in model order.
+            compute (callable): Called with the quantized features on a miss, so every
+                input that maps to an entry gets the same answer.
+        """
+        quantized = quantize(features, self.step)
+        key = (kind, quantized)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                increment('prediction_cache.hits')
+                return self._entries[key]
+            fingerprint = self._fingerprint
+            self._stats['misses'] += 1
+        increment('prediction_cache.misses')
+
+        value = compute(quantized)
+        with self._lock:
+            # Skip the insert if the models were swapped while computing
+            if fingerprint == self._fingerprint:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self._stats['evictions'] += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hit_rate': self._stats['hits'] / lookups if lookups else 0.0,
+            }
+
+
+# Process-wide cache shared by every Streamlit session
+prediction_cache = PredictionCache()
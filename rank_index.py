@@ -0,0 +1,227 @@
+import bisect
+import threading
+
+import numpy as np
+
+from cgpa_calculator import summarize_grades_bulk
+from instrumentation import increment, span
+from storage import SEMESTER_COLUMNS
+
+# Metrics students are ranked on, in the order the comparison page shows them
+RANKED_METRICS = ['average_cgpa', 'predicted_exam_marks', 'predicted_attendance']
+
+# StudentProfiles columns read to build the indexes
+_SOURCE_COLUMNS = ['user_id', *SEMESTER_COLUMNS, *RANKED_METRICS]
+
+DEFAULT_MERGE_THRESHOLD = 2048
+
+
+class RankIndex:
+    """
+    Order statistics for one metric over every student: rank, percentile and top-N.
+
+    Values live in a sorted array, with a second array sorted by user_id to find a student's
+    current value. Updates do not touch those arrays; the old and new values go into small
+    sorted "removed" and "added" lists, and the arrays are rebuilt once ``merge_threshold``
+    students have pending changes. A count below or above a value is then three binary
+    searches, so rank and percentile queries are O(log n) and an update is O(log n) plus a
+    rebuild every ``merge_threshold`` updates.
+
+    Students without a value (e.g. no saved prediction) are not ranked.
+    """
+
+    def __init__(self, user_ids=(), values=(), merge_threshold=DEFAULT_MERGE_THRESHOLD):
+        self.merge_threshold = merge_threshold
+        self._lock = threading.Lock()
+        self._load(np.asarray(user_ids, dtype=np.int64), np.asarray(values, dtype=float))
+
+    def _load(self, user_ids, values):
+        ranked = ~np.isnan(values)
+        user_ids, values = user_ids[ranked], values[ranked]
+        # Ascending by value, ties by descending user_id, so walking from the end gives the
+        # highest values first and the earliest user_id first among equals
+        order = np.lexsort((-user_ids, values))
+        self._values = values[order]
+        self._value_ids = user_ids[order]
+        by_user = np.argsort(user_ids, kind='stable')
+        self._user_ids = user_ids[by_user]
+        self._user_values = values[by_user]
+        self._changes = {}  # user_id -> current value (None when unranked) since the last merge
+        self._added = []    # sorted values of _changes
+        self._removed = []  # sorted base values those changes replaced
+        self._leaders = []  # (-value, user_id) of _changes, highest value first, for top()
+
+    def __len__(self):
+        return len(self._values) + len(self._added) - len(self._removed)
+
+    def value_of(self, user_id):
+        """The user's indexed value, or None if they are not ranked."""
+        with self._lock:
+            return self._value_of(user_id)
+
+    def _value_of(self, user_id):
+        if user_id in self._changes:
+            return self._changes[user_id]
+        return self._base_value(user_id)
+
+    def _base_value(self, user_id):
+        position = np.searchsorted(self._user_ids, user_id)
+        if position < len(self._user_ids) and self._user_ids[position] == user_id:
+            return float(self._user_values[position])
+        return None
+
+    def update(self, user_id, value):
+        """Set ``user_id``'s value; None (or NaN) removes them from the ranking."""
+        if value is not None and np.isnan(value):
+            value = None
+        with self._lock:
+            old = self._value_of(user_id)
+            if old == value:
+                return
+            if user_id in self._changes:
+                if old is not None:
+                    del self._added[bisect.bisect_left(self._added, old)]
+                    del self._leaders[bisect.bisect_left(self._leaders, (-old, user_id))]
+            elif old is not None:
+                bisect.insort(self._removed, old)
+            if value is not None:
+                bisect.insort(self._added, float(value))
+                bisect.insort(self._leaders, (-float(value), user_id))
+            self._changes[user_id] = None if value is None else float(value)
+            if len(self._changes) >= self.merge_threshold:
+                self._merge()
+
+    def _merge(self):
+        with span('rank_index.merge'):
+            increment('rank_index.merges')
+            changed = np.fromiter(self._changes, dtype=np.int64, count=len(self._changes))
+            new_values = np.array([np.nan if v is None else v for v in self._changes.values()], dtype=float)
+            kept = ~np.isin(self._user_ids, changed)
+            self._load(np.concatenate([self._user_ids[kept], changed]),
+                       np.concatenate([self._user_values[kept], new_values]))
+
+    def count_below(self, value):
+        """Number of ranked students with a value strictly below ``value``."""
+        with self._lock:
+            return self._count_below(value)
+
+    def count_above(self, value):
+        """Number of ranked students with a value strictly above ``value``."""
+        with self._lock:
+            return self._count_above(value)
+
+    def _count_below(self, value):
+        return (int(np.searchsorted(self._values, value, side='left'))
+                + bisect.bisect_left(self._added, value) - bisect.bisect_left(self._removed, value))
+
+    def _count_above(self, value):
+        return ((len(self._values) - int(np.searchsorted(self._values, value, side='right')))
+                + (len(self._added) - bisect.bisect_right(self._added, value))
+                - (len(self._removed) - bisect.bisect_right(self._removed, value)))
+
+    def standing(self, value, user_id=None):
+        """
+        Where ``value`` would stand among the other students.
+
+        Args:
+            value (float): The score to place, e.g. a fresh prediction not saved yet.
+            user_id (int): The student asking. Their own indexed value, if any, is left out
+                so an older saved score does not compete with the new one.
+
+        Returns:
+            dict: ``rank`` (1 is the top; ties share a rank), ``total`` (students ranked,
+            including the asker) and ``percentile`` (share of the other students strictly
+            below ``value``, 100 when there are none).
+        """
+        with self._lock:
+            below, above, others = self._count_below(value), self._count_above(value), len(self)
+            own = self._value_of(user_id) if user_id is not None else None
+        if own is not None:
+            others -= 1
+            below -= own < value
+            above -= own > value
+        return {
+            'rank': above + 1,
+            'total': others + 1,
+            'percentile': 100.0 * below / others if others else 100.0,
+        }
+
+    def top(self, n):
+        """
+        The ``n`` highest values, highest first; ties are ordered by user_id.
+
+        Returns:
+            list: ``(user_id, value)`` pairs. Costs O(n) plus the changed students skipped.
+        """
+        with self._lock:
+            pending = self._leaders
+            result = []
+            position = len(self._values) - 1
+            pending_position = 0
+            while len(result) < n:
+                while position >= 0 and int(self._value_ids[position]) in self._changes:
+                    position -= 1
+                base = (-float(self._values[position]), int(self._value_ids[position])) if position >= 0 else None
+                change = pending[pending_position] if pending_position < len(pending) else None
+                if base is None and change is None:
+                    break
+                if change is None or (base is not None and base < change):
+                    result.append((base[1], -base[0]))
+                    position -= 1
+                else:
+                    result.append((change[1], -change[0]))
+                    pending_position += 1
+            return result
+
+
+class StudentRankings:
+    """A ``RankIndex`` per ranked metric, built from and kept in step with StudentProfiles."""
+
+    def __init__(self, indexes):
+        self.indexes = indexes
+
+    def __getitem__(self, metric):
+        return self.indexes[metric]
+
+    def update(self, user_id, profile):
+        """
+        Re-rank one student after a write.
+
+        Args:
+            profile (StudentProfile): Loaded with the ``RANKED_METRICS`` fields (and ``grades``
+                for rows whose average CGPA is not stored yet), or None if it was deleted.
+        """
+        if profile is None:
+            for index in self.indexes.values():
+                index.update(user_id, None)
+            return
+        values = {metric: getattr(profile, metric) for metric in RANKED_METRICS}
+        if values['average_cgpa'] is None:
+            values['average_cgpa'] = profile.metrics()['average_cgpa']
+        for metric, index in self.indexes.items():
+            index.update(user_id, values[metric])
+
+
+def build_rankings(repository, batch_size=50000, merge_threshold=DEFAULT_MERGE_THRESHOLD):
+    """
+    Load every profile's ranked metrics into a new ``StudentRankings``.
+
+    Every profile is ranked on average CGPA (0 with no completed semesters, as the class
+    average counts it); only profiles with saved predictions are ranked on those. Average
+    CGPA is computed from the grades for rows whose stored value is not backfilled yet.
+    """
+    with span('rank_index.build'):
+        batches = [np.array(batch, dtype=float) for batch in repository.iter_profile_batches(_SOURCE_COLUMNS, batch_size)]
+        rows = np.concatenate(batches) if batches else np.empty((0, len(_SOURCE_COLUMNS)))
+        user_ids = rows[:, 0].astype(np.int64)
+        cgpa = rows[:, 1 + len(SEMESTER_COLUMNS)].copy()
+        missing = np.isnan(cgpa)
+        if missing.any():
+            cgpa[missing] = summarize_grades_bulk(rows[missing, 1:1 + len(SEMESTER_COLUMNS)])['average_cgpa']
+        columns = {'average_cgpa': cgpa}
+        for i, metric in enumerate(RANKED_METRICS[1:], start=2 + len(SEMESTER_COLUMNS)):
+            columns[metric] = rows[:, i]
+        return StudentRankings({
+            metric: RankIndex(user_ids, columns[metric], merge_threshold=merge_threshold)
+            for metric in RANKED_METRICS
+        })
@@ -0,0 +1,205 @@
+import argparse
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import pandas as pd
+
+from compact_model import load_model
+from prediction import predict_exam_marks_batch, predict_attendance_batch
+
+# Columns a cohort file must provide (the same inputs the prediction form asks for)
+INPUT_COLUMNS = ['previous_percentage', 'past_attendance', 'study_hours', 'commute_time', 'board_exam_marks', 'tuition_hours']
+# Identifier columns copied through to the output when present
+PASSTHROUGH_COLUMNS = ['roll_number']
+
+# Models loaded once per worker process by _init_worker
+_worker_models = None
+
+
+def is_parquet(path):
+    return path.lower().endswith(('.parquet', '.pq'))
+
+
+def iter_chunks(path, chunk_size, optional_columns=()):
+    """
+    Read a cohort file shaped like sample_data.csv in chunks of at most ``chunk_size`` rows.
+
+    Identifier columns and any ``optional_columns`` are read too when the file has them.
+
+    Raises:
+        ValueError: If a required input column is missing.
+    """
+    if is_parquet(path):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        columns = set(parquet_file.schema_arrow.names)
+        _check_columns(columns, path)
+        wanted = [name for name in [*PASSTHROUGH_COLUMNS, *INPUT_COLUMNS, *optional_columns] if name in columns]
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=wanted):
+            yield batch.to_pandas()
+    else:
+        header = pd.read_csv(path, nrows=0).columns
+        _check_columns(set(header), path)
+        wanted = [name for name in [*PASSTHROUGH_COLUMNS, *INPUT_COLUMNS, *optional_columns] if name in header]
+        yield from pd.read_csv(path, usecols=wanted, chunksize=chunk_size)
+
+
+def _check_columns(columns, path):
+    missing = [name for name in INPUT_COLUMNS if name not in columns]
+    if missing:
+        raise ValueError(f"{path} is missing columns: {', '.join(missing)}")
+
+
+def exam_inputs(students):
+    """
+    Map ``INPUT_COLUMNS`` (a DataFrame or dict of columns) to the exam model's features.
+
+    Past attendance feeds the exam model's ``attendance`` feature, as it does in the app.
+    """
+    return {
+        'previous_percentage': students['previous_percentage'],
+        'attendance': students['past_attendance'],
+        'study_hours': students['study_hours'],
+        'commute_time': students['commute_time'],
+        'board_exam_marks': students['board_exam_marks'],
+        'tuition_hours': students['tuition_hours'],
+    }
+
+
+def score_chunk(chunk, exam_model, scaler, attendance_model):
+    """
+    Score one chunk of students with the exam and attendance models.
+
+    Returns:
+        pd.DataFrame: Passthrough identifier columns plus ``predicted_exam_marks`` and
+        ``predicted_attendance``.
+    """
+    result = chunk[[name for name in PASSTHROUGH_COLUMNS if name in chunk]].reset_index(drop=True)
+    result['predicted_exam_marks'] = predict_exam_marks_batch(exam_model, scaler, exam_inputs(chunk))
+    result['predicted_attendance'] = predict_attendance_batch(attendance_model, chunk)
+    return result
+
+
+def load_scoring_models(exam_model_path, attendance_model_path, scaler_path):
+    return load_model(exam_model_path), joblib.load(scaler_path), load_model(attendance_model_path)
+
+
+def _init_worker(exam_model_path, attendance_model_path, scaler_path):
+    global _worker_models
+    _worker_models = load_scoring_models(exam_model_path, attendance_model_path, scaler_path)
+
+
+def _score_in_worker(chunk):
+    return score_chunk(chunk, *_worker_models)
+
+
+class PredictionWriter:
+    """Append scored chunks to a CSV or Parquet file without holding the whole output in memory."""
+
+    def __init__(self, path):
+        self.path = path
+        self._parquet_writer = None
+        self._wrote_csv_header = False
+
+    def write(self, frame):
+        if is_parquet(self.path):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            frame.to_csv(self.path, mode='a' if self._wrote_csv_header else 'w', header=not self._wrote_csv_header, index=False)
+            self._wrote_csv_header = True
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+
+def score_file(input_path, output_path, exam_model_path='exam_model.pkl', attendance_model_path='attendance_model.pkl',
+               scaler_path='scaler_exam.pkl', chunk_size=100000, workers=1):
+    """
+    Stream a cohort file through both models and write the predictions.
+
+    Args:
+        input_path (str): Cohort .csv or .parquet file.
+        output_path (str): Destination .csv or .parquet file.
+        exam_model_path (str): Exam model pickle (its compact export is preferred when present).
+        attendance_model_path (str): Attendance model pickle.
+        scaler_path (str): Exam feature scaler pickle.
+        chunk_size (int): Rows read, scored and written at a time.
+        workers (int): Worker processes; 1 scores in this process. At most ``2 * workers``
+            chunks are in flight, so memory stays bounded however large the file is.
+
+    Returns:
+        dict: ``rows``, ``chunks``, ``seconds`` and ``rows_per_second``.
+    """
+    writer = PredictionWriter(output_path)
+    rows = chunks = 0
+    start = time.perf_counter()
+
+    def record(scored):
+        nonlocal rows, chunks
+        writer.write(scored)
+        rows += len(scored)
+        chunks += 1
+        elapsed = time.perf_counter() - start
+        logging.info(f"chunk {chunks}: {rows} rows scored ({rows / elapsed:,.0f} rows/sec)")
+
+    try:
+        if workers <= 1:
+            models = load_scoring_models(exam_model_path, attendance_model_path, scaler_path)
+            for chunk in iter_chunks(input_path, chunk_size):
+                record(score_chunk(chunk, *models))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(exam_model_path, attendance_model_path, scaler_path)) as executor:
+                # Keep a bounded window of chunks in flight and write results in input order
+                pending = deque()
+                for chunk in iter_chunks(input_path, chunk_size):
+                    pending.append(executor.submit(_score_in_worker, chunk))
+                    if len(pending) >= 2 * workers:
+                        record(pending.popleft().result())
+                while pending:
+                    record(pending.popleft().result())
+    finally:
+        writer.close()
+
+    seconds = time.perf_counter() - start
+    return {'rows': rows, 'chunks': chunks, 'seconds': seconds, 'rows_per_second': rows / seconds if seconds else 0.0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Predict exam marks and attendance for a cohort file.")
+    parser.add_argument('input', help="Cohort file shaped like sample_data.csv (.csv or .parquet)")
+    parser.add_argument('output', help="Predictions file (.csv or .parquet)")
+    parser.add_argument('--exam-model', default='exam_model.pkl')
+    parser.add_argument('--attendance-model', default='attendance_model.pkl')
+    parser.add_argument('--scaler', default='scaler_exam.pkl')
+    parser.add_argument('--chunk-size', type=int, default=100000, help="Rows per chunk")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes (0 = one per CPU)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    workers = args.workers or os.cpu_count() or 1
+    summary = score_file(
+        args.input, args.output, exam_model_path=args.exam_model, attendance_model_path=args.attendance_model,
+        scaler_path=args.scaler, chunk_size=args.chunk_size, workers=workers
+    )
+    logging.info(
+        f"Scored {summary['rows']} rows in {summary['chunks']} chunks in {summary['seconds']:.2f}s "
+        f"({summary['rows_per_second']:,.0f} rows/sec) -> {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
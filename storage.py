@@ -0,0 +1,923 @@
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+import numpy as np
+
+from cgpa_calculator import average_cgpa, clamp_grades, summarize_grades_bulk
+from db_pool import ConnectionPool
+from instrumentation import increment, span
+
+try:
+    import pyodbc
+except ImportError:  # Only needed for the SQL Server backend
+    pyodbc = None
+
+SEMESTER_COLUMNS = [f"semester_{i}" for i in range(1, 9)]
+
+# Per-student metrics derived from the grades, stored on every grade write
+DERIVED_COLUMNS = ['completed_semesters', 'average_cgpa', 'highest_grade', 'lowest_grade', 'grade_trend']
+
+# Columns of StudentProfiles, in table order
+PROFILE_COLUMNS = ['profile_id', 'user_id', 'full_name', 'roll_number', *SEMESTER_COLUMNS,
+                   'created_at', 'predicted_exam_marks', 'predicted_attendance', 'updated_at', *DERIVED_COLUMNS]
+
+DEFAULT_SQLSERVER_CONNECTION_STRING = (
+    "DRIVER={ODBC Driver 17 for SQL Server};"
+    "SERVER=FRENZY\\SQLEXPRESS;"
+    "DATABASE=DYPATU_StudentDB;"
+    "Trusted_Connection=yes;"
+)
+DEFAULT_SQLITE_PATH = 'student.db'
+
+# Version of the tables and columns this module expects; ``migrate`` records it in SchemaVersion.
+# 1: ClassAggregates, the stored derived metrics and the average CGPA index
+SCHEMA_VERSION = 1
+
+# Metrics kept in ClassAggregates. 'profiles' only uses its count (the class size).
+AGGREGATE_METRICS = [*SEMESTER_COLUMNS, 'average_cgpa', 'predicted_exam_marks', 'predicted_attendance', 'profiles']
+
+_SEMESTER_LIST = ", ".join(SEMESTER_COLUMNS)
+_AGGREGATE_SOURCE_COLUMNS = f"{_SEMESTER_LIST}, predicted_exam_marks, predicted_attendance"
+_SEMESTER_PARAMS = ", ".join("?" for _ in SEMESTER_COLUMNS)
+_SEMESTER_ASSIGNMENTS = ", ".join(f"{column} = ?" for column in SEMESTER_COLUMNS)
+_DERIVED_LIST = ", ".join(DERIVED_COLUMNS)
+_DERIVED_PARAMS = ", ".join("?" for _ in DERIVED_COLUMNS)
+_DERIVED_ASSIGNMENTS = ", ".join(f"{column} = ?" for column in DERIVED_COLUMNS)
+
+
+class IntegrityError(Exception):
+    """A unique constraint was violated (duplicate username, email or roll number)."""
+
+
+class SchemaError(Exception):
+    """The database schema is older than this code expects; run ``python migrate_schema.py``."""
+
+
+class InstrumentedCursor:
+    """
+    DB-API cursor wrapper that counts every statement (``db.queries``) and times statements
+    (``db.query``) and row fetches (``db.fetch``), so the caller's own work between them is
+    not reported as database time. Everything else is passed through to the driver's cursor.
+    """
+
+    def __init__(self, cursor):
+        object.__setattr__(self, '_cursor', cursor)
+
+    def execute(self, *args):
+        increment('db.queries')
+        with span('db.query'):
+            self._cursor.execute(*args)
+        return self
+
+    def executemany(self, *args):
+        increment('db.queries')
+        with span('db.query'):
+            self._cursor.executemany(*args)
+        return self
+
+    def fetchone(self):
+        with span('db.fetch'):
+            return self._cursor.fetchone()
+
+    def fetchmany(self, *args):
+        with span('db.fetch'):
+            return self._cursor.fetchmany(*args)
+
+    def fetchall(self):
+        with span('db.fetch'):
+            return self._cursor.fetchall()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._cursor, name, value)
+
+
+# StudentProfile fields and the StudentProfiles columns each one is read from
+PROFILE_FIELDS = {
+    'user_id': ['user_id'],
+    'full_name': ['full_name'],
+    'roll_number': ['roll_number'],
+    'grades': SEMESTER_COLUMNS,
+    'predicted_exam_marks': ['predicted_exam_marks'],
+    'predicted_attendance': ['predicted_attendance'],
+    'updated_at': ['updated_at'],
+    **{column: [column] for column in DERIVED_COLUMNS},
+}
+
+
+def derived_metrics(semester_grades):
+    """
+    The stored per-student metrics for a batch of grade rows, as the profile page computes them.
+
+    Args:
+        semester_grades (array-like): Raw grades, shape ``(n_students, 8)``.
+
+    Returns:
+        list: ``(completed_semesters, average_cgpa, highest_grade, lowest_grade, grade_trend)``
+        tuples of plain Python values, in ``DERIVED_COLUMNS`` order.
+    """
+    summary = summarize_grades_bulk(np.asarray(semester_grades, dtype=float).reshape(-1, len(SEMESTER_COLUMNS)))
+    return list(zip(
+        summary['completed'].tolist(),
+        summary['average_cgpa'].tolist(),
+        summary['highest_grade'].tolist(),
+        summary['lowest_grade'].tolist(),
+        summary['trend'].tolist(),
+    ))
+
+
+class StudentProfile:
+    """
+    A StudentProfiles row holding only the fields a query projected.
+
+    ``grades`` is a float array of the eight stored semester grades (unclamped). Reading a
+    field that was not fetched raises AttributeError instead of returning a wrong column.
+    """
+
+    __slots__ = tuple(PROFILE_FIELDS)
+
+    @classmethod
+    def from_row(cls, fields, row):
+        """Build a profile from a row selected with ``profile_projection(fields)``."""
+        profile = cls()
+        position = 0
+        for field in fields:
+            width = len(PROFILE_FIELDS[field])
+            if field == 'grades':
+                setattr(profile, field, np.array(row[position:position + width], dtype=float))
+            else:
+                setattr(profile, field, row[position])
+            position += width
+        return profile
+
+    def clamped_grades(self):
+        """Grades clamped to the 10-point scale, as every page displays them."""
+        return np.clip(self.grades, 0.0, 10.0)
+
+    def metrics(self):
+        """
+        The derived metrics as a dict keyed by ``DERIVED_COLUMNS``.
+
+        Uses the stored columns when they were loaded and populated; rows written before the
+        columns existed (not yet backfilled) are computed from ``grades``.
+        """
+        stored = [getattr(self, column, None) for column in DERIVED_COLUMNS]
+        if stored[0] is None:
+            stored = derived_metrics(self.grades)[0]
+        return dict(zip(DERIVED_COLUMNS, stored))
+
+    def __repr__(self):
+        values = ", ".join(f"{field}={getattr(self, field)!r}" for field in self.__slots__ if hasattr(self, field))
+        return f"StudentProfile({values})"
+
+
+def profile_projection(fields):
+    """
+    SQL column list for the requested StudentProfile fields.
+
+    Raises:
+        ValueError: If a field is not one of ``PROFILE_FIELDS``.
+    """
+    unknown = [field for field in fields if field not in PROFILE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown profile fields: {', '.join(unknown)}")
+    return ", ".join(column for field in fields for column in PROFILE_FIELDS[field])
+
+
+def _clamped(column):
+    return f"CASE WHEN {column} < 0 THEN 0.0 WHEN {column} > 10 THEN 10.0 ELSE {column} END"
+
+
+# One row per profile with its number of completed (graded) semesters. Clamping never
+# changes whether a grade is above zero, so the count is taken on the raw columns.
+PROFILE_METRICS_SQL = f"""
+    SELECT user_id, {_SEMESTER_LIST}, predicted_exam_marks, predicted_attendance,
+        {" + ".join(f"CASE WHEN {column} > 0 THEN 1 ELSE 0 END" for column in SEMESTER_COLUMNS)} AS completed
+    FROM StudentProfiles
+"""
+
+# Average CGPA over the first `completed` semesters, as cgpa_calculator.average_cgpa computes it.
+# Branching on `completed` keeps each row to a single prefix sum.
+_AVERAGE_CGPA_SQL = "CASE completed WHEN 0 THEN 0.0 " + " ".join(
+    f"WHEN {k} THEN ({' + '.join(_clamped(column) for column in SEMESTER_COLUMNS[:k])}) / {k}.0"
+    for k in range(1, len(SEMESTER_COLUMNS) + 1)
+) + " END"
+
+# SQL for each metric's per-profile contribution over PROFILE_METRICS_SQL; NULL contributes nothing
+_METRIC_EXPRESSIONS = {
+    **{column: f"CASE WHEN {column} > 0 THEN {_clamped(column)} END" for column in SEMESTER_COLUMNS},
+    'average_cgpa': _AVERAGE_CGPA_SQL,
+    'predicted_exam_marks': 'predicted_exam_marks',
+    'predicted_attendance': 'predicted_attendance',
+    'profiles': '1.0',
+}
+
+# Cheaper equivalents used when aggregating: ungraded semesters clamp to 0.0 so they can be
+# summed directly, and metrics that are never NULL are counted with COUNT(*)
+_METRIC_AGGREGATES = {
+    **{
+        column: (f"SUM({_clamped(column)})", f"SUM(CASE WHEN {column} > 0 THEN 1 ELSE 0 END)", f"MAX({_clamped(column)})")
+        for column in SEMESTER_COLUMNS
+    },
+    'average_cgpa': (f"SUM({_AVERAGE_CGPA_SQL})", "COUNT(*)", f"MAX({_AVERAGE_CGPA_SQL})"),
+    'predicted_exam_marks': ("SUM(predicted_exam_marks)", "COUNT(predicted_exam_marks)", "MAX(predicted_exam_marks)"),
+    'predicted_attendance': ("SUM(predicted_attendance)", "COUNT(predicted_attendance)", "MAX(predicted_attendance)"),
+    'profiles': ("COUNT(*)", "COUNT(*)", "1.0"),
+}
+
+
+def profile_contributions(row):
+    """
+    What one profile contributes to each class aggregate, or None where it contributes nothing.
+
+    Args:
+        row: ``(semester_1, ..., semester_8, predicted_exam_marks, predicted_attendance)``,
+            or None for a missing profile.
+
+    Returns:
+        dict: Metric name -> value. Semesters only count when graded (> 0) and predictions
+        only when present, matching how compare_scores has always averaged them.
+    """
+    if row is None:
+        return dict.fromkeys(AGGREGATE_METRICS)
+    grades = clamp_grades(row[:8])
+    contributions = {column: grade if grade > 0 else None for column, grade in zip(SEMESTER_COLUMNS, grades)}
+    contributions['average_cgpa'] = average_cgpa(grades)
+    contributions['predicted_exam_marks'] = row[8]
+    contributions['predicted_attendance'] = row[9]
+    contributions['profiles'] = 1.0
+    return contributions
+
+
+class StudentRepository(ABC):
+    """
+    Data access for the Users and StudentProfiles tables.
+
+    Backends share the portable SQL below and override only what differs between
+    databases: connection setup, schema creation, upserts and driver exception types.
+
+    Connecting never changes the schema: it only checks the recorded schema version
+    (``check_schema``). Tables, columns and indexes are created by ``migrate``, run from
+    ``migrate_schema.py``.
+
+    Every profile write also updates the ClassAggregates table (running sum, count and
+    max per metric) in the same transaction, so class-wide statistics are a single
+    small read instead of a scan of StudentProfiles.
+    """
+
+    # Reads a profile's aggregate inputs inside a write transaction; backends add locking
+    _LOCKED_PROFILE_QUERY = f"SELECT {_AGGREGATE_SOURCE_COLUMNS} FROM StudentProfiles WHERE user_id = ?"
+
+    # Highest value of a metric expression and the lowest user_id that has it
+    _TOP_USER_QUERY = (
+        "SELECT {expression}, user_id FROM ({source}) AS m WHERE {expression} IS NOT NULL "
+        "ORDER BY {expression} DESC, user_id LIMIT 1"
+    )
+
+    integrity_errors = ()
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    @contextmanager
+    def transaction(self):
+        """Yield an ``InstrumentedCursor`` on a pooled connection and commit when the block succeeds."""
+        with self.pool.connection() as conn:
+            cursor = InstrumentedCursor(conn.cursor())
+            try:
+                yield cursor
+                with span('db.commit'):
+                    conn.commit()
+            except self.integrity_errors as e:
+                raise IntegrityError(str(e)) from e
+            finally:
+                cursor.close()
+
+    @contextmanager
+    def profile_write(self, user_id):
+        """
+        Yield a cursor for a write to ``user_id``'s profile, then store the derived metrics
+        if the grades changed and fold the change into the aggregates.
+        """
+        with self.transaction() as cursor:
+            self._begin_write(cursor)
+            cursor.execute(self._LOCKED_PROFILE_QUERY, (user_id,))
+            old_row = cursor.fetchone()
+            yield cursor
+            cursor.execute(f"SELECT {_AGGREGATE_SOURCE_COLUMNS} FROM StudentProfiles WHERE user_id = ?", (user_id,))
+            new_row = cursor.fetchone()
+            if new_row is not None and (old_row is None or tuple(old_row[:8]) != tuple(new_row[:8])):
+                cursor.execute(
+                    f"UPDATE StudentProfiles SET {_DERIVED_ASSIGNMENTS} WHERE user_id = ?",
+                    (*derived_metrics(new_row[:8])[0], user_id)
+                )
+            self._apply_aggregate_delta(cursor, user_id, profile_contributions(old_row), profile_contributions(new_row))
+
+    def _begin_write(self, cursor):
+        """Start the write transaction. Drivers without autocommit start one implicitly."""
+
+    def _prepare_bulk_cursor(self, cursor):
+        """Configure a cursor for large ``executemany`` batches."""
+
+    def _apply_aggregate_delta(self, cursor, user_id, old, new):
+        for metric in AGGREGATE_METRICS:
+            old_value, new_value = old[metric], new[metric]
+            if old_value == new_value:
+                continue
+            delta_sum = (new_value or 0.0) - (old_value or 0.0)
+            delta_count = (new_value is not None) - (old_value is not None)
+            cursor.execute(
+                "UPDATE ClassAggregates SET value_sum = value_sum + ?, value_count = value_count + ? WHERE metric = ?",
+                (delta_sum, delta_count, metric)
+            )
+            if new_value is not None:
+                cursor.execute(
+                    """
+                    UPDATE ClassAggregates SET max_value = ?, max_user_id = ?
+                    WHERE metric = ? AND (max_value IS NULL OR max_value < ?)
+                    """,
+                    (new_value, user_id, metric, new_value)
+                )
+            if old_value is not None and (new_value is None or new_value < old_value):
+                cursor.execute("SELECT max_value FROM ClassAggregates WHERE metric = ?", (metric,))
+                max_value = cursor.fetchone()[0]
+                if max_value is not None and old_value >= max_value:
+                    self._recompute_max(cursor, metric)
+
+    def _recompute_max(self, cursor, metric):
+        """Ask the database for a metric's new maximum after the old one was lowered or removed (rare)."""
+        max_value, max_user_id = self._query_max(cursor, metric)
+        cursor.execute(
+            "UPDATE ClassAggregates SET max_value = ?, max_user_id = ? WHERE metric = ?",
+            (max_value, max_user_id, metric)
+        )
+
+    def _query_max(self, cursor, metric):
+        """``(max_value, max_user_id)`` of a metric in one ordered query, ``(None, None)`` when empty."""
+        cursor.execute(self._TOP_USER_QUERY.format(expression=_METRIC_EXPRESSIONS[metric], source=PROFILE_METRICS_SQL))
+        row = cursor.fetchone()
+        return (row[0], row[1]) if row else (None, None)
+
+    def compute_class_aggregates(self, cursor=None):
+        """
+        Compute every class aggregate in the database and return only the totals.
+
+        Clamping, the completed-semester rule and the per-student average CGPA are all
+        evaluated in SQL, so a handful of numbers cross the wire instead of every profile.
+
+        Returns:
+            dict: Metric name -> ``(sum, count, max, max_user_id)``. ``max_user_id`` is only
+            resolved for average CGPA, the one metric whose top performer is displayed.
+        """
+        if cursor is None:
+            with self.transaction() as cursor:
+                return self.compute_class_aggregates(cursor)
+
+        selects = ", ".join(", ".join(_METRIC_AGGREGATES[metric]) for metric in AGGREGATE_METRICS)
+        cursor.execute(f"SELECT {selects} FROM ({PROFILE_METRICS_SQL}) AS m")
+        row = cursor.fetchone()
+        aggregates = {}
+        for i, metric in enumerate(AGGREGATE_METRICS):
+            value_sum, value_count, max_value = row[3 * i:3 * i + 3]
+            # MAX over clamped semesters is 0.0 when nobody is graded; store that as "no maximum"
+            if not value_count:
+                max_value = None
+            aggregates[metric] = (value_sum or 0.0, value_count or 0, max_value, None)
+        aggregates['average_cgpa'] = aggregates['average_cgpa'][:3] + (self._query_max(cursor, 'average_cgpa')[1],)
+        return aggregates
+
+    def rebuild_aggregates(self):
+        """Recompute ClassAggregates from scratch, e.g. after bulk loads or to clear float drift."""
+        with self.transaction() as cursor:
+            self._begin_write(cursor)
+            aggregates = self.compute_class_aggregates(cursor)
+            cursor.execute("DELETE FROM ClassAggregates")
+            cursor.executemany(
+                "INSERT INTO ClassAggregates (metric, value_sum, value_count, max_value, max_user_id) VALUES (?, ?, ?, ?, ?)",
+                [(metric, *aggregates[metric]) for metric in AGGREGATE_METRICS]
+            )
+
+    def get_class_aggregates(self):
+        """
+        Return class-wide statistics without scanning StudentProfiles.
+
+        Returns:
+            dict: Metric name -> dict with ``sum``, ``count``, ``mean`` (0 when empty),
+            ``max`` and ``max_user_id``.
+        """
+        with self.transaction() as cursor:
+            cursor.execute("SELECT metric, value_sum, value_count, max_value, max_user_id FROM ClassAggregates")
+            rows = cursor.fetchall()
+        return {
+            metric: {
+                'sum': value_sum,
+                'count': value_count,
+                'mean': value_sum / value_count if value_count else 0,
+                'max': max_value if max_value is not None else 0,
+                'max_user_id': max_user_id,
+            }
+            for metric, value_sum, value_count, max_value, max_user_id in rows
+        }
+
+    def _aggregates_missing(self):
+        with self.transaction() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM ClassAggregates")
+            return cursor.fetchone()[0] < len(AGGREGATE_METRICS)
+
+    # Returns a row if the SchemaVersion table exists
+    _SCHEMA_TABLE_QUERY = None
+
+    def schema_version(self):
+        """The schema version recorded by ``migrate``, or None for a database never migrated."""
+        with self.transaction() as cursor:
+            cursor.execute(self._SCHEMA_TABLE_QUERY)
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute("SELECT MAX(version) FROM SchemaVersion")
+            return cursor.fetchone()[0]
+
+    def check_schema(self):
+        """
+        Make sure the database has been migrated to ``SCHEMA_VERSION``. Read-only.
+
+        Raises:
+            SchemaError: If the recorded version is missing or older.
+        """
+        version = self.schema_version()
+        if version is None or version < SCHEMA_VERSION:
+            raise SchemaError(
+                f"Database schema is at version {version or 0}, this code needs {SCHEMA_VERSION}; "
+                f"run `python migrate_schema.py` first"
+            )
+
+    def migrate(self):
+        """
+        Create the tables, columns and indexes of ``SCHEMA_VERSION`` that are missing, seed the
+        aggregates if needed and record the version. Safe to rerun.
+        """
+        self._create_schema()
+        if self._aggregates_missing():
+            self.rebuild_aggregates()
+        with self.transaction() as cursor:
+            self._begin_write(cursor)
+            cursor.execute("DELETE FROM SchemaVersion")
+            cursor.execute("INSERT INTO SchemaVersion (version) VALUES (?)", (SCHEMA_VERSION,))
+
+    @abstractmethod
+    def _create_schema(self):
+        """Run the backend's DDL for ``SCHEMA_VERSION``; must be idempotent."""
+
+    def ping(self):
+        with self.transaction() as cursor:
+            cursor.execute("SELECT 1")
+            return cursor.fetchone()[0] == 1
+
+    def close(self):
+        self.pool.close()
+
+    # Users
+    def create_user(self, username, password_hash, email):
+        with self.transaction() as cursor:
+            cursor.execute(
+                "INSERT INTO Users (username, password, email) VALUES (?, ?, ?)",
+                (username, password_hash, email)
+            )
+
+    def get_user_credentials(self, username):
+        """Return ``(user_id, password_hash)`` for ``username``, or None."""
+        with self.transaction() as cursor:
+            cursor.execute("SELECT user_id, password FROM Users WHERE username = ?", (username,))
+            return cursor.fetchone()
+
+    def list_users(self):
+        """Return ``(user_id, username)`` for every user."""
+        with self.transaction() as cursor:
+            cursor.execute("SELECT user_id, username FROM Users ORDER BY user_id")
+            return cursor.fetchall()
+
+    def update_passwords(self, password_hashes):
+        """Set many passwords in one transaction from ``(user_id, password_hash)`` pairs."""
+        with self.transaction() as cursor:
+            self._prepare_bulk_cursor(cursor)
+            cursor.executemany(
+                "UPDATE Users SET password = ? WHERE user_id = ?",
+                [(password_hash, user_id) for user_id, password_hash in password_hashes]
+            )
+
+    # Student profiles
+    def get_profile(self, user_id, fields=tuple(PROFILE_FIELDS)):
+        """Return ``user_id``'s profile with only ``fields`` loaded, or None if they have none."""
+        with self.transaction() as cursor:
+            cursor.execute(f"SELECT {profile_projection(fields)} FROM StudentProfiles WHERE user_id = ?", (user_id,))
+            row = cursor.fetchone()
+        return StudentProfile.from_row(fields, row) if row else None
+
+    def list_profiles(self, fields=tuple(PROFILE_FIELDS)):
+        """Return every profile with only ``fields`` loaded."""
+        with self.transaction() as cursor:
+            cursor.execute(f"SELECT {profile_projection(fields)} FROM StudentProfiles")
+            return [StudentProfile.from_row(fields, row) for row in cursor.fetchall()]
+
+    def iter_profile_batches(self, columns=PROFILE_COLUMNS, batch_size=10000):
+        """
+        Yield raw ``columns`` tuples for every profile in user_id order, ``batch_size`` rows at a time.
+
+        Rows stream from one open cursor with ``fetchmany``, so memory is bounded by the batch
+        size rather than the table size. The connection stays checked out until the
+        generator is exhausted or closed.
+
+        Raises:
+            ValueError: If a column is not a StudentProfiles column.
+        """
+        unknown = [column for column in columns if column not in PROFILE_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown StudentProfiles columns: {', '.join(unknown)}")
+        with self.transaction() as cursor:
+            cursor.execute(f"SELECT {', '.join(columns)} FROM StudentProfiles ORDER BY user_id")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+
+    def create_profile(self, user_id, full_name, roll_number, semester_grades):
+        with self.profile_write(user_id) as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO StudentProfiles (user_id, full_name, roll_number, {_SEMESTER_LIST})
+                VALUES (?, ?, ?, {_SEMESTER_PARAMS})
+                """,
+                (user_id, full_name, roll_number, *semester_grades)
+            )
+
+    def update_profile(self, user_id, full_name, roll_number, semester_grades):
+        with self.profile_write(user_id) as cursor:
+            cursor.execute(
+                f"""
+                UPDATE StudentProfiles
+                SET full_name = ?, roll_number = ?, {_SEMESTER_ASSIGNMENTS},
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE user_id = ?
+                """,
+                (full_name, roll_number, *semester_grades, user_id)
+            )
+
+    def delete_profile(self, user_id):
+        with self.profile_write(user_id) as cursor:
+            cursor.execute("DELETE FROM StudentProfiles WHERE user_id = ?", (user_id,))
+
+    @abstractmethod
+    def save_grades(self, user_id, semester_grades):
+        """Update the user's semester grades, creating a placeholder profile if they have none."""
+
+    def list_roll_numbers(self):
+        """Return ``(roll_number, user_id)`` for every profile."""
+        with self.transaction() as cursor:
+            cursor.execute("SELECT roll_number, user_id FROM StudentProfiles")
+            return cursor.fetchall()
+
+    @abstractmethod
+    def upsert_profiles(self, profiles):
+        """
+        Create or replace many profiles in one transaction.
+
+        Args:
+            profiles (list): ``(user_id, full_name, roll_number, semester_1, ..., semester_8)`` tuples.
+
+        Derived metrics are stored with each row. Bulk writes skip the per-profile aggregate
+        deltas; call ``rebuild_aggregates`` once the import is finished.
+        """
+
+    @staticmethod
+    def _with_derived_metrics(profiles):
+        """Append the derived metrics to ``(user_id, full_name, roll_number, *grades)`` tuples."""
+        profiles = [tuple(profile) for profile in profiles]
+        metrics = derived_metrics([profile[3:11] for profile in profiles]) if profiles else []
+        return [profile + derived for profile, derived in zip(profiles, metrics)]
+
+    def backfill_derived_metrics(self, batch_size=10000, only_missing=True, progress=None):
+        """
+        Compute and store the derived metrics for existing profiles.
+
+        Profiles are processed in user_id ranges of ``batch_size``, one transaction each, so
+        the job can be interrupted and rerun; with ``only_missing`` a rerun skips rows that
+        are already populated.
+
+        Args:
+            batch_size (int): Width of each user_id range.
+            only_missing (bool): Only fill rows whose metrics are NULL.
+            progress (callable): Called with the running count of updated rows after each batch.
+
+        Returns:
+            int: Number of profiles updated.
+        """
+        with self.transaction() as cursor:
+            cursor.execute("SELECT MIN(user_id), MAX(user_id) FROM StudentProfiles")
+            first_id, last_id = cursor.fetchone()
+        if first_id is None:
+            return 0
+
+        missing_filter = " AND completed_semesters IS NULL" if only_missing else ""
+        updated = 0
+        for start in range(first_id, last_id + 1, batch_size):
+            with self.transaction() as cursor:
+                cursor.execute(
+                    f"SELECT user_id, {_SEMESTER_LIST} FROM StudentProfiles "
+                    f"WHERE user_id >= ? AND user_id < ?{missing_filter}",
+                    (start, start + batch_size)
+                )
+                rows = cursor.fetchall()
+                if not rows:
+                    continue
+                metrics = derived_metrics([row[1:] for row in rows])
+                self._prepare_bulk_cursor(cursor)
+                cursor.executemany(
+                    f"UPDATE StudentProfiles SET {_DERIVED_ASSIGNMENTS} WHERE user_id = ?",
+                    [(*derived, row[0]) for row, derived in zip(rows, metrics)]
+                )
+            updated += len(rows)
+            if progress is not None:
+                progress(updated)
+        return updated
+
+    def save_predictions(self, user_id, predicted_marks, predicted_attendance):
+        with self.profile_write(user_id) as cursor:
+            cursor.execute(
+                """
+                UPDATE StudentProfiles
+                SET predicted_exam_marks = ?, predicted_attendance = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE user_id = ?
+                """,
+                (predicted_marks, predicted_attendance, user_id)
+            )
+
+
+class SqlServerRepository(StudentRepository):
+    """SQL Server backend over pyodbc. Users and StudentProfiles are managed on the server."""
+
+    _LOCKED_PROFILE_QUERY = (
+        f"SELECT {_AGGREGATE_SOURCE_COLUMNS} FROM StudentProfiles WITH (UPDLOCK, HOLDLOCK) WHERE user_id = ?"
+    )
+
+    _TOP_USER_QUERY = (
+        "SELECT TOP 1 {expression}, user_id FROM ({source}) AS m WHERE {expression} IS NOT NULL "
+        "ORDER BY {expression} DESC, user_id"
+    )
+
+    _SCHEMA_TABLE_QUERY = "SELECT 1 WHERE OBJECT_ID('SchemaVersion', 'U') IS NOT NULL"
+
+    SCHEMA = """
+        IF OBJECT_ID('SchemaVersion', 'U') IS NULL
+            CREATE TABLE SchemaVersion (version INT NOT NULL);
+        IF OBJECT_ID('ClassAggregates', 'U') IS NULL
+            CREATE TABLE ClassAggregates (
+                metric VARCHAR(32) NOT NULL PRIMARY KEY,
+                value_sum FLOAT NOT NULL DEFAULT 0,
+                value_count INT NOT NULL DEFAULT 0,
+                max_value FLOAT NULL,
+                max_user_id INT NULL
+            );
+        IF COL_LENGTH('StudentProfiles', 'completed_semesters') IS NULL
+            ALTER TABLE StudentProfiles ADD
+                completed_semesters INT NULL,
+                average_cgpa FLOAT NULL,
+                highest_grade FLOAT NULL,
+                lowest_grade FLOAT NULL,
+                grade_trend VARCHAR(16) NULL;
+    """
+
+    # Separate batch: the index must see the columns added above
+    INDEXES = """
+        IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_StudentProfiles_average_cgpa')
+            CREATE INDEX IX_StudentProfiles_average_cgpa ON StudentProfiles (average_cgpa, user_id);
+    """
+
+    def __init__(self, pool):
+        super().__init__(pool)
+        self.integrity_errors = (pyodbc.IntegrityError,)
+
+    @classmethod
+    def connect(cls, connection_string=DEFAULT_SQLSERVER_CONNECTION_STRING, pool_size=10, migrate=False):
+        """Open a pooled repository; ``migrate`` upgrades the schema, otherwise it is only checked."""
+        if pyodbc is None:
+            raise RuntimeError("The SQL Server backend requires pyodbc")
+        repository = cls(ConnectionPool(lambda: pyodbc.connect(connection_string), max_size=pool_size))
+        if migrate:
+            repository.migrate()
+        else:
+            repository.check_schema()
+        return repository
+
+    def _create_schema(self):
+        with self.transaction() as cursor:
+            cursor.execute(self.SCHEMA)
+        with self.transaction() as cursor:
+            cursor.execute(self.INDEXES)
+
+    def _prepare_bulk_cursor(self, cursor):
+        # Send the whole parameter array in one round trip instead of one per row
+        cursor.fast_executemany = True
+
+    def save_grades(self, user_id, semester_grades):
+        with self.profile_write(user_id) as cursor:
+            cursor.execute(
+                f"""
+                IF EXISTS (SELECT 1 FROM StudentProfiles WHERE user_id = ?)
+                    UPDATE StudentProfiles
+                    SET {_SEMESTER_ASSIGNMENTS},
+                        updated_at = GETDATE()
+                    WHERE user_id = ?
+                ELSE
+                    INSERT INTO StudentProfiles (user_id, full_name, roll_number, {_SEMESTER_LIST})
+                    VALUES (?, 'Unknown', 'Unknown', {_SEMESTER_PARAMS})
+                """,
+                (user_id, *semester_grades, user_id, user_id, *semester_grades)
+            )
+
+    def upsert_profiles(self, profiles):
+        # Bulk-load a session temp table, then apply it with one set-based MERGE. The temp
+        # table is created inside the transaction, so a rollback removes it too.
+        with self.transaction() as cursor:
+            cursor.execute(
+                f"""
+                CREATE TABLE #ProfileImport (
+                    user_id INT NOT NULL PRIMARY KEY,
+                    full_name NVARCHAR(100) NOT NULL,
+                    roll_number NVARCHAR(50) NOT NULL,
+                    {", ".join(f"{column} FLOAT NOT NULL" for column in SEMESTER_COLUMNS)},
+                    completed_semesters INT NOT NULL,
+                    average_cgpa FLOAT NOT NULL,
+                    highest_grade FLOAT NOT NULL,
+                    lowest_grade FLOAT NOT NULL,
+                    grade_trend VARCHAR(16) NULL
+                )
+                """
+            )
+            self._prepare_bulk_cursor(cursor)
+            cursor.executemany(
+                f"""
+                INSERT INTO #ProfileImport (user_id, full_name, roll_number, {_SEMESTER_LIST}, {_DERIVED_LIST})
+                VALUES (?, ?, ?, {_SEMESTER_PARAMS}, {_DERIVED_PARAMS})
+                """,
+                self._with_derived_metrics(profiles)
+            )
+            cursor.execute(
+                f"""
+                MERGE StudentProfiles WITH (HOLDLOCK) AS target
+                USING #ProfileImport AS source ON target.user_id = source.user_id
+                WHEN MATCHED THEN UPDATE SET
+                    full_name = source.full_name, roll_number = source.roll_number,
+                    {", ".join(f"{column} = source.{column}" for column in SEMESTER_COLUMNS + DERIVED_COLUMNS)},
+                    updated_at = GETDATE()
+                WHEN NOT MATCHED THEN
+                    INSERT (user_id, full_name, roll_number, {_SEMESTER_LIST}, {_DERIVED_LIST})
+                    VALUES (source.user_id, source.full_name, source.roll_number,
+                            {", ".join(f"source.{column}" for column in SEMESTER_COLUMNS + DERIVED_COLUMNS)});
+                """
+            )
+            cursor.execute("DROP TABLE #ProfileImport")
+
+
+class SqliteRepository(StudentRepository):
+    """
+    SQLite backend for local runs, tests and single-node deployments.
+
+    Connections run in WAL mode so readers do not block the writer, and keep a large
+    statement cache so the fixed, parameterised queries are compiled once per connection.
+    """
+
+    integrity_errors = (sqlite3.IntegrityError,)
+
+    _SCHEMA_TABLE_QUERY = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'SchemaVersion'"
+
+    SCHEMA = f"""
+        CREATE TABLE IF NOT EXISTS SchemaVersion (version INTEGER NOT NULL);
+        CREATE TABLE IF NOT EXISTS Users (
+            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL UNIQUE,
+            password BLOB NOT NULL,
+            email TEXT NOT NULL UNIQUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE IF NOT EXISTS StudentProfiles (
+            profile_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL UNIQUE REFERENCES Users(user_id) ON DELETE CASCADE,
+            full_name TEXT NOT NULL,
+            roll_number TEXT NOT NULL UNIQUE,
+            {", ".join(f"{column} REAL NOT NULL DEFAULT 0" for column in SEMESTER_COLUMNS)},
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            predicted_exam_marks REAL,
+            predicted_attendance REAL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            completed_semesters INTEGER,
+            average_cgpa REAL,
+            highest_grade REAL,
+            lowest_grade REAL,
+            grade_trend TEXT
+        );
+        CREATE TABLE IF NOT EXISTS ClassAggregates (
+            metric TEXT NOT NULL PRIMARY KEY,
+            value_sum REAL NOT NULL DEFAULT 0,
+            value_count INTEGER NOT NULL DEFAULT 0,
+            max_value REAL,
+            max_user_id INTEGER
+        );
+    """
+
+    # Columns added after the first release, created on databases that predate them
+    ADDED_COLUMNS = [
+        ('completed_semesters', 'INTEGER'),
+        ('average_cgpa', 'REAL'),
+        ('highest_grade', 'REAL'),
+        ('lowest_grade', 'REAL'),
+        ('grade_trend', 'TEXT'),
+    ]
+
+    INDEXES = """
+        CREATE INDEX IF NOT EXISTS idx_profiles_average_cgpa ON StudentProfiles (average_cgpa, user_id);
+    """
+
+    @staticmethod
+    def open_connection(path):
+        conn = sqlite3.connect(path, timeout=30, check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    @classmethod
+    def connect(cls, path=DEFAULT_SQLITE_PATH, pool_size=10, migrate=False):
+        """Open a pooled repository; ``migrate`` creates or upgrades the schema, otherwise it is only checked."""
+        repository = cls(ConnectionPool(lambda: cls.open_connection(path), max_size=pool_size))
+        if migrate:
+            repository.migrate()
+        else:
+            repository.check_schema()
+        return repository
+
+    def _create_schema(self):
+        with self.pool.connection() as conn:
+            conn.executescript(self.SCHEMA)
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(StudentProfiles)")}
+            for column, column_type in self.ADDED_COLUMNS:
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE StudentProfiles ADD COLUMN {column} {column_type}")
+            conn.executescript(self.INDEXES)
+            conn.commit()
+
+    def _begin_write(self, cursor):
+        # Take the write lock up front so the aggregate delta is computed from a stable row
+        cursor.execute("BEGIN IMMEDIATE")
+
+    def save_grades(self, user_id, semester_grades):
+        with self.profile_write(user_id) as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO StudentProfiles (user_id, full_name, roll_number, {_SEMESTER_LIST})
+                VALUES (?, 'Unknown', 'Unknown', {_SEMESTER_PARAMS})
+                ON CONFLICT(user_id) DO UPDATE SET
+                    {", ".join(f"{column} = excluded.{column}" for column in SEMESTER_COLUMNS)},
+                    updated_at = CURRENT_TIMESTAMP
+                """,
+                (user_id, *semester_grades)
+            )
+
+    def upsert_profiles(self, profiles):
+        with self.transaction() as cursor:
+            cursor.executemany(
+                f"""
+                INSERT INTO StudentProfiles (user_id, full_name, roll_number, {_SEMESTER_LIST}, {_DERIVED_LIST})
+                VALUES (?, ?, ?, {_SEMESTER_PARAMS}, {_DERIVED_PARAMS})
+                ON CONFLICT(user_id) DO UPDATE SET
+                    full_name = excluded.full_name, roll_number = excluded.roll_number,
+                    {", ".join(f"{column} = excluded.{column}" for column in SEMESTER_COLUMNS + DERIVED_COLUMNS)},
+                    updated_at = CURRENT_TIMESTAMP
+                """,
+                self._with_derived_metrics(profiles)
+            )
+
+
+def create_repository(backend=None, migrate=False):
+    """
+    Build the repository selected by the environment.
+
+    ``STUDENT_DB_BACKEND`` picks ``sqlserver`` (default) or ``sqlite``.
+    ``STUDENT_DB_CONNECTION_STRING`` overrides the SQL Server ODBC connection string,
+    ``STUDENT_DB_PATH`` the SQLite database file and ``STUDENT_DB_POOL_SIZE`` the pool size.
+
+    Raises:
+        SchemaError: Unless ``migrate``, if the database has not been migrated to ``SCHEMA_VERSION``.
+    """
+    backend = (backend or os.environ.get('STUDENT_DB_BACKEND', 'sqlserver')).lower()
+    pool_size = int(os.environ.get('STUDENT_DB_POOL_SIZE', 10))
+    if backend == 'sqlserver':
+        connection_string = os.environ.get('STUDENT_DB_CONNECTION_STRING', DEFAULT_SQLSERVER_CONNECTION_STRING)
+        return SqlServerRepository.connect(connection_string, pool_size=pool_size, migrate=migrate)
+    if backend == 'sqlite':
+        return SqliteRepository.connect(os.environ.get('STUDENT_DB_PATH', DEFAULT_SQLITE_PATH), pool_size=pool_size,
+                                        migrate=migrate)
+    raise ValueError(f"Unknown database backend '{backend}'; expected 'sqlserver' or 'sqlite'")
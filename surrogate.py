@@ -0,0 +1,364 @@
+import argparse
+import hashlib
+import itertools
+import json
+import logging
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from compact_model import COMPACT_ARRAYS, COMPACT_META_FILE, COMPACT_SUFFIX, load_model
+from fast_inference import VERIFY_RANGES, verification_inputs
+from instrumentation import increment, span
+from prediction import ATTENDANCE_FEATURES, EXAM_FEATURES, apply_exam_boost
+
+# Directory written by build_surrogate; when set, the app answers sweeps from it
+SURROGATE_ENV = 'STUDENT_SURROGATE_DIR'
+
+SURROGATE_META_FILE = 'surrogate.json'
+SURROGATE_FORMAT_VERSION = 1
+# One table per model: raw model output (before the exam boost / attendance clamp) at each grid point
+SURROGATE_TABLES = {'exam': EXAM_FEATURES, 'attendance': ATTENDANCE_FEATURES}
+
+# Grid points per feature. 9 points per exam feature is 531,441 model evaluations (2 MB as
+# float32); attendance has only three inputs, so it affords a much finer grid.
+DEFAULT_EXAM_POINTS = 9
+DEFAULT_ATTENDANCE_POINTS = 41
+DEFAULT_CHUNK_SIZE = 65536
+DEFAULT_ERROR_SAMPLES = 20000
+
+
+class GridTable:
+    """
+    Multilinear interpolation over a regular grid of model outputs.
+
+    ``values`` has one axis per feature, grid point ``i`` of a feature sitting at
+    ``low + i * (high - low) / (points - 1)``. Inputs outside the grid are clamped to its edge.
+    """
+
+    def __init__(self, features, lows, highs, values):
+        self.features = list(features)
+        self.values = values
+        self.shape = np.asarray(values.shape)
+        if len(self.shape) != len(self.features) or (self.shape < 2).any():
+            raise ValueError("A surrogate table needs at least 2 grid points per feature")
+        self.lows = np.asarray(lows, dtype=float)
+        self.highs = np.asarray(highs, dtype=float)
+        self.steps = (self.highs - self.lows) / (self.shape - 1)
+        self._last_cell = self.shape - 2
+        self._last_point = (self.shape - 1).astype(float)
+        # Plain ndarray view (a memory-mapped table stays mapped but skips np.memmap's overhead)
+        self._flat = np.asarray(values).view(np.ndarray).reshape(-1)
+        self._strides = np.cumprod([1, *self.shape[:0:-1]])[::-1].astype(np.int64)
+        # Every corner of a grid cell as an offset into the flat table, first axis most significant
+        corners = np.array(list(itertools.product((0, 1), repeat=len(self.features))), dtype=np.int64)
+        self._offsets = corners @ self._strides
+        self._scalar_axes = list(zip(self.lows.tolist(), self.steps.tolist(), self._last_cell.tolist(), self._strides.tolist()))
+
+    def _locate(self, X):
+        position = np.clip((X - self.lows) / self.steps, 0.0, self._last_point)
+        cell = np.minimum(position.astype(np.int64), self._last_cell)
+        return cell, position - cell
+
+    def lookup_one(self, x):
+        """Interpolate one input vector (features in table order)."""
+        # Plain Python floats: for a single row this beats NumPy's per-call overhead
+        first, fractions = 0, []
+        for value, (low, step, last_cell, stride) in zip(x, self._scalar_axes):
+            position = min(max((value - low) / step, 0.0), last_cell + 1.0)
+            cell = min(int(position), last_cell)
+            first += cell * stride
+            fractions.append(position - cell)
+        # The cell's corners, first axis most significant; halve along each axis in turn
+        cube = self._flat[first + self._offsets].tolist()
+        for t in fractions:
+            half = len(cube) // 2
+            cube = [low + t * (high - low) for low, high in zip(cube[:half], cube[half:])]
+        return cube[0]
+
+    def lookup(self, X):
+        """Interpolate a 2-D array of inputs (features in table order)."""
+        X = np.asarray(X, dtype=float).reshape(-1, len(self.features))
+        cell, fraction = self._locate(X)
+        # Corner weights built up axis by axis, in the same order as the offsets
+        weights = np.ones((len(X), 1))
+        for axis in reversed(range(len(self.features))):
+            t = fraction[:, axis, None]
+            weights = np.concatenate([weights * (1.0 - t), weights * t], axis=1)
+        first_corner = cell @ self._strides
+        return (weights * self._flat[first_corner[:, None] + self._offsets[None, :]]).sum(axis=1)
+
+
+class Surrogate:
+    """
+    Gridded stand-in for ``exam_model`` + scaler and ``attendance_model``.
+
+    Exam inputs are the six raw ``EXAM_FEATURES`` and attendance inputs the three
+    ``ATTENDANCE_FEATURES``, as for ``prediction.py``. The exam boost rule and the
+    attendance clamp are applied after interpolation, so their thresholds stay exact.
+    ``meta['error']`` holds the maximum error against the real models measured at build time.
+    """
+
+    def __init__(self, exam_table, attendance_table, meta):
+        self.exam = exam_table
+        self.attendance = attendance_table
+        self.meta = meta
+
+    def predict_exam_one(self, previous_percentage, attendance, study_hours, commute_time, board_exam_marks, tuition_hours):
+        with span('surrogate.predict_exam'):
+            raw = self.exam.lookup_one((previous_percentage, attendance, study_hours, commute_time, board_exam_marks, tuition_hours))
+        increment('surrogate.predictions.exam')
+        return float(apply_exam_boost([raw], [previous_percentage], [attendance])[0])
+
+    def predict_exam(self, X):
+        """Predict a 2-D array of students with columns in ``EXAM_FEATURES`` order."""
+        X = np.asarray(X, dtype=float).reshape(-1, len(EXAM_FEATURES))
+        with span('surrogate.predict_exam'):
+            raw = self.exam.lookup(X)
+        increment('surrogate.predictions.exam', len(X))
+        return apply_exam_boost(raw, X[:, 0], X[:, 1])
+
+    def predict_attendance_one(self, past_attendance, study_hours, commute_time):
+        with span('surrogate.predict_attendance'):
+            raw = self.attendance.lookup_one((past_attendance, study_hours, commute_time))
+        increment('surrogate.predictions.attendance')
+        return min(max(raw, 0.0), 100.0)
+
+    def predict_attendance(self, X):
+        """Predict a 2-D array of students with columns in ``ATTENDANCE_FEATURES`` order."""
+        with span('surrogate.predict_attendance'):
+            raw = self.attendance.lookup(X)
+        increment('surrogate.predictions.attendance', len(raw))
+        return np.clip(raw, 0, 100)
+
+    def check_sources(self, paths):
+        """
+        Make sure the surrogate was built from these model files.
+
+        Args:
+            paths (dict): Role (``exam_model``, ``scaler``, ``attendance_model``) -> file path.
+
+        Raises:
+            ValueError: If a model's files differ from the ones the surrogate was built from.
+        """
+        stale = [role for role, path in paths.items() if source_digest(path) != self.meta['sources'].get(role)]
+        if stale:
+            raise ValueError(f"Surrogate is out of date for: {', '.join(stale)}; rebuild it with surrogate.py")
+
+
+def file_digest(path):
+    """SHA-256 of a file's contents, or None if it does not exist."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def source_digest(path):
+    """
+    Digest of a model file together with its compact export, if it has one.
+
+    The app may load ``<stem>_compact/`` instead of the pickle (``compact_model.load_model``),
+    so the export's metadata and arrays are part of what a surrogate was built from.
+
+    Returns:
+        str: SHA-256 over the file digests, or None if the model file does not exist.
+    """
+    pickle_digest = file_digest(path)
+    compact_path = os.path.splitext(path)[0] + COMPACT_SUFFIX
+    if pickle_digest is None or not os.path.isdir(compact_path):
+        return pickle_digest
+    digest = hashlib.sha256(pickle_digest.encode('ascii'))
+    for name in (COMPACT_META_FILE, *(f"{array}.npy" for array in COMPACT_ARRAYS)):
+        digest.update(f"{name}:{file_digest(os.path.join(compact_path, name))}".encode('ascii'))
+    return digest.hexdigest()
+
+
+def grid_axes(features, points, overrides=None):
+    """``(feature, low, high, points)`` for each feature, over the prediction form's ranges."""
+    overrides = overrides or {}
+    return [(name, *VERIFY_RANGES[name], overrides.get(name, points)) for name in features]
+
+
+def _raw_exam(exam_model, scaler, X):
+    return exam_model.predict(scaler.transform(pd.DataFrame(X, columns=EXAM_FEATURES)))
+
+
+def _raw_attendance(attendance_model, X):
+    return attendance_model.predict(pd.DataFrame(X, columns=ATTENDANCE_FEATURES))
+
+
+def _fill_table(path, axes, predict, chunk_size):
+    shape = tuple(points for _, _, _, points in axes)
+    grids = [np.linspace(low, high, points) for _, low, high, points in axes]
+    table = np.lib.format.open_memmap(path, mode='w+', dtype=np.float32, shape=shape)
+    flat = table.reshape(-1)
+    for start in range(0, flat.size, chunk_size):
+        stop = min(start + chunk_size, flat.size)
+        indices = np.unravel_index(np.arange(start, stop), shape)
+        X = np.column_stack([grid[index] for grid, index in zip(grids, indices)])
+        flat[start:stop] = predict(X)
+    table.flush()
+    del table
+
+
+def load_surrogate(path, mmap_mode='r'):
+    """
+    Load a surrogate written by ``build_surrogate``; the tables are memory-mapped by default.
+
+    Raises:
+        ValueError: If it was written by an incompatible format version.
+    """
+    with open(os.path.join(path, SURROGATE_META_FILE)) as f:
+        meta = json.load(f)
+    if meta['format_version'] != SURROGATE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported surrogate format version {meta['format_version']}")
+    return _open_tables(path, meta, mmap_mode)
+
+
+def _open_tables(path, meta, mmap_mode='r'):
+    tables = {}
+    for name in SURROGATE_TABLES:
+        axes = meta['tables'][name]['axes']
+        values = np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+        tables[name] = GridTable([axis['feature'] for axis in axes], [axis['low'] for axis in axes],
+                                 [axis['high'] for axis in axes], values)
+    return Surrogate(tables['exam'], tables['attendance'], meta)
+
+
+def error_report(surrogate, exam_model, scaler, attendance_model, n_samples=DEFAULT_ERROR_SAMPLES, seed=0):
+    """
+    Compare the surrogate with the real models on seeded random students over the form's ranges.
+
+    Errors are on the final predictions (exam boost and attendance clamp applied).
+
+    Returns:
+        dict: Per table, ``max_abs_error``, ``p99_abs_error``, ``mean_abs_error`` and the
+        ``worst_input`` (feature -> value).
+    """
+    report = {}
+    checks = {
+        'exam': (EXAM_FEATURES, surrogate.predict_exam,
+                 lambda X: apply_exam_boost(_raw_exam(exam_model, scaler, X), X[:, 0], X[:, 1])),
+        'attendance': (ATTENDANCE_FEATURES, surrogate.predict_attendance,
+                       lambda X: np.clip(_raw_attendance(attendance_model, X), 0, 100)),
+    }
+    for name, (features, approximate, exact) in checks.items():
+        X = verification_inputs(features, n_samples, seed)
+        errors = np.abs(approximate(X) - exact(X))
+        worst = int(errors.argmax())
+        report[name] = {
+            'samples': n_samples,
+            'max_abs_error': float(errors.max()),
+            'p99_abs_error': float(np.percentile(errors, 99)),
+            'mean_abs_error': float(errors.mean()),
+            'worst_input': dict(zip(features, X[worst].tolist())),
+        }
+    return report
+
+
+def write_surrogate(output, exam_model, scaler, attendance_model, exam_points=DEFAULT_EXAM_POINTS,
+                    attendance_points=DEFAULT_ATTENDANCE_POINTS, point_overrides=None, sources=None,
+                    chunk_size=DEFAULT_CHUNK_SIZE, error_samples=DEFAULT_ERROR_SAMPLES):
+    """
+    Evaluate fitted models on a grid over the prediction form's ranges and write it to ``output``.
+
+    ``output`` gets ``exam.npy`` and ``attendance.npy`` (float32, memory-mappable) and
+    ``surrogate.json`` with the grid axes, the model file digests and the error report.
+
+    Args:
+        exam_points (int): Grid points per exam feature.
+        attendance_points (int): Grid points per attendance feature.
+        point_overrides (dict): Feature name -> grid points, for either table.
+        sources (dict): Role -> ``source_digest`` of the models, checked by ``Surrogate.check_sources``.
+
+    Returns:
+        Surrogate: The surrogate just written, loaded back from ``output``.
+    """
+    points = {'exam': exam_points, 'attendance': attendance_points}
+    predictors = {
+        'exam': lambda X: _raw_exam(exam_model, scaler, X),
+        'attendance': lambda X: _raw_attendance(attendance_model, X),
+    }
+    os.makedirs(output, exist_ok=True)
+    meta = {'format_version': SURROGATE_FORMAT_VERSION, 'tables': {}, 'sources': sources or {}}
+    for name, features in SURROGATE_TABLES.items():
+        axes = grid_axes(features, points[name], point_overrides)
+        start = time.perf_counter()
+        with span('surrogate.build'):
+            _fill_table(os.path.join(output, f"{name}.npy"), axes, predictors[name], chunk_size)
+        n_points = int(np.prod([axis_points for *_, axis_points in axes]))
+        meta['tables'][name] = {
+            'axes': [{'feature': feature, 'low': low, 'high': high, 'points': axis_points}
+                     for feature, low, high, axis_points in axes],
+            'grid_points': n_points,
+            'build_seconds': time.perf_counter() - start,
+        }
+        logging.info(f"{name}: {n_points:,} grid points in {meta['tables'][name]['build_seconds']:.1f}s")
+
+    meta['error'] = error_report(_open_tables(output, meta), exam_model, scaler, attendance_model, error_samples)
+    # Metadata last: a directory without it is an unfinished build
+    with open(os.path.join(output, SURROGATE_META_FILE), 'w') as f:
+        json.dump(meta, f, indent=2)
+    return load_surrogate(output)
+
+
+def build_surrogate(output, exam_model_path='exam_model.pkl', scaler_path='scaler_exam.pkl',
+                    attendance_model_path='attendance_model.pkl', **options):
+    """Load the installed models and ``write_surrogate`` them, recording their ``source_digest``."""
+    sources = {
+        'exam_model': source_digest(exam_model_path),
+        'scaler': source_digest(scaler_path),
+        'attendance_model': source_digest(attendance_model_path),
+    }
+    exam_model, attendance_model = load_model(exam_model_path), load_model(attendance_model_path)
+    return write_surrogate(output, exam_model, joblib.load(scaler_path), attendance_model, sources=sources, **options)
+
+
+def parse_points(values):
+    """Parse ``["study_hours=31", ...]`` into ``{'study_hours': 31}``."""
+    overrides = {}
+    for value in values:
+        name, _, points = value.partition('=')
+        if name not in VERIFY_RANGES:
+            raise ValueError(f"Unknown feature '{name}'; expected one of {', '.join(VERIFY_RANGES)}")
+        overrides[name] = int(points)
+    return overrides
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute a gridded surrogate of the exam and attendance models.")
+    parser.add_argument('output', help="Surrogate directory, e.g. surrogate/")
+    parser.add_argument('--exam-model', default='exam_model.pkl')
+    parser.add_argument('--scaler', default='scaler_exam.pkl')
+    parser.add_argument('--attendance-model', default='attendance_model.pkl')
+    parser.add_argument('--exam-points', type=int, default=DEFAULT_EXAM_POINTS, help="Grid points per exam feature")
+    parser.add_argument('--attendance-points', type=int, default=DEFAULT_ATTENDANCE_POINTS,
+                        help="Grid points per attendance feature")
+    parser.add_argument('--points', nargs='+', default=[], metavar='FEATURE=N',
+                        help="Grid points for individual features, e.g. study_hours=31")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Grid points per model call")
+    parser.add_argument('--error-samples', type=int, default=DEFAULT_ERROR_SAMPLES,
+                        help="Random students used to measure the error against the real models")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    surrogate = build_surrogate(args.output, args.exam_model, args.scaler, args.attendance_model,
+                                exam_points=args.exam_points, attendance_points=args.attendance_points,
+                                point_overrides=parse_points(args.points), chunk_size=args.chunk_size,
+                                error_samples=args.error_samples)
+    for name, error in surrogate.meta['error'].items():
+        worst = ', '.join(f"{feature}={value:.2f}" for feature, value in error['worst_input'].items())
+        logging.info(f"{name}: max error {error['max_abs_error']:.3f} (p99 {error['p99_abs_error']:.3f}, "
+                     f"mean {error['mean_abs_error']:.3f}) over {error['samples']:,} students; worst at {worst}")
+
+
+if __name__ == "__main__":
+    main()
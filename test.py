@@ -1,13 +1,8 @@
-import pyodbc
+from storage import create_repository
 
-conn_str = (
-        "DRIVER={ODBC Driver 17 for SQL Server};"
-        "SERVER=FRENZY\\SQLEXPRESS;" 
-        "DATABASE=DYPATU_StudentDB;"
-        "Trusted_Connection=yes;"
-    )
 try:
-    conn = pyodbc.connect(conn_str)
+    repository = create_repository()
+    repository.ping()
     print("connection successful")
 except Exception as e:
-    print(f"error: {e}")
\ No newline at end of file
+    print(f"error: {e}")
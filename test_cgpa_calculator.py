@@ -0,0 +1,89 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from cgpa_calculator import (TREND_DECLINING, TREND_IMPROVING, TREND_INCONSISTENT, average_cgpa, calculate_required_marks,
+                             calculate_required_marks_bulk, clamp_grades, summarize_grades_bulk)
+
+
+def test_calculate_required_marks_bulk_matches_scalar():
+    cases = list(itertools.product(
+        [0.0, 5.5, 7.25, 9.9, 10.0, 62.0, 100.0, -1.0, 101.0],  # current
+        [0, 20, 75, -10],                                      # credits completed
+        [0, 25, 80, -5],                                       # credits remaining
+        [0.0, 6.0, 8.75, 10.0, 85.0, 11.0],                    # target
+        ['cgpa', 'percentage'],
+    ))
+    current, completed, remaining, target, scale = (np.array(column) for column in zip(*cases))
+    bulk = calculate_required_marks_bulk(current, completed, remaining, target, scale)
+
+    for i, case in enumerate(cases):
+        try:
+            expected = calculate_required_marks(*case)
+        except ValueError:
+            assert bulk['invalid'][i], case
+            assert np.isnan(bulk['required'][i])
+            continue
+        assert not bulk['invalid'][i], case
+        if expected is None:
+            assert np.isnan(bulk['required'][i]), case
+        else:
+            # Same operations in the same order, so the results are identical, not just close
+            assert bulk['required'][i] == expected, case
+
+
+def test_calculate_required_marks_bulk_flags():
+    bulk = calculate_required_marks_bulk([9.0, 5.0, 5.0, 5.0], [80, 80, 80, 0], [20, 20, 20, 0], [9.5, 8.0, 4.0, 5.0])
+    np.testing.assert_array_equal(bulk['required'], [10.0, 10.0, 0.0, np.nan])
+    assert bulk['infeasible'].tolist() == [True, True, False, False]
+    assert bulk['achieved'].tolist() == [False, False, True, False]
+    assert bulk['invalid'].tolist() == [False, False, False, True]
+
+
+def test_calculate_required_marks_bulk_rejects_unknown_scale():
+    bulk = calculate_required_marks_bulk(7.0, 10, 10, 8.0, 'gpa')
+    assert bulk['invalid'].all()
+    with pytest.raises(ValueError):
+        calculate_required_marks(7.0, 10, 10, 8.0, 'gpa')
+
+
+def scalar_summary(semester_grades):
+    """The profile page's per-student summary, as its Python loops compute it."""
+    grades = clamp_grades(semester_grades)
+    completed = sum(1 for grade in grades if grade > 0)
+    highest = max(grades[:completed]) if completed > 0 else 0
+    nonzero = [grade for grade in grades[:completed] if grade > 0]
+    lowest = min(nonzero) if nonzero else 0
+    trend = None
+    if completed >= 2:
+        differences = [grades[i] - grades[i - 1] for i in range(1, completed)]
+        average_difference = sum(differences) / len(differences)
+        if average_difference > 0:
+            trend = TREND_IMPROVING
+        elif average_difference < 0:
+            trend = TREND_DECLINING
+        else:
+            trend = TREND_INCONSISTENT
+    return grades, completed, average_cgpa(grades), highest, lowest, trend
+
+
+def test_summarize_grades_bulk_matches_scalar():
+    rng = np.random.default_rng(0)
+    grades = np.round(rng.uniform(-2, 12, (500, 8)), 2)
+    # Profiles with fewer completed semesters, zeros in the middle and flat grades
+    for i in range(0, 500, 5):
+        grades[i, rng.integers(0, 9):] = 0
+    grades[1] = 0
+    grades[2] = [7.0] * 8
+    grades[3] = [8.0, 0.0, 9.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+
+    summary = summarize_grades_bulk(grades)
+    for i, row in enumerate(grades.tolist()):
+        clamped, completed, average, highest, lowest, trend = scalar_summary(row)
+        assert summary['grades'][i].tolist() == clamped
+        assert summary['completed'][i] == completed
+        assert summary['average_cgpa'][i] == average
+        assert summary['highest_grade'][i] == highest
+        assert summary['lowest_grade'][i] == lowest
+        assert summary['trend'][i] == trend, row
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from compact_model import flatten_forest
+from explanations import (explain_attendance_batch, explain_exam_marks_batch, explanation_row, forest_contributions,
+                          linear_contributions, model_contributions)
+from fast_inference import verification_inputs
+from prediction import ATTENDANCE_FEATURES, EXAM_FEATURES, predict_attendance_batch, predict_exam_marks_batch
+
+
+def test_exam_contributions_add_up_to_the_prediction(exam_model, scaler, exam_inputs):
+    explanation = explain_exam_marks_batch(exam_model, scaler, exam_inputs)
+    assert explanation['features'] == EXAM_FEATURES
+    assert explanation['contributions'].shape == exam_inputs.shape
+    total = explanation['base'] + explanation['contributions'].sum(axis=1) + explanation['adjustment']
+    np.testing.assert_allclose(total, explanation['prediction'], rtol=0, atol=1e-9)
+    np.testing.assert_allclose(explanation['prediction'], predict_exam_marks_batch(exam_model, scaler, exam_inputs),
+                               rtol=0, atol=1e-9)
+    # The boost rule shows up as the adjustment, and only for boosted students
+    boosted = (exam_inputs[:, 0] > 85) & (exam_inputs[:, 1] > 90) | (exam_inputs[:, 0] < 60) | (exam_inputs[:, 1] < 70)
+    assert boosted.any() and not boosted.all()
+    assert (explanation['adjustment'][~boosted] == 0).all()
+
+
+def test_attendance_clamp_is_the_adjustment(attendance_model):
+    inputs = np.vstack([verification_inputs(ATTENDANCE_FEATURES, n_samples=200, seed=5),
+                        [[0.0, 0.0, 10.0], [150.0, 40.0, 0.0]]])
+    explanation = explain_attendance_batch(attendance_model, inputs)
+    total = explanation['base'] + explanation['contributions'].sum(axis=1) + explanation['adjustment']
+    np.testing.assert_allclose(total, explanation['prediction'], rtol=0, atol=1e-9)
+    np.testing.assert_allclose(explanation['prediction'], predict_attendance_batch(attendance_model, inputs),
+                               rtol=0, atol=1e-9)
+    assert ((explanation['prediction'] >= 0) & (explanation['prediction'] <= 100)).all()
+
+
+def test_forest_contributions_match_sklearn_and_the_compact_forest(exam_model, scaler, exam_inputs):
+    scaled = scaler.transform(pd.DataFrame(exam_inputs, columns=EXAM_FEATURES))
+    base, contributions = forest_contributions(exam_model, scaled)
+    np.testing.assert_allclose(base + contributions.sum(axis=1), exam_model.predict(scaled), rtol=0, atol=1e-9)
+
+    compact_base, compact_contributions = forest_contributions(flatten_forest(exam_model), scaled)
+    assert compact_base == base
+    np.testing.assert_array_equal(compact_contributions, contributions)
+
+
+def test_forest_credits_only_features_it_splits_on():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 1, (300, 3))
+    # Constant columns are never split on, so only the first feature can be credited
+    model = RandomForestRegressor(n_estimators=5, max_depth=4, random_state=0)
+    model.fit(np.column_stack([X[:, 0], np.zeros((300, 2))]), 10 * X[:, 0])
+    _, contributions = forest_contributions(model, X)
+    assert (contributions[:, 1:] == 0).all()
+    assert np.abs(contributions[:, 0]).sum() > 0
+
+
+def test_linear_contributions(linear_exam_model, exam_inputs):
+    features = list(linear_exam_model.feature_names_in_)
+    frame = pd.DataFrame(exam_inputs, columns=EXAM_FEATURES)[features]
+    base, contributions = model_contributions(linear_exam_model, frame.to_numpy())
+    assert base == linear_exam_model.intercept_
+    np.testing.assert_allclose(contributions, frame.to_numpy() * linear_exam_model.coef_, rtol=0, atol=0)
+    np.testing.assert_allclose(base + contributions.sum(axis=1), linear_exam_model.predict(frame), rtol=0, atol=1e-9)
+    assert linear_contributions(linear_exam_model, frame)[1].shape == frame.shape
+
+
+def test_model_contributions_rejects_unknown_models():
+    with pytest.raises(TypeError):
+        model_contributions(object(), np.zeros((1, 6)))
+
+
+def test_explanation_row(exam_model, scaler, exam_inputs):
+    explanation = explain_exam_marks_batch(exam_model, scaler, exam_inputs[:3])
+    row = explanation_row(explanation, 2)
+    assert list(row['contributions']) == EXAM_FEATURES
+    assert row['contributions']['study_hours'] == explanation['contributions'][2, 2]
+    assert row['prediction'] == explanation['prediction'][2]
+    assert all(isinstance(value, float) for value in (row['base'], row['adjustment'], row['prediction']))
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from compact_model import flatten_forest
+from fast_inference import (FastAttendancePredictor, FastExamPredictor, verification_inputs, verify_attendance_predictor,
+                            verify_exam_predictor)
+from prediction import (ATTENDANCE_FEATURES, EXAM_FEATURES, apply_exam_boost, predict_attendance_batch,
+                        predict_exam_marks_batch)
+
+
+def test_fast_exam_predictor_matches_sklearn(exam_model, scaler, exam_inputs):
+    expected = predict_exam_marks_batch(exam_model, scaler, exam_inputs)
+    for model in (exam_model, flatten_forest(exam_model)):
+        predictor = FastExamPredictor(model, scaler)
+        np.testing.assert_array_equal(predictor.predict(exam_inputs), expected)
+        np.testing.assert_array_equal([predictor.predict_one(*row) for row in exam_inputs.tolist()], expected)
+
+
+def test_fast_exam_predictor_on_a_feature_subset(linear_exam_model, exam_inputs):
+    features = list(linear_exam_model.feature_names_in_)
+    frame = pd.DataFrame(exam_inputs, columns=EXAM_FEATURES)
+    expected = apply_exam_boost(linear_exam_model.predict(frame[features]), exam_inputs[:, 0], exam_inputs[:, 1])
+
+    predictor = FastExamPredictor(linear_exam_model, features=features)
+    np.testing.assert_allclose(predictor.predict(exam_inputs), expected, rtol=0, atol=1e-9)
+    np.testing.assert_allclose([predictor.predict_one(*row) for row in exam_inputs.tolist()], expected, rtol=0, atol=1e-9)
+
+
+def test_fast_exam_predictor_rejects_scaled_subsets(exam_model, scaler):
+    with pytest.raises(ValueError):
+        FastExamPredictor(exam_model, scaler, features=EXAM_FEATURES[:5])
+
+
+def test_fast_attendance_predictor_matches_sklearn(attendance_model):
+    inputs = verification_inputs(ATTENDANCE_FEATURES, n_samples=400, seed=5)
+    # Rows outside the training ranges exercise the [0, 100] clamp
+    inputs = np.vstack([inputs, [[0.0, 0.0, 10.0], [150.0, 40.0, 0.0]]])
+    expected = predict_attendance_batch(attendance_model, inputs)
+
+    predictor = FastAttendancePredictor(attendance_model)
+    np.testing.assert_array_equal(predictor.predict(inputs), expected)
+    np.testing.assert_array_equal([predictor.predict_one(*row) for row in inputs.tolist()], expected)
+
+
+def test_verification_passes_and_catches_mismatches(exam_model, scaler, attendance_model):
+    predictor = FastExamPredictor(exam_model, scaler)
+    verify_exam_predictor(predictor, lambda X: predict_exam_marks_batch(exam_model, scaler, X))
+    verify_attendance_predictor(FastAttendancePredictor(attendance_model), attendance_model)
+
+    with pytest.raises(ValueError):
+        verify_exam_predictor(predictor, lambda X: predict_exam_marks_batch(exam_model, scaler, X) + 0.01)
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from goal_solver import ADJUSTABLE_INPUTS, candidate_grid, solve
+from prediction import predict_attendance_batch, predict_exam_marks_batch
+from score_cohort import INPUT_COLUMNS, exam_inputs
+
+STUDENT = {'previous_percentage': 72.0, 'past_attendance': 82.0, 'study_hours': 8.25, 'commute_time': 1.0,
+           'board_exam_marks': 70.0, 'tuition_hours': 2.0}
+
+
+@pytest.fixture(scope='module')
+def grid(exam_model, scaler, attendance_model):
+    """Every candidate for STUDENT in search order, with both predictions."""
+    candidates, costs = candidate_grid(STUDENT)
+    columns = {name: np.full(len(candidates), STUDENT[name]) for name in INPUT_COLUMNS}
+    for i, name in enumerate(ADJUSTABLE_INPUTS):
+        columns[name] = candidates[:, i]
+    marks = predict_exam_marks_batch(exam_model, scaler, exam_inputs(columns))
+    attendance = predict_attendance_batch(attendance_model, {name: columns[name] for name in
+                                                             ('past_attendance', 'study_hours', 'commute_time')})
+    return candidates, costs, marks, attendance
+
+
+def test_candidate_grid_starts_with_no_change():
+    candidates, costs = candidate_grid(STUDENT)
+    current = [STUDENT[name] for name in ADJUSTABLE_INPUTS]
+    # The off-step current study hours are added to the search
+    assert candidates[0].tolist() == current and costs[0] == 0
+    assert len(candidates) == 32 * 21 * 21
+    assert (np.diff(costs) >= 0).all()
+    for (low, high, _), column in zip(ADJUSTABLE_INPUTS.values(), candidates.T):
+        assert column.min() == low and column.max() == high
+
+
+def test_solve_finds_the_cheapest_candidate_reaching_both_targets(grid, exam_model, scaler, attendance_model):
+    candidates, costs, marks, attendance = grid
+    target_marks = (marks[0] + marks.max()) / 2
+    target_attendance = float(np.percentile(attendance, 25))
+    reaching = np.flatnonzero((marks >= target_marks) & (attendance >= target_attendance))
+
+    result = solve(exam_model, scaler, attendance_model, STUDENT, target_marks, target_attendance, batch_size=64,
+                   budget_seconds=60)
+    assert result['status'] == 'reached'
+    assert result['cost'] == costs[reaching].min()
+    assert list(result['inputs'].values()) == candidates[reaching[0]].tolist()
+    assert result['predicted_marks'] == marks[reaching[0]] >= target_marks
+    assert result['predicted_attendance'] == attendance[reaching[0]] >= target_attendance
+    assert result['changes'] == {name: value - STUDENT[name] for name, value in result['inputs'].items()
+                                 if value != STUDENT[name]}
+
+
+def test_solve_keeps_inputs_that_already_reach_the_targets(grid, exam_model, scaler, attendance_model):
+    _, _, marks, attendance = grid
+    result = solve(exam_model, scaler, attendance_model, STUDENT, marks[0], attendance[0])
+    assert result['status'] == 'reached'
+    assert result['changes'] == {} and result['cost'] == 0
+    assert result['evaluated'] <= 1024
+
+
+def test_unreachable_targets_suggest_the_closest_candidate(grid, exam_model, scaler, attendance_model):
+    _, _, marks, attendance = grid
+    result = solve(exam_model, scaler, attendance_model, STUDENT, 1000.0, 0.0, budget_seconds=60)
+    assert result['status'] == 'unreachable'
+    assert result['evaluated'] == len(marks)
+    assert result['predicted_marks'] == marks.max()
+
+    # No candidate reaches the attendance target, so only the best attendance is scored
+    result = solve(exam_model, scaler, attendance_model, STUDENT, 0.0, 1000.0)
+    assert result['status'] == 'unreachable'
+    assert result['evaluated'] == 1
+    assert result['predicted_attendance'] == attendance.max()
+
+
+def test_solve_stops_when_over_budget(exam_model, scaler, attendance_model):
+    result = solve(exam_model, scaler, attendance_model, STUDENT, 1000.0, 0.0, batch_size=16, budget_seconds=0)
+    assert result['status'] == 'budget_exceeded'
+    # The first batch always runs
+    assert result['evaluated'] == 16
+
+
+def test_solve_with_a_replacement_exam_predictor(grid, exam_model, scaler, attendance_model):
+    candidates, _, marks, attendance = grid
+
+    def predict_exam(columns):
+        return predict_exam_marks_batch(exam_model, scaler, columns) + 5
+
+    result = solve(None, None, attendance_model, STUDENT, marks[0] + 5, attendance[0], predict_exam=predict_exam)
+    assert result['status'] == 'reached'
+    assert result['changes'] == {}
+    assert result['predicted_marks'] == marks[0] + 5
@@ -0,0 +1,41 @@
+import time
+
+from instrumentation import Metrics, metrics
+from storage import SqliteRepository
+
+
+def test_timed_keeps_the_function_metadata():
+    local = Metrics()
+
+    @local.timed('work')
+    def work(x):
+        """Double x."""
+        return 2 * x
+
+    assert work(3) == 6
+    assert (work.__name__, work.__doc__) == ('work', "Double x.")
+    assert local.summary()['spans']['work']['count'] == 1
+
+
+def test_database_metrics_count_statements_not_transactions(tmp_path):
+    repository = SqliteRepository.connect(str(tmp_path / 'students.db'), migrate=True)
+    repository.create_user('student', b'hash', 'student@example.com')
+
+    def db_metrics():
+        summary = metrics.summary()
+        return summary['counters'].get('db.queries', 0), summary['spans'].get('db.query', {}).get('count', 0)
+
+    queries, spans = db_metrics()
+    # One transaction, several statements: lock, read, write, read back, derived metrics, aggregates
+    repository.create_profile(1, 'Student', 'R1', [8.0] * 8)
+    after_queries, after_spans = db_metrics()
+    assert after_queries - queries > 3
+    assert after_spans - spans == after_queries - queries
+
+    # Time spent by the caller between fetches is not database time
+    before = metrics.summary()['spans']['db.fetch']['count']
+    for _ in repository.iter_profile_batches(['user_id'], batch_size=1):
+        time.sleep(0.05)
+    assert metrics.summary()['spans']['db.query']['max_ms'] < 50
+    assert metrics.summary()['spans']['db.fetch']['count'] > before
+    repository.close()
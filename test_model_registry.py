@@ -0,0 +1,117 @@
+import os
+import time
+from collections import Counter
+
+import joblib
+import numpy as np
+import pytest
+
+from model_registry import ModelRegistry, parse_routes
+from prediction import predict_exam_marks_batch
+
+
+@pytest.fixture
+def model_files(tmp_path, exam_model, scaler, linear_exam_model):
+    paths = {name: str(tmp_path / f'{name}.pkl') for name in ('forest', 'scaler', 'linear')}
+    joblib.dump(exam_model, paths['forest'])
+    joblib.dump(scaler, paths['scaler'])
+    joblib.dump(linear_exam_model, paths['linear'])
+    return paths
+
+
+@pytest.fixture
+def versions(model_files):
+    return {
+        'forest': {'model': model_files['forest'], 'scaler': model_files['scaler']},
+        'linear': {'model': model_files['linear']},
+    }
+
+
+def touch_later(path, seconds=5):
+    """Move a file's modification time forward so its fingerprint changes."""
+    later = time.time() + seconds
+    os.utime(path, (later, later))
+
+
+def test_versions_predict_like_their_models(versions, exam_model, scaler, exam_inputs):
+    registry = ModelRegistry(versions, {'forest': 1})
+    rows = exam_inputs[:50]
+    expected = predict_exam_marks_batch(exam_model, scaler, rows)
+    np.testing.assert_array_equal([registry.predict_one(row, version='forest')[0] for row in rows.tolist()], expected)
+
+    linear = registry.version('linear')
+    np.testing.assert_allclose([registry.predict_one(row, version='linear')[0] for row in rows.tolist()],
+                               linear.predict_batch(rows), rtol=0, atol=1e-9)
+    assert registry.predict_one(rows[0].tolist(), key=1) == (expected[0], 'forest')
+
+
+def test_routes_split_keys_by_share_and_stick(versions):
+    registry = ModelRegistry(versions, parse_routes('forest=90,linear=10'))
+    assert registry.routes == {'forest': 0.9, 'linear': 0.1}
+
+    shares = Counter(registry.route(key) for key in range(10000))
+    assert shares['forest'] / 10000 == pytest.approx(0.9, abs=0.02)
+    assert shares['linear'] / 10000 == pytest.approx(0.1, abs=0.02)
+    for key in range(100):
+        assert {registry.route(key) for _ in range(5)} == {registry.route(key)}
+
+
+def test_routes_must_name_loaded_versions(versions):
+    registry = ModelRegistry(versions, {'forest': 1})
+    with pytest.raises(ValueError):
+        registry.set_routes({'missing': 1})
+    with pytest.raises(ValueError):
+        registry.set_routes({'forest': 0})
+
+
+def test_missing_primary_propagates_and_other_versions_are_skipped(versions, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ModelRegistry({**versions, 'forest': {'model': str(tmp_path / 'missing.pkl')}}, {'forest': 1})
+
+    registry = ModelRegistry({**versions, 'linear': {'model': str(tmp_path / 'missing.pkl')}}, {'forest': 1})
+    assert registry.summary()['linear']['kind'] is None
+    with pytest.raises(ValueError):
+        registry.set_routes({'linear': 1})
+
+
+def test_reload_swaps_changed_versions(versions, model_files, exam_inputs):
+    registry = ModelRegistry(versions, {'forest': 1}, check_interval=0.0)
+    old_linear = registry.version('linear')
+    fingerprint = registry.fingerprint()
+    assert registry.reload_changed() == []
+
+    touch_later(model_files['linear'])
+    assert registry.reload_changed() == ['linear']
+    assert registry.fingerprint() != fingerprint
+    new_linear = registry.version('linear')
+    assert new_linear is not old_linear
+    np.testing.assert_array_equal(new_linear.predict_batch(exam_inputs), old_linear.predict_batch(exam_inputs))
+
+
+def test_failed_reload_keeps_the_old_version(versions, model_files):
+    registry = ModelRegistry(versions, {'forest': 1}, check_interval=0.0)
+    linear = registry.version('linear')
+
+    with open(model_files['linear'], 'wb') as f:
+        f.write(b'partially copied')
+    touch_later(model_files['linear'])
+    assert registry.reload_changed() == []
+    assert registry.version('linear') is linear
+
+
+def test_summary_reports_shares_and_recent_predictions(versions, exam_inputs):
+    registry = ModelRegistry(versions, parse_routes('forest=75,linear=25'), stats_window=16)
+    predictions = {'forest': [], 'linear': []}
+    for key, row in enumerate(exam_inputs[:100].tolist()):
+        predicted, name = registry.predict_one(row, key=key)
+        predictions[name].append(predicted)
+
+    summary = registry.summary()
+    for name, values in predictions.items():
+        assert summary[name]['count'] == len(values)
+        assert summary[name]['errors'] == 0
+        # Only the last stats_window predictions are kept
+        assert summary[name]['mean_prediction'] == pytest.approx(np.mean(values[-16:]))
+        assert summary[name]['p50_ms'] <= summary[name]['p95_ms']
+    assert (summary['forest']['share'], summary['linear']['share']) == (0.75, 0.25)
+    assert summary['linear']['kind'] == 'LinearRegression'
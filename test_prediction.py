@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from prediction import (EXAM_FEATURES, apply_exam_boost, predict_attendance_batch, predict_exam_marks_batch,
+                        sweep_design_matrix, sweep_exam_marks, sweep_exam_marks_grid)
+
+
+def scalar_boost(predicted_marks, previous_percentage, attendance):
+    """The boosting rule as the app originally applied it, one student at a time."""
+    if previous_percentage > 85 and attendance > 90:
+        return min(predicted_marks * 1.1, 100)
+    if previous_percentage < 60 or attendance < 70:
+        return max(predicted_marks * 0.9, 0)
+    return predicted_marks
+
+
+def scalar_predict(exam_model, scaler, row):
+    features = pd.DataFrame([row], columns=EXAM_FEATURES)
+    return scalar_boost(exam_model.predict(scaler.transform(features))[0], row[0], row[1])
+
+
+# Rows on and around each threshold of the rule
+EDGE_ROWS = [
+    [85.0, 95.0, 10.0, 1.0, 80.0, 2.0],
+    [85.1, 90.0, 10.0, 1.0, 80.0, 2.0],
+    [85.1, 90.1, 20.0, 0.0, 95.0, 10.0],
+    [60.0, 70.0, 10.0, 1.0, 80.0, 2.0],
+    [59.9, 95.0, 10.0, 1.0, 80.0, 2.0],
+    [90.0, 69.9, 10.0, 1.0, 80.0, 2.0],
+]
+
+
+@pytest.mark.parametrize('raw, previous_percentage, attendance, expected', [
+    (80.0, 90.0, 95.0, 88.0),
+    (95.0, 90.0, 95.0, 100.0),
+    (80.0, 85.0, 95.0, 80.0),
+    (80.0, 59.0, 95.0, 72.0),
+    (80.0, 70.0, 69.0, 72.0),
+    (-5.0, 50.0, 50.0, 0.0),
+    (80.0, 70.0, 80.0, 80.0),
+])
+def test_apply_exam_boost_matches_scalar_rule(raw, previous_percentage, attendance, expected):
+    assert apply_exam_boost([raw], [previous_percentage], [attendance])[0] == pytest.approx(expected)
+    assert scalar_boost(raw, previous_percentage, attendance) == pytest.approx(expected)
+
+
+def test_predict_exam_marks_batch_matches_scalar_path(exam_model, scaler, exam_inputs):
+    rows = np.vstack([exam_inputs, EDGE_ROWS])
+    expected = [scalar_predict(exam_model, scaler, row) for row in rows.tolist()]
+    np.testing.assert_array_equal(predict_exam_marks_batch(exam_model, scaler, rows), expected)
+
+
+def test_predict_exam_marks_batch_accepts_frames_and_columns(exam_model, scaler, exam_inputs):
+    frame = pd.DataFrame(exam_inputs, columns=EXAM_FEATURES)
+    expected = predict_exam_marks_batch(exam_model, scaler, exam_inputs)
+    np.testing.assert_array_equal(predict_exam_marks_batch(exam_model, scaler, frame[EXAM_FEATURES[::-1]]), expected)
+    np.testing.assert_array_equal(predict_exam_marks_batch(exam_model, scaler, frame.to_dict('list')), expected)
+
+
+def test_predict_attendance_batch_is_clamped(attendance_model):
+    predicted = predict_attendance_batch(attendance_model, [[100.0, 20.0, 0.0], [0.0, 0.0, 10.0]])
+    assert ((predicted >= 0) & (predicted <= 100)).all()
+
+
+def test_sweeps_match_row_by_row_predictions(exam_model, scaler):
+    base = dict(zip(EXAM_FEATURES, [75.0, 85.0, 0.0, 0.5, 80.0, 0.0]))
+    hours = np.linspace(5, 20, 7)
+    tuition = np.linspace(0, 10, 3)
+
+    expected = [scalar_predict(exam_model, scaler, [75.0, 85.0, h, 0.5, 80.0, 0.0]) for h in hours]
+    np.testing.assert_array_equal(sweep_exam_marks(exam_model, scaler, base, 'study_hours', hours), expected)
+
+    grid = sweep_exam_marks_grid(exam_model, scaler, base, 'study_hours', hours, 'tuition_hours', tuition)
+    assert grid.shape == (len(tuition), len(hours))
+    np.testing.assert_array_equal(
+        grid[2], [scalar_predict(exam_model, scaler, [75.0, 85.0, h, 0.5, 80.0, tuition[2]]) for h in hours]
+    )
+
+
+def test_sweep_design_matrix_varies_the_first_axis_slowest():
+    base = dict(zip(EXAM_FEATURES, [75.0, 85.0, 0.0, 0.5, 80.0, 0.0]))
+    design = sweep_design_matrix(base, EXAM_FEATURES, [('tuition_hours', [0.0, 5.0]), ('study_hours', [5.0, 10.0, 15.0])])
+    assert design['tuition_hours'].tolist() == [0.0, 0.0, 0.0, 5.0, 5.0, 5.0]
+    assert design['study_hours'].tolist() == [5.0, 10.0, 15.0] * 2
+    assert (design['previous_percentage'] == 75.0).all()
+    with pytest.raises(ValueError):
+        sweep_design_matrix(base, EXAM_FEATURES, [('past_attendance', [80.0])])
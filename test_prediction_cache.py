@@ -0,0 +1,85 @@
+import os
+import time
+
+import pytest
+
+from prediction_cache import PredictionCache, model_fingerprint, quantize
+
+
+def test_quantize_snaps_to_the_input_step():
+    assert quantize([72.04, 8.27, 0.96]) == (72.0, 8.3, 1.0)
+    assert quantize([72.04, 72.06]) == (72.0, 72.1)
+    assert quantize([3.14159], step=0.01) == (3.14,)
+
+
+def test_nearby_inputs_share_an_entry():
+    cache = PredictionCache()
+    calls = []
+
+    def compute(row):
+        calls.append(row)
+        return sum(row)
+
+    assert cache.get_or_compute('exam', [72.01, 8.0], compute) == pytest.approx(80.0)
+    assert cache.get_or_compute('exam', [71.99, 8.04], compute) == pytest.approx(80.0)
+    # The same features for another model are a separate entry
+    cache.get_or_compute('attendance', [72.0, 8.0], compute)
+    assert calls == [(72.0, 8.0), (72.0, 8.0)]
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['size']) == (1, 2, 2)
+    assert stats['hit_rate'] == pytest.approx(1 / 3)
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = PredictionCache(max_size=2)
+    cache.get_or_compute('exam', [1.0], sum)
+    cache.get_or_compute('exam', [2.0], sum)
+    cache.get_or_compute('exam', [1.0], sum)
+    cache.get_or_compute('exam', [3.0], sum)
+    assert cache.stats()['evictions'] == 1
+    # 1.0 was used more recently than 2.0, so it is still cached
+    cache.get_or_compute('exam', [1.0], lambda row: pytest.fail("1.0 was evicted"))
+    assert cache.get_or_compute('exam', [2.0], lambda row: -1) == -1
+
+
+def test_a_new_fingerprint_drops_every_entry():
+    cache = PredictionCache()
+    cache.ensure_fingerprint('v1')
+    cache.get_or_compute('exam', [1.0], lambda row: 'old')
+    cache.ensure_fingerprint('v1')
+    assert cache.get_or_compute('exam', [1.0], lambda row: 'new') == 'old'
+
+    cache.ensure_fingerprint('v2')
+    assert cache.get_or_compute('exam', [1.0], lambda row: 'new') == 'new'
+    assert cache.stats()['invalidations'] == 1
+
+
+def test_predictions_from_swapped_models_are_not_cached():
+    cache = PredictionCache()
+    cache.ensure_fingerprint('v1')
+
+    def compute_while_swapping(row):
+        cache.ensure_fingerprint('v2')
+        return 'old'
+
+    assert cache.get_or_compute('exam', [1.0], compute_while_swapping) == 'old'
+    assert cache.get_or_compute('exam', [1.0], lambda row: 'new') == 'new'
+
+
+def test_model_fingerprint_follows_the_files(tmp_path):
+    model = tmp_path / 'exam_model.pkl'
+    missing = model_fingerprint([str(model)])
+    model.write_bytes(b'model')
+    installed = model_fingerprint([str(model)])
+    assert installed != missing
+    assert model_fingerprint([str(model)]) == installed
+
+    later = time.time() + 5
+    os.utime(model, (later, later))
+    touched = model_fingerprint([str(model)])
+    assert touched != installed
+
+    # A compact export next to the pickle is part of the fingerprint
+    (tmp_path / 'exam_model_compact').mkdir()
+    (tmp_path / 'exam_model_compact' / 'forest.json').write_text('{}')
+    assert model_fingerprint([str(model)]) != touched
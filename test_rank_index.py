@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from rank_index import RANKED_METRICS, RankIndex, build_rankings
+from storage import SqliteRepository
+
+
+def brute_standing(values, value, user_id=None):
+    others = [v for uid, v in values.items() if uid != user_id]
+    below = sum(v < value for v in others)
+    return {
+        'rank': sum(v > value for v in others) + 1,
+        'total': len(others) + 1,
+        'percentile': 100.0 * below / len(others) if others else 100.0,
+    }
+
+
+def brute_top(values, n):
+    return sorted(values.items(), key=lambda item: (-item[1], item[0]))[:n]
+
+
+def assert_matches(index, values):
+    assert len(index) == len(values)
+    assert index.top(10) == brute_top(values, 10)
+    assert index.top(len(values) + 5) == brute_top(values, len(values) + 5)
+    for value in (0.0, 4.5, 5.0, 7.25, 10.0, 11.0):
+        assert index.count_below(value) == sum(v < value for v in values.values())
+        assert index.count_above(value) == sum(v > value for v in values.values())
+        assert index.standing(value) == brute_standing(values, value)
+    for user_id in (1, 7, 42, 1000):
+        assert index.value_of(user_id) == values.get(user_id)
+        assert index.standing(6.0, user_id) == brute_standing(values, 6.0, user_id)
+
+
+@pytest.mark.parametrize('merge_threshold', [1, 7, 10000])
+def test_rank_index_matches_brute_force_through_updates(merge_threshold):
+    rng = np.random.default_rng(merge_threshold)
+    # Half-point values, so ties are common
+    values = {user_id: float(rng.integers(0, 21)) / 2 for user_id in range(1, 201)}
+    values[13] = np.nan
+    index = RankIndex(list(values), list(values.values()), merge_threshold=merge_threshold)
+    del values[13]
+    assert_matches(index, values)
+
+    for step in range(300):
+        user_id = int(rng.integers(1, 260))
+        if step % 10 == 0:
+            index.update(user_id, None)
+            values.pop(user_id, None)
+        else:
+            value = float(rng.integers(0, 21)) / 2
+            index.update(user_id, value)
+            values[user_id] = value
+        if step % 50 == 0:
+            assert_matches(index, values)
+    assert_matches(index, values)
+
+
+def test_standing_leaves_out_the_askers_saved_value():
+    index = RankIndex([1, 2, 3], [9.0, 8.0, 7.0])
+    # User 3 would move from last to first; their stale 7.0 does not count against them
+    assert index.standing(9.5, user_id=3) == {'rank': 1, 'total': 3, 'percentile': 100.0}
+    assert index.standing(8.0, user_id=2) == {'rank': 2, 'total': 3, 'percentile': 50.0}
+    assert RankIndex().standing(5.0) == {'rank': 1, 'total': 1, 'percentile': 100.0}
+
+
+def test_top_orders_ties_by_user_id_across_pending_changes():
+    index = RankIndex([5, 3, 8], [9.0, 9.0, 6.0], merge_threshold=100)
+    index.update(1, 9.0)
+    index.update(8, 9.5)
+    index.update(3, None)
+    assert index.top(4) == [(8, 9.5), (1, 9.0), (5, 9.0)]
+
+
+def test_build_rankings_follows_profile_writes(tmp_path):
+    repository = SqliteRepository.connect(str(tmp_path / 'students.db'), migrate=True)
+    for user_id in range(1, 5):
+        repository.create_user(f'user{user_id}', b'hash', f'user{user_id}@example.com')
+    repository.create_profile(1, 'Student 1', 'R1', [9.0, 9.0, 0, 0, 0, 0, 0, 0])
+    repository.create_profile(2, 'Student 2', 'R2', [7.0] * 8)
+    repository.create_profile(3, 'Student 3', 'R3', [0.0] * 8)
+    repository.save_predictions(2, 80.0, 90.0)
+
+    rankings = build_rankings(repository, merge_threshold=2)
+    assert rankings['average_cgpa'].top(3) == [(1, 9.0), (2, 7.0), (3, 0.0)]
+    assert len(rankings['predicted_exam_marks']) == 1
+
+    repository.create_profile(4, 'Student 4', 'R4', [9.5] * 8)
+    repository.save_predictions(4, 85.0, 70.0)
+    repository.delete_profile(1)
+    for user_id in (4, 1):
+        rankings.update(user_id, repository.get_profile(user_id, fields=('grades', *RANKED_METRICS)))
+
+    assert rankings['average_cgpa'].top(3) == [(4, 9.5), (2, 7.0), (3, 0.0)]
+    assert rankings['predicted_exam_marks'].standing(82.0) == {'rank': 2, 'total': 3, 'percentile': 50.0}
+    assert rankings['predicted_attendance'].top(2) == [(2, 90.0), (4, 70.0)]
+    repository.close()
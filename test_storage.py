@@ -0,0 +1,144 @@
+import numpy as np
+import pytest
+
+from cgpa_calculator import average_cgpa, clamp_grades
+from storage import (AGGREGATE_METRICS, SCHEMA_VERSION, SEMESTER_COLUMNS, IntegrityError, SchemaError, SqliteRepository,
+                     StudentRepository)
+
+
+@pytest.fixture
+def repository(tmp_path):
+    repository = SqliteRepository.connect(str(tmp_path / 'students.db'), migrate=True)
+    yield repository
+    repository.close()
+
+
+@pytest.fixture
+def class_repository(tmp_path):
+    repository = SqliteRepository.connect(str(tmp_path / 'class.db'), migrate=True)
+    rng = np.random.default_rng(0)
+    for user_id in range(1, 61):
+        repository.create_user(f'user{user_id}', b'hash', f'user{user_id}@example.com')
+        # Out-of-range grades, partially completed and empty profiles, some without predictions
+        grades = np.round(rng.uniform(-1, 11, len(SEMESTER_COLUMNS)), 2)
+        grades[rng.integers(0, len(SEMESTER_COLUMNS) + 1):] = 0
+        if user_id <= 50:
+            repository.create_profile(user_id, f'Student {user_id}', f'R{user_id}', grades.tolist())
+        if user_id % 3 == 0 and user_id <= 50:
+            repository.save_predictions(user_id, 40 + user_id % 50, 60 + user_id % 40)
+    yield repository
+    repository.close()
+
+
+def test_connect_only_checks_the_schema(tmp_path):
+    path = str(tmp_path / 'new.db')
+    with pytest.raises(SchemaError):
+        SqliteRepository.connect(path)
+
+    SqliteRepository.connect(path, migrate=True).close()
+    repository = SqliteRepository.connect(path)
+    assert repository.schema_version() == SCHEMA_VERSION
+    assert repository.ping()
+    repository.close()
+
+
+def test_migrate_is_idempotent(repository):
+    repository.create_user('student', b'hash', 'student@example.com')
+    repository.create_profile(1, 'Student', 'R1', [8.0] * 8)
+    repository.migrate()
+    assert repository.schema_version() == SCHEMA_VERSION
+    assert repository.get_profile(1).full_name == 'Student'
+
+
+def test_backends_must_implement_the_writes():
+    class PartialRepository(StudentRepository):
+        def _create_schema(self):
+            pass
+
+    with pytest.raises(TypeError):
+        PartialRepository(None)
+
+
+def test_profile_round_trip(repository):
+    repository.create_user('student', b'hash', 'student@example.com')
+    user_id, password_hash = repository.get_user_credentials('student')
+    assert password_hash == b'hash'
+
+    repository.create_profile(user_id, 'Student', 'R1', [8.0, 9.0, 0, 0, 0, 0, 0, 0])
+    repository.save_grades(user_id, [8.0, 9.0, 7.0, 0, 0, 0, 0, 0])
+    profile = repository.get_profile(user_id)
+    assert list(profile.grades) == [8.0, 9.0, 7.0, 0, 0, 0, 0, 0]
+    assert profile.metrics()['completed_semesters'] == 3
+
+    with pytest.raises(IntegrityError):
+        repository.create_user('student', b'other', 'other@example.com')
+
+    repository.delete_profile(user_id)
+    assert repository.get_profile(user_id) is None
+
+
+def test_top_average_cgpa_user(repository):
+    grades = {1: [9.5, 8.5, 9.0, 0, 0, 0, 0, 0], 2: [7.0] * 8, 3: [9.0, 8.5, 9.5, 0, 0, 0, 0, 0]}
+    for user_id, semester_grades in grades.items():
+        repository.create_user(f'user{user_id}', b'hash', f'user{user_id}@example.com')
+        repository.create_profile(user_id, f'Student {user_id}', f'R{user_id}', semester_grades)
+
+    # Users 1 and 3 tie on their average CGPA; the lower user_id is the top performer
+    assert repository.compute_class_aggregates()['average_cgpa'][3] == 1
+    assert repository.get_class_aggregates()['average_cgpa']['max_user_id'] == 1
+
+    # Lowering the maximum recomputes it from the database
+    repository.save_grades(1, [5.0] * 8)
+    repository.save_grades(3, [6.0] * 8)
+    top = repository.get_class_aggregates()['average_cgpa']
+    assert (top['max'], top['max_user_id']) == (7.0, 2)
+
+
+def python_aggregates(repository):
+    """Every class aggregate recomputed in Python from the stored profiles."""
+    values = {metric: [] for metric in AGGREGATE_METRICS}
+    averages = {}
+    columns = ['user_id', *SEMESTER_COLUMNS, 'predicted_exam_marks', 'predicted_attendance']
+    for batch in repository.iter_profile_batches(columns):
+        for user_id, *grades, exam_marks, attendance in batch:
+            grades = clamp_grades(grades)
+            for column, grade in zip(SEMESTER_COLUMNS, grades):
+                if grade > 0:
+                    values[column].append(grade)
+            averages[user_id] = average_cgpa(grades)
+            values['average_cgpa'].append(averages[user_id])
+            if exam_marks is not None:
+                values['predicted_exam_marks'].append(exam_marks)
+            if attendance is not None:
+                values['predicted_attendance'].append(attendance)
+            values['profiles'].append(1.0)
+    return values, averages
+
+
+def assert_aggregates_match(aggregates, values):
+    for metric in AGGREGATE_METRICS:
+        value_sum, value_count, max_value = aggregates[metric][:3]
+        assert value_count == len(values[metric]), metric
+        assert value_sum == pytest.approx(sum(values[metric])), metric
+        assert max_value == (max(values[metric]) if values[metric] else None), metric
+
+
+def test_compute_class_aggregates_matches_python(class_repository):
+    values, averages = python_aggregates(class_repository)
+    aggregates = class_repository.compute_class_aggregates()
+    assert_aggregates_match(aggregates, values)
+    assert averages[aggregates['average_cgpa'][3]] == max(averages.values())
+
+
+def test_running_aggregates_follow_writes(class_repository):
+    class_repository.update_profile(1, 'Student 1', 'R1', [9.5, 10.0, 12.0, 0.0, 0.0, 0.0, 0.0, 0.0])
+    class_repository.create_profile(55, 'Student 55', 'R55', [10.0] * len(SEMESTER_COLUMNS))
+    class_repository.save_predictions(2, 99.0, 98.0)
+
+    values, averages = python_aggregates(class_repository)
+    assert_aggregates_match(class_repository.compute_class_aggregates(), values)
+    stored = class_repository.get_class_aggregates()
+    for metric in AGGREGATE_METRICS:
+        assert stored[metric]['count'] == len(values[metric]), metric
+        assert stored[metric]['sum'] == pytest.approx(sum(values[metric])), metric
+    assert stored['average_cgpa']['max_user_id'] == 55
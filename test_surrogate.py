@@ -0,0 +1,108 @@
+import itertools
+
+import joblib
+import numpy as np
+import pytest
+
+from fast_inference import verification_inputs
+from prediction import ATTENDANCE_FEATURES, EXAM_FEATURES, predict_attendance_batch, predict_exam_marks_batch
+from surrogate import GridTable, grid_axes, load_surrogate, parse_points, source_digest, write_surrogate
+
+
+@pytest.fixture
+def surrogate(tmp_path, exam_model, scaler, attendance_model):
+    return write_surrogate(str(tmp_path / 'surrogate'), exam_model, scaler, attendance_model, exam_points=3,
+                           attendance_points=5, point_overrides={'study_hours': 4}, chunk_size=100,
+                           error_samples=200)
+
+
+def grid_nodes(features, points, overrides=None):
+    axes = grid_axes(features, points, overrides)
+    return np.array(list(itertools.product(*(np.linspace(low, high, n) for _, low, high, n in axes))))
+
+
+def multilinear(X):
+    return 3.0 + 2.0 * X[:, 0] - 0.5 * X[:, 1] + 0.25 * X[:, 0] * X[:, 1] * X[:, 2]
+
+
+def test_grid_table_reproduces_multilinear_functions():
+    lows, highs, shape = [0.0, -1.0, 10.0], [4.0, 1.0, 20.0], (5, 3, 6)
+    nodes = np.array(list(itertools.product(*(np.linspace(low, high, n) for low, high, n in zip(lows, highs, shape)))))
+    table = GridTable(['a', 'b', 'c'], lows, highs, multilinear(nodes).reshape(shape))
+
+    # Interpolation is exact at the grid points and for a multilinear function between them
+    X = np.vstack([nodes, np.random.default_rng(0).uniform(lows, highs, (200, 3))])
+    np.testing.assert_allclose(table.lookup(X), multilinear(X), rtol=0, atol=1e-9)
+    np.testing.assert_allclose([table.lookup_one(row) for row in X.tolist()], multilinear(X), rtol=0, atol=1e-9)
+
+
+def test_grid_table_clamps_to_its_edges():
+    lows, highs, shape = [0.0, -1.0, 10.0], [4.0, 1.0, 20.0], (5, 3, 6)
+    nodes = np.array(list(itertools.product(*(np.linspace(low, high, n) for low, high, n in zip(lows, highs, shape)))))
+    table = GridTable(['a', 'b', 'c'], lows, highs, multilinear(nodes).reshape(shape))
+
+    outside = np.array([[-3.0, 0.5, 25.0], [9.0, -7.0, 15.0], [2.0, 4.0, -100.0]])
+    clamped = np.clip(outside, lows, highs)
+    np.testing.assert_allclose(table.lookup(outside), multilinear(clamped), rtol=0, atol=1e-9)
+    np.testing.assert_allclose([table.lookup_one(row) for row in outside.tolist()], multilinear(clamped), rtol=0, atol=1e-9)
+
+
+def test_grid_table_needs_two_points_per_feature():
+    with pytest.raises(ValueError):
+        GridTable(['a', 'b'], [0.0, 0.0], [1.0, 1.0], np.zeros((3, 1)))
+
+
+def test_surrogate_is_exact_at_grid_points(surrogate, exam_model, scaler, attendance_model):
+    assert surrogate.exam.values.shape == (3, 3, 4, 3, 3, 3)
+    # The tables are float32
+    X = grid_nodes(EXAM_FEATURES, 3, {'study_hours': 4})
+    np.testing.assert_allclose(surrogate.predict_exam(X), predict_exam_marks_batch(exam_model, scaler, X), rtol=0, atol=1e-4)
+    X = grid_nodes(ATTENDANCE_FEATURES, 5, {'study_hours': 4})
+    np.testing.assert_allclose(surrogate.predict_attendance(X), predict_attendance_batch(attendance_model, X),
+                               rtol=0, atol=1e-4)
+
+
+def test_surrogate_scalar_and_batch_agree(surrogate):
+    X = verification_inputs(EXAM_FEATURES, n_samples=200, seed=7)
+    # Rows outside the form's ranges are clamped to the grid
+    X = np.vstack([X, [[150.0, -10.0, 100.0, 50.0, 200.0, 30.0]]])
+    np.testing.assert_allclose([surrogate.predict_exam_one(*row) for row in X.tolist()], surrogate.predict_exam(X),
+                               rtol=0, atol=1e-9)
+    X = verification_inputs(ATTENDANCE_FEATURES, n_samples=200, seed=8)
+    np.testing.assert_allclose([surrogate.predict_attendance_one(*row) for row in X.tolist()],
+                               surrogate.predict_attendance(X), rtol=0, atol=1e-9)
+
+
+def test_surrogate_records_its_error_and_loads_back(surrogate, tmp_path):
+    error = surrogate.meta['error']
+    assert set(error) == {'exam', 'attendance'}
+    assert error['exam']['samples'] == 200
+    assert error['exam']['mean_abs_error'] <= error['exam']['max_abs_error']
+
+    loaded = load_surrogate(str(tmp_path / 'surrogate'))
+    X = verification_inputs(EXAM_FEATURES, n_samples=50, seed=9)
+    np.testing.assert_array_equal(loaded.predict_exam(X), surrogate.predict_exam(X))
+
+
+def test_check_sources_detects_changed_models(tmp_path, exam_model, scaler, attendance_model):
+    paths = {'exam_model': str(tmp_path / 'exam_model.pkl'), 'scaler': str(tmp_path / 'scaler_exam.pkl'),
+             'attendance_model': str(tmp_path / 'attendance_model.pkl')}
+    for role, model in (('exam_model', exam_model), ('scaler', scaler), ('attendance_model', attendance_model)):
+        joblib.dump(model, paths[role])
+    sources = {role: source_digest(path) for role, path in paths.items()}
+    surrogate = write_surrogate(str(tmp_path / 'surrogate'), exam_model, scaler, attendance_model, exam_points=2,
+                                attendance_points=2, sources=sources, error_samples=10)
+    surrogate.check_sources(paths)
+
+    # A different model installed under the exam model's name
+    joblib.dump(attendance_model, paths['exam_model'])
+    with pytest.raises(ValueError, match='exam_model'):
+        surrogate.check_sources(paths)
+    with pytest.raises(ValueError, match='attendance_model'):
+        surrogate.check_sources({'attendance_model': str(tmp_path / 'missing.pkl')})
+
+
+def test_parse_points():
+    assert parse_points(['study_hours=31', 'commute_time=5']) == {'study_hours': 31, 'commute_time': 5}
+    with pytest.raises(ValueError):
+        parse_points(['unknown=3'])
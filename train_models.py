@@ -0,0 +1,249 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, r2_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from compact_model import COMPACT_SUFFIX, export_forest
+from prediction import EXAM_FEATURES, ATTENDANCE_FEATURES
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+EXAM_TARGET = 'exam_marks'
+ATTENDANCE_TARGET = 'attendance'
+
+# Artifact names app.py loads from the project directory
+ARTIFACT_FILES = {
+    'exam_model': 'exam_model.pkl',
+    'attendance_model': 'attendance_model.pkl',
+    'scaler': 'scaler_exam.pkl',
+}
+MANIFEST_FILE = 'manifest.json'
+LATEST_FILE = 'LATEST'
+
+
+def load_training_data(path):
+    """
+    Read a training dataset shaped like sample_data.csv.
+
+    Args:
+        path (str): Path to a .csv or .parquet file.
+
+    Returns:
+        pd.DataFrame: The dataset.
+
+    Raises:
+        ValueError: If a required feature or target column is missing.
+    """
+    if path.lower().endswith(('.parquet', '.pq')):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path)
+
+    required = set(EXAM_FEATURES) | set(ATTENDANCE_FEATURES) | {EXAM_TARGET, ATTENDANCE_TARGET}
+    missing = sorted(required - set(df.columns))
+    if missing:
+        raise ValueError(f"Training data is missing columns: {', '.join(missing)}")
+    return df
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _max_rss_mb():
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes on Linux
+    return max_rss / (1024 * 1024) if sys.platform == 'darwin' else max_rss / 1024
+
+
+def _regression_metrics(y_true, y_pred):
+    return {
+        'r2': float(r2_score(y_true, y_pred)),
+        'mae': float(mean_absolute_error(y_true, y_pred)),
+    }
+
+
+def train_models(df, n_estimators=100, max_depth=None, n_jobs=-1, random_state=42, test_size=0.2):
+    """
+    Train the exam-marks and attendance RandomForest models.
+
+    The exam model is trained on StandardScaler-scaled ``EXAM_FEATURES``; the attendance
+    model on raw ``ATTENDANCE_FEATURES``, matching how app.py calls them.
+
+    Args:
+        df (pd.DataFrame): Training data from ``load_training_data``.
+        n_estimators (int): Trees per forest.
+        max_depth (int or None): Maximum tree depth.
+        n_jobs (int): Parallel jobs for forest fitting (-1 uses all cores).
+        random_state (int): Seed for the train/test split and the forests.
+        test_size (float): Fraction of rows held out for the reported metrics.
+
+    Returns:
+        tuple: ``(artifacts, report)`` where ``artifacts`` maps the keys of ``ARTIFACT_FILES``
+        to fitted objects and ``report`` holds holdout metrics, wall-times and peak memory.
+    """
+    train_df, test_df = train_test_split(df, test_size=test_size, random_state=random_state)
+    forest_params = dict(n_estimators=n_estimators, max_depth=max_depth, n_jobs=n_jobs, random_state=random_state)
+
+    report = {'metrics': {}, 'timings_seconds': {}, 'peak_memory_mb': {}}
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+
+    try:
+        # Exam marks model
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        scaler = StandardScaler().fit(train_df[EXAM_FEATURES])
+        exam_model = RandomForestRegressor(**forest_params)
+        exam_model.fit(scaler.transform(train_df[EXAM_FEATURES]), train_df[EXAM_TARGET])
+        report['timings_seconds']['exam_model'] = time.perf_counter() - start
+        report['peak_memory_mb']['exam_model'] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        report['metrics']['exam_model'] = _regression_metrics(
+            test_df[EXAM_TARGET], exam_model.predict(scaler.transform(test_df[EXAM_FEATURES]))
+        )
+
+        # Attendance model
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        attendance_model = RandomForestRegressor(**forest_params)
+        attendance_model.fit(train_df[ATTENDANCE_FEATURES], train_df[ATTENDANCE_TARGET])
+        report['timings_seconds']['attendance_model'] = time.perf_counter() - start
+        report['peak_memory_mb']['attendance_model'] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        report['metrics']['attendance_model'] = _regression_metrics(
+            test_df[ATTENDANCE_TARGET], attendance_model.predict(test_df[ATTENDANCE_FEATURES])
+        )
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+    report['timings_seconds']['total'] = sum(report['timings_seconds'].values())
+    report['max_rss_mb'] = _max_rss_mb()
+    report['rows'] = {'train': len(train_df), 'test': len(test_df)}
+    report['params'] = {**forest_params, 'test_size': test_size}
+
+    artifacts = {'exam_model': exam_model, 'attendance_model': attendance_model, 'scaler': scaler}
+    return artifacts, report
+
+
+def build_manifest(version, data_path, report):
+    return {
+        'version': version,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'data': {'path': os.path.abspath(data_path), 'sha256': file_sha256(data_path)},
+        'features': {'exam_model': EXAM_FEATURES, 'attendance_model': ATTENDANCE_FEATURES},
+        'targets': {'exam_model': EXAM_TARGET, 'attendance_model': ATTENDANCE_TARGET},
+        'artifacts': ARTIFACT_FILES,
+        'environment': {
+            'python': platform.python_version(),
+            'sklearn': sklearn.__version__,
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'joblib': joblib.__version__,
+        },
+        **report,
+    }
+
+
+def write_artifacts(artifacts, manifest, output_dir):
+    """
+    Write the fitted objects and manifest to ``output_dir/<version>/`` and mark it as latest.
+
+    Returns:
+        str: The version directory.
+    """
+    version_dir = os.path.join(output_dir, manifest['version'])
+    os.makedirs(version_dir, exist_ok=False)
+    for key, filename in ARTIFACT_FILES.items():
+        joblib.dump(artifacts[key], os.path.join(version_dir, filename))
+    with open(os.path.join(version_dir, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    with open(os.path.join(output_dir, LATEST_FILE), 'w') as f:
+        f.write(manifest['version'] + '\n')
+    return version_dir
+
+
+def write_compact_models(artifacts, version_dir):
+    """Export both forests in the memory-mappable format next to their pickles."""
+    for key in ('exam_model', 'attendance_model'):
+        stem = os.path.splitext(ARTIFACT_FILES[key])[0]
+        export_forest(artifacts[key], os.path.join(version_dir, stem + COMPACT_SUFFIX))
+
+
+def install_artifacts(version_dir, target_dir='.'):
+    """Copy a version's model files (and compact exports, if any) to where app.py loads them from."""
+    for filename in ARTIFACT_FILES.values():
+        shutil.copy2(os.path.join(version_dir, filename), os.path.join(target_dir, filename))
+        compact_dir = os.path.splitext(filename)[0] + COMPACT_SUFFIX
+        if os.path.isdir(os.path.join(version_dir, compact_dir)):
+            shutil.copytree(os.path.join(version_dir, compact_dir), os.path.join(target_dir, compact_dir), dirs_exist_ok=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the exam and attendance models and write versioned artifacts.")
+    parser.add_argument('--data', default='sample_data.csv', help="Training data (.csv or .parquet)")
+    parser.add_argument('--output-dir', default='models', help="Directory for versioned artifacts")
+    parser.add_argument('--version', help="Version label (defaults to a UTC timestamp)")
+    parser.add_argument('--n-estimators', type=int, default=100)
+    parser.add_argument('--max-depth', type=int, default=None)
+    parser.add_argument('--n-jobs', type=int, default=-1, help="Parallel jobs for forest fitting (-1 = all cores)")
+    parser.add_argument('--random-state', type=int, default=42)
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--compact', action='store_true', help="Also export the forests in the compact memory-mappable format")
+    parser.add_argument('--install', action='store_true', help="Also copy the trained models into the project directory")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    version = args.version or datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')
+
+    df = load_training_data(args.data)
+    logging.info(f"Training on {len(df)} rows from {args.data}")
+    artifacts, report = train_models(
+        df, n_estimators=args.n_estimators, max_depth=args.max_depth, n_jobs=args.n_jobs,
+        random_state=args.random_state, test_size=args.test_size
+    )
+    manifest = build_manifest(version, args.data, report)
+    version_dir = write_artifacts(artifacts, manifest, args.output_dir)
+    if args.compact:
+        write_compact_models(artifacts, version_dir)
+
+    for name in ('exam_model', 'attendance_model'):
+        metrics = report['metrics'][name]
+        logging.info(
+            f"{name}: R2={metrics['r2']:.4f} MAE={metrics['mae']:.3f} "
+            f"time={report['timings_seconds'][name]:.2f}s peak_mem={report['peak_memory_mb'][name]:.1f}MB"
+        )
+    logging.info(f"Wrote artifacts to {version_dir}")
+
+    if args.install:
+        install_artifacts(version_dir)
+        logging.info("Installed models into the project directory")
+
+
+if __name__ == "__main__":
+    main()
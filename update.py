@@ -1,36 +1,98 @@
-import pyodbc
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import bcrypt
 
-# Database connection
-def get_db_connection():
-    conn_str = (
-        "DRIVER={ODBC Driver 17 for SQL Server};"
-        "SERVER=FRENZY\\SQLEXPRESS;"
-        "DATABASE=DYPATU_StudentDB;"
-        "Trusted_Connection=yes;"
-    )
-    return pyodbc.connect(conn_str)
-
-# Connect to the database
-conn = get_db_connection()
-cursor = conn.cursor()
-
-# Fetch all users
-cursor.execute("SELECT user_id, username FROM Users")
-users = cursor.fetchall()
-
-# Re-hash a default password for each user (e.g., reset to a known password)
-default_password = "Test@123".encode('utf-8')
-hashed_password = bcrypt.hashpw(default_password, bcrypt.gensalt())
-
-# Update each user's password
-for user in users:
-    user_id = user[0]
-    cursor.execute(
-        "UPDATE Users SET password = ? WHERE user_id = ?",
-        (hashed_password, user_id)
-    )
-
-conn.commit()
-conn.close()
-print("User passwords updated successfully!")
\ No newline at end of file
+from password_hashing import DEFAULT_ROUNDS, ROUNDS_ENV
+from storage import create_repository
+
+DEFAULT_PASSWORD = "Test@123"
+DEFAULT_CHECKPOINT = 'password_reset.checkpoint.json'
+
+
+def hash_chunk(executor, password, user_ids, rounds):
+    """Hash ``password`` once per user, each with its own salt, in parallel (bcrypt releases the GIL)."""
+    password = password.encode('utf-8')
+    hashes = executor.map(lambda _: bcrypt.hashpw(password, bcrypt.gensalt(rounds)), user_ids)
+    return list(zip(user_ids, hashes))
+
+
+def read_checkpoint(path):
+    """Return the last user_id whose password was committed, or None."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)['last_user_id']
+
+
+def write_checkpoint(path, last_user_id):
+    # Write then rename, so a crash never leaves a half-written checkpoint
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'last_user_id': last_user_id}, f)
+    os.replace(tmp_path, path)
+
+
+def reset_passwords(repository, password, rounds, workers, chunk_size, checkpoint_path, resume=False):
+    """
+    Reset every user's password, committing one chunk of users at a time.
+
+    Users are processed in user_id order. After each chunk commits, its last user_id is
+    written to ``checkpoint_path``; with ``resume`` set, users up to that id are skipped.
+    The checkpoint is removed once every user is done.
+
+    Returns:
+        int: Number of passwords reset in this run.
+    """
+    users = repository.list_users()
+    start_after = read_checkpoint(checkpoint_path) if resume else None
+    if start_after is not None:
+        print(f"Resuming after user_id {start_after}")
+        users = [user for user in users if user[0] > start_after]
+
+    total = len(users)
+    done = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for offset in range(0, total, chunk_size):
+            user_ids = [user_id for user_id, _ in users[offset:offset + chunk_size]]
+            repository.update_passwords(hash_chunk(executor, password, user_ids, rounds))
+            write_checkpoint(checkpoint_path, user_ids[-1])
+
+            done += len(user_ids)
+            elapsed = time.perf_counter() - start
+            rate = done / elapsed
+            eta = (total - done) / rate if rate else 0
+            print(f"{done}/{total} passwords reset ({rate:,.0f}/s, ETA {eta:,.0f}s)")
+
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return done
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reset every user's password to a known value, with a fresh salt per user.")
+    parser.add_argument('--password', default=DEFAULT_PASSWORD, help="New password for every user")
+    parser.add_argument('--rounds', type=int, default=int(os.environ.get(ROUNDS_ENV, DEFAULT_ROUNDS)),
+                        help="bcrypt cost factor (defaults to STUDENT_BCRYPT_ROUNDS or 12)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Hashing threads")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="Users hashed and committed per batch")
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT, help="Progress file used to resume")
+    parser.add_argument('--resume', action='store_true', help="Skip users committed by a previous, interrupted run")
+    args = parser.parse_args(argv)
+
+    # Connect to the database (configured through STUDENT_DB_* environment variables)
+    repository = create_repository()
+    try:
+        count = reset_passwords(repository, args.password, args.rounds, args.workers, args.chunk_size,
+                                args.checkpoint, resume=args.resume)
+    finally:
+        repository.close()
+    print(f"User passwords updated successfully! ({count} users)")
+
+
+if __name__ == "__main__":
+    main()